@@ -1,6 +1,5 @@
-from register import RORegBit, RWRegBit, RORegStruct, RORegBits, RWRegBits, ROReg24Bit
+from register import RORegBit, RWRegBit, RORegStruct, RORegBits, RWRegBits, RORegBlock, RO_Transaction, Configure, wait_until, bus_lock
 from machine import I2C
-from time import sleep
 import struct
 
 class ScaleFactor:
@@ -77,6 +76,53 @@ class Register:
     COEF_SRCE = const(0x28)
 
 class DPS310:    
+    
+    # Datasheet: sensor ready 12ms, coefficients ready 40ms after power on
+    READY_TIMEOUT_MS = const(1000)
+    
+    # Writable configuration, (reg_addr, num_bytes), for register snapshots
+    CONFIG_REGISTERS = ((Register.PRS_CFG, 4),)
+    
+    # Heap bytes allowed per call once warmed up, checked by alloctrace
+    # 15 floats and the result tuple, 4 ints above 256 on CPython
+    ALLOC_BUDGETS = {'readings': 704}
+    
+    # === Register objects ===
+    _pm_prc = RWRegBits(Register.PRS_CFG, 1, 0, 3, '>B')
+    _pm_rate = RWRegBits(Register.PRS_CFG, 1, 4, 6, '>B')
+    _tm_prc = RWRegBits(Register.TMP_CFG, 1, 0, 3, '>B')
+    _tmp_rate = RWRegBits(Register.TMP_CFG, 1, 4, 6, '>B')
+    _tmp_ext = RWRegBit(Register.TMP_CFG, 1, 7, '>B')
+    _meas_ctrl = RWRegBits(Register.MEAS_CFG, 1, 0, 2, '>B', volatile=True)
+    _prs_rdy = RORegBit(Register.MEAS_CFG, 1, 4, '>B')
+    _tmp_rdy = RORegBit(Register.MEAS_CFG, 1, 5, '>B')
+    _sensor_rdy = RORegBit(Register.MEAS_CFG, 1, 6, '>B')
+    _coef_rdy = RORegBit(Register.MEAS_CFG, 1, 7, '>B')
+    _spi_mode = RWRegBit(Register.CFG_REG, 1, 0, '>B')
+    _fifo_en = RWRegBit(Register.CFG_REG, 1, 1, '>B')
+    _prs_shift_en = RWRegBit(Register.CFG_REG, 1, 2, '>B')
+    _tmp_shift_en = RWRegBit(Register.CFG_REG, 1, 3, '>B')
+    _int_sel = RWRegBits(Register.CFG_REG, 1, 4, 6, '>B')
+    _int_hl = RWRegBit(Register.CFG_REG, 1, 7, '>B')
+    _int_prs = RORegBit(Register.INT_STS, 1, 0, '>B')
+    _int_tmp = RORegBit(Register.INT_STS, 1, 1, '>B')
+    _int_fifo_full = RORegBit(Register.INT_STS, 1, 2, '>B')
+    _fifo_empty = RORegBit(Register.FIFO_STS, 1, 0, '>B')
+    _fifo_full = RORegBit(Register.FIFO_STS, 1, 1, '>B')
+    _soft_rst = RWRegBits(Register.RESET, 1, 0, 3, '>B', volatile=True)
+    _fifo_flush = RWRegBit(Register.RESET, 1, 7, '>B', volatile=True)
+    _prod_id = RWRegBits(Register.PRODUCT_ID, 1, 0, 3, '>B')
+    _rev_id = RWRegBits(Register.RESET, 1, 4, 7, '>B')
+    
+    # PSR_B2..TMP_B0 and COEF_0x10..COEF_0x21 in one read each
+    _raw_readings = RORegBlock(Register.PSR_B2, 6)
+    _raw_coefficients = RORegBlock(Register.COEF_0x10, 18)
+    
+    # MEAS_CFG, INT_STS and FIFO_STS flags in a single read
+    _status = RO_Transaction([_prs_rdy, _tmp_rdy, _sensor_rdy, _coef_rdy,
+                              _int_prs, _int_tmp, _int_fifo_full,
+                              _fifo_empty, _fifo_full])
+    
     def __init__(self, i2c_conn, dev_addr=Register.DEV_ADR):
         self._i2c = i2c_conn
         self._dev_addr = dev_addr
@@ -95,49 +141,35 @@ class DPS310:
         self._c21 = 0
         self._c30 = 0     
         
-        self._pm_prc = RWRegBits(self._i2c, self._dev_addr, Register.PRS_CFG, 1, 0, 3, '>B')
-        self._pm_rate = RWRegBits(self._i2c, self._dev_addr, Register.PRS_CFG, 1, 4, 6, '>B')
-        self._tm_prc = RWRegBits(self._i2c, self._dev_addr, Register.TMP_CFG, 1, 0, 3, '>B')
-        self._tmp_rate = RWRegBits(self._i2c, self._dev_addr, Register.TMP_CFG, 1, 4, 6, '>B')
-        self._tmp_ext = RWRegBit(self._i2c, self._dev_addr, Register.TMP_CFG, 1, 7, '>B')
-        self._meas_ctrl = RWRegBits(self._i2c, self._dev_addr, Register.MEAS_CFG, 1, 0, 2, '>B')
-        self._prs_rdy = RORegBit(self._i2c, self._dev_addr, Register.MEAS_CFG, 1, 4, '>B')
-        self._tmp_rdy = RORegBit(self._i2c, self._dev_addr, Register.MEAS_CFG, 1, 5, '>B')
-        self._sensor_rdy = RORegBit(self._i2c, self._dev_addr, Register.MEAS_CFG, 1, 6, '>B')
-        self._coef_rdy = RORegBit(self._i2c, self._dev_addr, Register.MEAS_CFG, 1, 7, '>B')
-        self._spi_mode = RWRegBit(self._i2c, self._dev_addr, Register.CFG_REG, 1, 0, '>B')
-        self._fifo_en = RWRegBit(self._i2c, self._dev_addr, Register.CFG_REG, 1, 1, '>B')
-        self._prs_shift_en = RWRegBit(self._i2c, self._dev_addr, Register.CFG_REG, 1, 2, '>B')
-        self._tmp_shift_en = RWRegBit(self._i2c, self._dev_addr, Register.CFG_REG, 1, 3, '>B')
-        self._int_sel = RWRegBits(self._i2c, self._dev_addr, Register.CFG_REG, 1, 4, 6, '>B')
-        self._int_hl = RWRegBit(self._i2c, self._dev_addr, Register.CFG_REG, 1, 7, '>B')
-        self._int_prs = RORegBit(self._i2c, self._dev_addr, Register.INT_STS, 1, 0, '>B')
-        self._int_tmp = RORegBit(self._i2c, self._dev_addr, Register.INT_STS, 1, 1, '>B')
-        self._int_fifo_full = RORegBit(self._i2c, self._dev_addr, Register.INT_STS, 1, 2, '>B')
-        self._fifo_empty = RORegBit(self._i2c, self._dev_addr, Register.FIFO_STS, 1, 0, '>B')
-        self._fifo_full = RORegBit(self._i2c, self._dev_addr, Register.FIFO_STS, 1, 1, '>B')
-        self._soft_rst = RWRegBits(self._i2c, self._dev_addr, Register.RESET, 1, 0, 3, '>B')
-        self._fifo_flush = RWRegBit(self._i2c, self._dev_addr, Register.RESET, 1, 7, '>B')
-        self._prod_id = RWRegBits(self._i2c, self._dev_addr, Register.PRODUCT_ID, 1, 0, 3, '>B')
-        self._rev_id = RWRegBits(self._i2c, self._dev_addr, Register.RESET, 1, 4, 7, '>B')
-        
         print('DPS310 found at', hex(Register.DEV_ADR))
-        self._pm_rate.__set__(Rate.RATE_1)
-        self._tmp_rate.__set__(Rate.RATE_1)
-        self._pm_prc.__set__(0)
-        self._tm_prc.__set__(0)
-        self._meas_ctrl.__set__(7)
+        
+        # PRS_CFG, TMP_CFG and MEAS_CFG in one burst write
+        with self.configure():
+            self._pm_rate = Rate.RATE_1
+            self._tmp_rate = Rate.RATE_1
+            self._pm_prc = 0
+            self._tm_prc = 0
+            self._meas_ctrl = 7
         
         # Wait for Sensor Ready FLAG
-        while(self._sensor_rdy.__get__() == 0):
-            print('DPS310 Not Ready')
-            sleep(0.5)
+        wait_until(self, '_sensor_rdy', 1, DPS310.READY_TIMEOUT_MS)
         print('DPS310 Initialized')        
 
         self.set_coefficients()
         self.set_k()
     
     
+    def configure(self):
+        # Defer register writes until the with block exits
+        return Configure(self)
+    
+    def status(self):
+        """
+        Returns all status flags in one I2C read:
+        [prs_rdy, tmp_rdy, sensor_rdy, coef_rdy, int_prs, int_tmp, int_fifo_full, fifo_empty, fifo_full]
+        """
+        return self._status
+    
     def readings(self):
         self.set_readings()
         
@@ -155,13 +187,18 @@ class DPS310:
         return (pres_calc/68.948, temp_scaled)
         
     def set_readings(self):
-        # Read RAW data from pressure and temperature registers
-        self._readings = self._i2c.readfrom_mem(self._dev_addr, Register.PSR_B2, 6)
-        self._readings = struct.unpack('>BBBBBB', self._readings)        
-        
-        # Assemble values
-        self._pressure = (self._readings[0]<<16) + (self._readings[1]<<8) + self._readings[2]
-        self._temperature = (self._readings[3]<<16) + (self._readings[4]<<8) + self._readings[5]
+        # Block buffer is reused by the next read of this device, assemble under the bus lock
+        lock = bus_lock(self._i2c)
+        lock.acquire()
+        try:
+            # Read RAW data from pressure and temperature registers
+            self._readings = self._raw_readings
+            
+            # Assemble values
+            self._pressure = (self._readings[0]<<16) + (self._readings[1]<<8) + self._readings[2]
+            self._temperature = (self._readings[3]<<16) + (self._readings[4]<<8) + self._readings[5]
+        finally:
+            lock.release()
         
         # Convert to 2's compliment
         self._pressure = self.nbit2comp(self._pressure)
@@ -172,11 +209,9 @@ class DPS310:
         # Read out coef registers and assemble values
         print('\n', '=== Setting Coefficients ===')
         # Wait for Coef Ready FLAG 
-        while(self._coef_rdy.__get__() == 0):
-            sleep(0.5)
+        wait_until(self, '_coef_rdy', 1, DPS310.READY_TIMEOUT_MS)
             
-        reg_values = self._i2c.readfrom_mem(self._dev_addr, Register.COEF_0x10, 18)
-        reg_values = struct.unpack('>BBBBBBBBBBBBBBBBBB', reg_values)
+        reg_values = self._raw_coefficients
         
         """
         for val in range(0, len(reg_values)):
@@ -259,8 +294,8 @@ class DPS310:
     def set_k(self):
         # Set kp & kt
         print('\n=== Setting kt / kp ===')
-        osr_p = self._pm_prc.__get__()
-        osr_t = self._tm_prc.__get__()
+        osr_p = self._pm_prc
+        osr_t = self._tm_prc
          
         print('OSR P T: ',osr_p, osr_t)
         
@@ -1,5 +1,5 @@
 from machine import I2C
-from register import RORegBit, RWRegBit, RORegStruct, RORegBits, RWRegBits
+from register import RORegBit, RWRegBit, RORegStruct, RORegBits, RWRegBits, Configure
 import struct
 
 class Reg:
@@ -30,33 +30,48 @@ class SQWaveFreq:
     EIGHT_KHZ = const(3)
     
 class DS3231:
+    
+    # Writable configuration, (reg_addr, num_bytes), for register snapshots
+    # Alarms and control, the time keeping registers are left alone
+    CONFIG_REGISTERS = ((Reg.A1_SEC, 8),
+                        (Reg.OFFSET, 1))
+    
+    # Heap bytes allowed per call once warmed up, checked by alloctrace
+    # unpack tuple, 5 number strings and the result string
+    ALLOC_BUDGETS = {'rtc_clock': 544}
+    
+    # === Register objects ===
+    _A1IE = RWRegBit(Reg.CTRL, 1, 0, '>B')
+    _A2IE = RWRegBit(Reg.CTRL, 1, 1, '>B')
+    _INTCN = RWRegBit(Reg.CTRL, 1, 2, '>B')
+    _RS = RWRegBits(Reg.CTRL, 1, 3, 4, '>B')
+    _CONV = RWRegBit(Reg.CTRL, 1, 5, '>B', volatile=True)
+    _BBSQW = RWRegBit(Reg.CTRL, 1, 6, '>B')
+    _EOSC = RWRegBit(Reg.CTRL, 1, 7, '>B')
+    
+    _A1F = RWRegBit(Reg.CTRL_STS, 1, 0, '>B', volatile=True)
+    _A2F = RWRegBit(Reg.CTRL_STS, 1, 1, '>B', volatile=True)
+    _BSY = RWRegBit(Reg.CTRL_STS, 1, 2, '>B', volatile=True)
+    _EN32kHz = RWRegBit(Reg.CTRL_STS, 1, 3, '>B', volatile=True)
+    _OSF = RWRegBit(Reg.CTRL_STS, 1, 7, '>B', volatile=True)
+    
+    _offset = RORegStruct(Reg.OFFSET, 1, '>b')
+    _temp = RORegStruct(Reg.TEMP_H, 2, '>h')
+    
     def __init__(self, i2c, addr=0x68):
         self._i2c = i2c
         self._dev_addr = addr
         self._clock_buf = bytearray(7)
-                
-        self._A1IE = RWRegBit(self._i2c, self._dev_addr, Reg.CTRL, 1, 0, '>B')
-        self._A2IE = RWRegBit(self._i2c, self._dev_addr, Reg.CTRL, 1, 1, '>B')
-        self._INTCN = RWRegBit(self._i2c, self._dev_addr, Reg.CTRL, 1, 2, '>B')
-        self._RS = RWRegBits(self._i2c, self._dev_addr, Reg.CTRL, 1, 3, 4, '>B')
-        self._CONV = RWRegBit(self._i2c, self._dev_addr, Reg.CTRL, 1, 5, '>B')
-        self._BBSQW = RWRegBit(self._i2c, self._dev_addr, Reg.CTRL, 1, 6, '>B')
-        self._EOSC = RWRegBit(self._i2c, self._dev_addr, Reg.CTRL, 1, 7, '>B')
-        
-        self._A1F = RWRegBit(self._i2c, self._dev_addr, Reg.CTRL, 1, 0, '>B')
-        self._A2F = RWRegBit(self._i2c, self._dev_addr, Reg.CTRL, 1, 1, '>B')
-        self._BSY = RWRegBit(self._i2c, self._dev_addr, Reg.CTRL, 1, 2, '>B')
-        self._EN32kHz = RWRegBit(self._i2c, self._dev_addr, Reg.CTRL, 1, 3, '>B')
-        self._OSF = RWRegBit(self._i2c, self._dev_addr, Reg.CTRL, 1, 7, '>B')
-        
-        self._offset = RORegStruct(self._i2c, self._dev_addr, Reg.OFFSET, 1, '>b')
-        self._temp = RORegStruct(self._i2c, self._dev_addr, Reg.TEMP_H, 2, '>h')
         
         print('DS3231 found at', hex(self._dev_addr))
+        
+    def configure(self):
+        # Defer register writes until the with block exits
+        return Configure(self)
 
     @property
     def temperature(self):
-        return ((self._temp.__get__()>>6)*0.25)
+        return ((self._temp>>6)*0.25)
     
     @staticmethod
     def comp_seconds(data):
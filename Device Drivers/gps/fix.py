@@ -0,0 +1,191 @@
+from micropython import const
+
+# Sentence bits
+_GGA = const(1)
+_RMC = const(2)
+_GSA = const(4)
+_VTG = const(8)
+
+# Sentences carrying the UTC time of their epoch
+_TIMED = const(3)
+
+# Index of each value in Fix.__slots__
+_UTC = const(0)
+_DATE = const(1)
+_VALID = const(2)
+_LATITUDE = const(3)
+_LONGITUDE = const(4)
+_ALTITUDE = const(5)
+_SPEED = const(6)
+_COURSE = const(7)
+_QUALITY = const(8)
+_MODE = const(9)
+_SATELLITES = const(10)
+_PDOP = const(11)
+_HDOP = const(12)
+_VDOP = const(13)
+_TICKS = const(14)
+
+class Fix:
+    """
+    Everything the receiver reported for one epoch, one UTC timestamp,
+    merged from GGA, RMC, GSA and VTG.  A new Fix is made per epoch and
+    never changed by the assembler, so a reference can be kept without
+    copying.  Treat it as read only, nothing stops an assignment.  Values
+    no received sentence provided are None.
+
+    ticks_us is the local ticks_us value at utc_ms when a PPS pulse
+    disciplines the clock, for lining the fix up with other samples.
+    """
+    __slots__ = ('utc_ms', 'date', 'valid', 'latitude_udeg', 'longitude_udeg',
+                 'altitude_mm', 'speed_mm_s', 'course_cdeg', 'fix_quality', 'fix_mode',
+                 'satellites', 'pdop_x100', 'hdop_x100', 'vdop_x100', 'ticks_us')
+
+    def __init__(self, values):
+        self.utc_ms = values[_UTC]
+        self.date = values[_DATE]
+        self.valid = values[_VALID]
+        self.latitude_udeg = values[_LATITUDE]
+        self.longitude_udeg = values[_LONGITUDE]
+        self.altitude_mm = values[_ALTITUDE]
+        self.speed_mm_s = values[_SPEED]
+        self.course_cdeg = values[_COURSE]
+        self.fix_quality = values[_QUALITY]
+        self.fix_mode = values[_MODE]
+        self.satellites = values[_SATELLITES]
+        self.pdop_x100 = values[_PDOP]
+        self.hdop_x100 = values[_HDOP]
+        self.vdop_x100 = values[_VDOP]
+        self.ticks_us = values[_TICKS]
+
+    @property
+    def utc_seconds(self):
+        return None if self.utc_ms is None else self.utc_ms // 1000
+
+    @property
+    def latitude(self):
+        # Float degrees
+        return None if self.latitude_udeg is None else self.latitude_udeg / 1_000_000
+
+    @property
+    def longitude(self):
+        # Float degrees
+        return None if self.longitude_udeg is None else self.longitude_udeg / 1_000_000
+
+    def __repr__(self):
+        return 'Fix(%s)' % ', '.join('%s=%r' % (name, getattr(self, name)) for name in Fix.__slots__)
+
+class FixAssembler:
+    """
+    Groups sentences by UTC timestamp and hands one Fix per epoch to
+    publish.  An epoch is published as soon as every expected sentence
+    type arrived, or, incomplete, when a sentence with the next
+    timestamp arrives first.  GSA and VTG carry no time and join the
+    epoch being assembled.  A GGA or RMC of an epoch already published
+    arrived too late and is dropped.
+
+    stamp(utc_ms), when given, returns the local ticks_us of the epoch,
+    i.e. PPSClock.ticks_at, or None.
+    """
+    SENTENCES = {'GGA': _GGA, 'RMC': _RMC, 'GSA': _GSA, 'VTG': _VTG}
+
+    def __init__(self, publish, stamp=None):
+        self._publish = publish
+        self._stamp = stamp
+        self._values = [None] * len(Fix.__slots__)
+        self._utc = None
+        self._published = None
+        self._seen = 0
+
+        # Sentence bits that complete an epoch
+        self._expected = _GGA | _RMC | _GSA | _VTG
+
+        # Epochs published before every expected sentence arrived
+        self.partial = 0
+
+        # Sentences dropped, their epoch was already published
+        self.late = 0
+
+    def expect(self, names):
+        # Sentence types the receiver sends and the GPS parses
+        expected = 0
+        for name in names:
+            expected |= self.SENTENCES.get(name, 0)
+        self._expected = expected
+
+    def gga(self, gga):
+        if not self._start(gga.utc_ms):
+            return
+        values = self._values
+        values[_LATITUDE] = gga.latitude_udeg
+        values[_LONGITUDE] = gga.longitude_udeg
+        values[_ALTITUDE] = gga.altitude_mm
+        values[_QUALITY] = gga.fix_quality
+        values[_SATELLITES] = gga.satellites
+        values[_HDOP] = gga.hdop_x100
+        if values[_VALID] is None and gga.fix_quality is not None:
+            values[_VALID] = gga.fix_quality > 0
+        self._add(_GGA)
+
+    def rmc(self, rmc):
+        if not self._start(rmc.utc_ms):
+            return
+        values = self._values
+        values[_DATE] = rmc.date
+        values[_VALID] = rmc.valid
+        values[_LATITUDE] = rmc.latitude_udeg
+        values[_LONGITUDE] = rmc.longitude_udeg
+        values[_SPEED] = rmc.speed_mm_s
+        values[_COURSE] = rmc.course_cdeg
+        self._add(_RMC)
+
+    def gsa(self, gsa):
+        values = self._values
+        values[_MODE] = gsa.fix_mode
+        values[_PDOP] = gsa.pdop_x100
+        values[_HDOP] = gsa.hdop_x100
+        values[_VDOP] = gsa.vdop_x100
+        if values[_SATELLITES] is None:
+            values[_SATELLITES] = gsa.satellites_used
+        self._add(_GSA)
+
+    def vtg(self, vtg):
+        values = self._values
+        values[_SPEED] = vtg.speed_mm_s
+        values[_COURSE] = vtg.course_cdeg
+        self._add(_VTG)
+
+    def _start(self, utc):
+        # A new timestamp ends the epoch before it, complete or not
+        if utc is None or utc == self._utc:
+            return True
+        if utc == self._published:
+            self.late += 1
+            return False
+        if self._seen & _TIMED:
+            self.partial += 1
+            self._flush()
+        self._utc = utc
+        self._values[_UTC] = utc
+        return True
+
+    def _add(self, bit):
+        self._seen |= bit
+        if self._seen & self._expected == self._expected:
+            self._flush()
+
+    def _flush(self):
+        if self._stamp is not None:
+            self._values[_TICKS] = self._stamp(self._values[_UTC])
+        fix = Fix(self._values)
+
+        # Untimed sentences that arrive next belong to the next epoch
+        values = self._values
+        index = len(values)
+        while index > 0:
+            index -= 1
+            values[index] = None
+        self._seen = 0
+        self._published = self._utc
+        self._utc = None
+        self._publish(fix)
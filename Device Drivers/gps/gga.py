@@ -1,63 +1,141 @@
-class GGA:
+from gps.sentence import Sentence
+
+class GGA(Sentence):
     # Global Positioning System Fixed Data. Time, Position and fix related data
-    def __init__(self):
-        self._data = []
-        
-    def set_data(self, gga_nmea_sentence):
-        # Stores latest gga_nmea data - must be checked PRIOR to this call
-        self._data = gg_nmea_sentence
-        
+    
     def get_messageid(self):
-        return self._data[0]
+        return self.field(0)
     
     def get_utctime(self):
         # hhmmss.sss
-        return self._data[1]
+        return self.field(1)
     
     def get_latitude(self):
         #ddmm.mmmm
-        return self._data[2]
+        return self.field(2)
     
     def get_ns_ind(self):
         # N/S Indicator N N=north or S=south
-        return self._data[3]
+        return self.field(3)
     
     def get_long(self):
         # ddmm.mmmm
-        return self._data[4]
+        return self.field(4)
     
-    def get_ns_ind(self):
+    def get_ew_ind(self):
         # E/W Indicator E E=east or W=west
-        return self._data[5]
+        return self.field(5)
     
     def get_posfix_ind(self):
         # Position Fix Indicator 1 See Table-4
-        return self._data[6]
+        return self.field(6)
     
     def get_numsats(self):
         # Satellites Used 10 Range 0 to 14
-        return self._data[7]
+        return self.field(7)
     
     def get_horizdil(self):
         # DDOP 1.00 Horizontal Dilution of Precision
-        return self._data[8]
+        return self.field(8)
     
     def get_altitudemsl(self):
         # MSL Altitude 8.8 meters Antenna Altitude above/below mean-sea-level
-        return self_data[9]
+        return self.field(9)
     
     def get_altunits(self):
         # Units M meters Units of antenna altitude
-        return self._data[10]
+        return self.field(10)
     
     def get_geoidsep(self):
         # Geoidal Separation
-        return self._data[11]
+        return self.field(11)
     
     def get_geoidunits(self):
         # Units M meters Units of geoids separation
-        return self._data[12]
+        return self.field(12)
     
     def get_agediffcorr(self):
         # Age of Diff. Corr. second Null fields when DGPS is not used
-        return self._data[13]
+        return self.field(13)
+    
+    # === Typed values, decoded once per sentence ===
+    def _decode(self):
+        self._utc = self._utc_ms(1)
+        self._latitude_udeg = self._coordinate(2, 3)
+        self._longitude_udeg = self._coordinate(4, 5)
+        self._fix_quality = self._fixed(6, 0)
+        self._satellites = self._fixed(7, 0)
+        self._hdop = self._fixed(8, 2)
+        self._altitude_mm = self._fixed(9, 3)
+        self._geoid_separation_mm = self._fixed(11, 3)
+
+    @property
+    def utc_ms(self):
+        # Milliseconds since midnight UTC
+        self._typed()
+        return self._utc
+    
+    @property
+    def utc_seconds(self):
+        # Seconds since midnight UTC
+        self._typed()
+        if self._utc is None:
+            return None
+        return self._utc // 1000
+
+    @property
+    def latitude_udeg(self):
+        # Signed micro-degrees, north positive
+        self._typed()
+        return self._latitude_udeg
+    
+    @property
+    def longitude_udeg(self):
+        # Signed micro-degrees, east positive
+        self._typed()
+        return self._longitude_udeg
+    
+    @property
+    def latitude(self):
+        # Float degrees
+        self._typed()
+        if self._latitude_udeg is None:
+            return None
+        return self._latitude_udeg / 1_000_000
+    
+    @property
+    def longitude(self):
+        # Float degrees
+        self._typed()
+        if self._longitude_udeg is None:
+            return None
+        return self._longitude_udeg / 1_000_000
+
+    @property
+    def fix_quality(self):
+        # 0 invalid, 1 GPS, 2 DGPS
+        self._typed()
+        return self._fix_quality
+    
+    @property
+    def satellites(self):
+        # Satellites used
+        self._typed()
+        return self._satellites
+    
+    @property
+    def hdop_x100(self):
+        # Horizontal dilution of precision, hundredths
+        self._typed()
+        return self._hdop
+    
+    @property
+    def altitude_mm(self):
+        # Above mean sea level
+        self._typed()
+        return self._altitude_mm
+    
+    @property
+    def geoid_separation_mm(self):
+        self._typed()
+        return self._geoid_separation_mm
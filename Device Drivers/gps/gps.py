@@ -1,5 +1,7 @@
 # Pystd & uPystd
 from machine import UART, Pin
+from array import array
+from time import ticks_us, ticks_diff
 import time
 
 # GPS
@@ -8,6 +10,10 @@ from gps.rmc import RMC
 from gps.gsa import GSA
 from gps.gsv import GSV
 from gps.vtg import VTG
+from gps.nmea import NMEAStream, sentence_key
+from gps.fix import FixAssembler
+from gps.pmtk import PMTK
+from gps.pps import PPSClock
 
 class Datum:
     #  330 PMTK_API_SET_DATUM
@@ -49,6 +55,21 @@ class GPS:
     """
     MAX_PACKET_LENGTH = 255
     
+    # Heap bytes allowed per call once warmed up, checked by alloctrace
+    # A Fix when the sentence completes an epoch, 8 ints above 256 on CPython
+    ALLOC_BUDGETS = {'sort_sentence': 512}
+    
+    # Sentence type: parser, dispatched on talker + type
+    SENTENCES = {
+        'PMTK': 'parse_pmtk',
+        'GGA': 'parse_gga',
+        'RMC': 'parse_rmc',
+        'VTG': 'parse_vtg',
+        'GSA': 'parse_gsa',
+        'GSV': 'parse_gsv',
+    }
+    TALKERS = ('GP', 'GN')
+    
     PREAMBLE = '$'
     TALKERID = 'PMTK'
     
@@ -99,7 +120,7 @@ class GPS:
     END_OF_PACKET = '\r\n'
     
     
-    def __init__(self, uart, fix_pin, pps_pin, en_pin):
+    def __init__(self, uart, fix_pin, pps_pin, en_pin, sentences=None):
         
         # Class data
         self._uart = uart
@@ -117,8 +138,37 @@ class GPS:
         self._gga = GGA()
         self._rmc = RMC()
         self._vtg = VTG()
+        self._gsa = GSA()
         self._gsv = GSV()
         
+        # ticks_us latched at the PPS edge, named by the next whole second
+        self._pps = PPSClock(pps_pin)
+        
+        # GGA, RMC, GSA and VTG of one epoch merged into a Fix
+        self._fix = None
+        self._fix_callback = None
+        self._fix_flag = None
+        self._fixes = FixAssembler(self._publish_fix, self._pps.ticks_at)
+        
+        # sentence_key: slot, subscribed sentences only
+        self._dispatch = {}
+        
+        # Per slot, one slot per sentence type
+        self._types = list(GPS.SENTENCES)
+        self._parsers = [getattr(self, GPS.SENTENCES[name]) for name in self._types]
+        self._parse_count = array('L', [0] * len(self._types))
+        self._parse_us = array('L', [0] * len(self._types))
+        
+        # PMTK always, acks and system messages
+        self.subscribe('PMTK', *(self._types if sentences is None else sentences))
+        
+        # Commands, acks come back through parse_ack while update() runs
+        self._pmtk = PMTK(uart, self.update)
+        
+        # Checksum validated sentences go straight to sort_sentence, the stream
+        # drops unsubscribed ones by their header
+        self._stream = NMEAStream(uart, self.sort_sentence, GPS.MAX_PACKET_LENGTH, accept=self._dispatch)
+        
         # Pin definitions
         """
         self._pps = Pin(PULSE_PERSECOND, Pin.IN)
@@ -151,6 +201,14 @@ class GPS:
             # Error Handling
             pass
         
+    def update(self):
+        # Parse everything in the UART buffer, returns number of sentences
+        return self._stream.poll()
+    
+    def feed(self, data):
+        # Parse raw bytes received some other way
+        return self._stream.feed(data)
+        
     def printall(self):
         print(self.readall())
         
@@ -166,104 +224,138 @@ class GPS:
         self._data_ready = False
     
     def send_command(self, packet_type, data:str = ''):
-        checksum_packet = GPS.TALKERID + packet_type + data
-        command_packet = GPS.PREAMBLE + checksum_packet + GPS.STAR + self.calc_checksum(checksum_packet) + GPS.END_OF_PACKET
-
-        self._uart.write(command_packet)
+        # Framed packets are cached, data is the fields after packet_type
+        self._pmtk.send(packet_type, data)
+        
+    def send_and_confirm(self, packet_type, data:str = '', timeout_ms=1000, retries=2):
+        # Blocks until $PMTK001 answers, returns its flag, PMTKTimeout when it never does
+        return self._pmtk.send_and_confirm(packet_type, data, timeout_ms, retries)
+    
+    async def send_and_confirm_async(self, packet_type, data:str = '', timeout_ms=1000, retries=2):
+        return await self._pmtk.send_and_confirm_async(packet_type, data, timeout_ms, retries)
             
     def flush(self):
         self._uart.flush()
     
+    def set_baudrate(self, baudrate):
+        # Host side only, the receiver is switched with PMTK251
+        self._uart.init(baudrate=baudrate)
+        
+        # Anything received at the old rate is garbage now
+        while self._uart.any() > 0:
+            self._uart.read()
+        self._stream.reset()
+    
     def enable(self):
         self._en_pin.on()
         
     def disable(self):
         self._en_pin.off()
         
+    def _keys(self, name):
+        # Every sentence_key a sentence type arrives under
+        if name == 'PMTK':
+            return [sentence_key('PMTK%d' % digit) for digit in range(0, 10)]
+        return [sentence_key(talker + name) for talker in GPS.TALKERS]
+        
+    def subscribe(self, *names):
+        # Parse these sentence types, i.e. subscribe('GGA', 'RMC')
+        for name in names:
+            slot = self._types.index(name)
+            for key in self._keys(name):
+                self._dispatch[key] = slot
+        self._fixes.expect(self.subscribed)
+                
+    def unsubscribe(self, *names):
+        # Drop these sentence types at the header, PMTK can not be dropped
+        for name in names:
+            if name != 'PMTK':
+                for key in self._keys(name):
+                    self._dispatch.pop(key, None)
+        self._fixes.expect(self.subscribed)
+    
+    @property
+    def subscribed(self):
+        return [name for slot, name in enumerate(self._types) if slot in self._dispatch.values()]
+    
+    def parse_stats(self):
+        # {type: (sentences, total parse us)} since the last reset_stats
+        return {name: (self._parse_count[slot], self._parse_us[slot]) for slot, name in enumerate(self._types)}
+    
+    def reset_stats(self):
+        for slot in range(0, len(self._types)):
+            self._parse_count[slot] = 0
+            self._parse_us[slot] = 0
+        
     def sort_sentence(self, sentence):
         """
-        This function takes in a checksum verified NMEA sentence and forwards it to the appropriate
-        function to store the data in the class.
+        This function takes in a checksum verified NMEA sentence, as bytes or a memoryview
+        from '$' to '*' exclusive, and forwards it to the parser its talker + type is
+        subscribed to.  Returns False for unknown or unsubscribed sentences.
         """
+        slot = self._dispatch.get(sentence_key(sentence), -1)
+        if slot < 0:
+            return False
         
-        fragment_small = sentence[2:5]
-        fragment_large = sentence[0:4]
-        fragment_large_id = sentence[4:7]
+        start = ticks_us()
+        self._parsers[slot](sentence)
+        self._parse_us[slot] += ticks_diff(ticks_us(), start)
+        self._parse_count[slot] += 1
+        return True
         
-        if fragment_large == 'PMTK':
-            # Ack, System Message, or other output from hardware
-            if fragment_large_id == '001':
-                # Ack
-                self.parse_ack(sentence)
-                
-            elif fragment_large_id == '010':
-                # System Message
-                self.parse_sys_msg(sentence)
-                
-            elif fragment_large_id == '011':
-                # Text Message
-                #self.parse_sys_msg(sentence)
-                pass
-            
-        elif fragment_small == 'GGA' :
-            # Time, position and fix type data
-            self.parse_gga(sentence)
-            
-        elif fragment_small == 'RMC':
-            # Time, date, position, course and speed data. Recommended Minimum Navigation Information.
-            self.parse_rmc(sentence)
+    def parse_pmtk(self, sentence):
+        # Ack, System Message, or other output from hardware
+        packet_type = bytes(sentence[4:7])
+        
+        if packet_type == b'001':
+            # Ack
+            self.parse_ack(sentence)
             
-        elif fragment_small == 'VTG':
-             # Course and speed information relative to the ground.
-            self.parse_vtg(sentence)
+        elif packet_type == b'010':
+            # System Message
+            self.parse_sys_msg(sentence)
             
-        elif fragment_small == 'GSA':
-             # GPS receiver operating mode, active satellites used in the position solution and DOP values.
-             self.parse_gsa(sentence)
-             
-        elif fragment_small == 'GSV':
-             # The number of GPS satellites in view satellite ID numbers, elevation, azimuth, and SNR values.
-             self.parse_gsv(sentence)            
-        else:
-            # Incomplete/Unknown NMEA Sentence
-            return False
+        elif packet_type == b'011':
+            # Text Message
+            self.parse_txt_msg(sentence)
         
     def parse_ack(self, sentence):           
         # Process acknowledgment messages
-        pass
+        self._pmtk.ack(sentence)
         
     def parse_sys_msg(self, sentence):           
         # Process system messages
         pass
     
-    def parse_sys_msg(self, sentence):           
+    def parse_txt_msg(self, sentence):           
         # Process text messages
         pass
         
     def parse_gga(self, sentence):
-        # Parse GGA data into sub components
-        self._last_gga = sentence.split(',')
-        #print('GGA stored in memory')
+        # Copy GGA data and index its fields, getters convert on demand
+        if self._gga.set_data(sentence):
+            self._pps.pair(self._gga.utc_ms)
+            self._fixes.gga(self._gga)
         
     def parse_rmc(self, sentence):
-        # Parse RMC data into sub components
-        self._last_rmc = sentence.split(',')
-        #print('RMC stored in memory')
+        # Copy RMC data and index its fields, getters convert on demand
+        if self._rmc.set_data(sentence):
+            self._pps.pair(self._rmc.utc_ms)
+            self._fixes.rmc(self._rmc)
         
     def parse_vtg(self, sentence):
-        # Parse VTG data into sub components
-        self._last_vtg = sentence.split(',')
-        #print('VTG stored in memory')
+        # Copy VTG data and index its fields, getters convert on demand
+        if self._vtg.set_data(sentence):
+            self._fixes.vtg(self._vtg)
         
     def parse_gsa(self, sentence):
-        # Parse GSA data into sub components
-        self._last_gsa = sentence.split(',')
-        #print('GSA stored in memory')
+        # Copy GSA data and index its fields, getters convert on demand
+        if self._gsa.set_data(sentence):
+            self._fixes.gsa(self._gsa)
         
     def parse_gsv(self, sentence):
-        # Parse GSV data into sub components
-        self._last_gsv = sentence.split(',')
-        #print('GSV stored in memory')
+        # Assemble GSV sequence into the satellite table
+        self._gsv.set_data(sentence)
     
     def verify_output(self, sentence):
         try:
@@ -305,6 +397,67 @@ class GPS:
         
         return checksum
     
+    def _publish_fix(self, fix):
+        # Once per epoch from FixAssembler
+        self._fix = fix
+        if self._fix_callback is not None:
+            self._fix_callback(fix)
+        if self._fix_flag is not None:
+            self._fix_flag.set()
+    
+    def on_fix(self, callback):
+        # callback(fix) once per epoch, None to stop
+        # Runs inside update(), send commands with send_command, not send_and_confirm
+        self._fix_callback = callback
+    
+    async def next_fix(self):
+        # uasyncio, wait for the next epoch and return its Fix
+        import uasyncio
+        
+        if self._fix_flag is None:
+            self._fix_flag = uasyncio.ThreadSafeFlag()
+        await self._fix_flag.wait()
+        return self._fix
+    
+    @property
+    def stream(self):
+        # NMEAStream, sentence and checksum error counters
+        return self._stream
+    
+    @property
+    def pmtk(self):
+        return self._pmtk
+    
+    @property
+    def pps(self):
+        # PPSClock, utc() stamps any ticks_us value
+        return self._pps
+    
+    @property
+    def fix(self):
+        # Latest complete epoch, None before the first
+        return self._fix
+    
+    @property
+    def gga(self):
+        return self._gga
+    
+    @property
+    def rmc(self):
+        return self._rmc
+    
+    @property
+    def vtg(self):
+        return self._vtg
+    
+    @property
+    def gsa(self):
+        return self._gsa
+    
+    @property
+    def gsv(self):
+        return self._gsv
+    
     def cold_restart(self):
         self.send_command(GPS.PMTK_CMD_FULL_COLD_START,)
         return True
@@ -326,7 +479,7 @@ class GPS:
     
     def standby_enable(self):
         # Device stop updating data, UART continues to populate - saves power
-        self.send_command(PMTK_CMD_STANDBY_MODE, 0*28)
+        self.send_command(GPS.PMTK_CMD_STANDBY_MODE, '0')
         
     def standby_disable(self):
         # Device returns to configured operation
@@ -1,83 +1,122 @@
-class GSA:
+from gps.sentence import Sentence
+
+class GSA(Sentence):
     # GPS DOP and Active Satellites
-    def __init__(self):
-        self._data = []
-        
-    def set_data(self, nmea_sentence):
-        self._data = nmea_sentence
-        
+    
     def get_messageid(self):
-        return self._data[0]
+        return self.field(0)
     
     def get_mode1(self):
         # M - Manual—forced to operate in 2D or 3D mode
         # A - 2D Automatic—allowed to automatically switch 2D/3D
-        return self._data[1]
+        return self.field(1)
     
     def get_mode2(self):
         # 1 - Fix not available
         # 2 - 2D (＜4 SVs used)
         # 3 - 3D (≧4 SVs used)
-        return self._data[2]
+        return self.field(2)
     
     def get_sat1(self):
         # Satelite # for channel 1
-        return self._data[3]
+        return self.field(3)
     
     def get_sat2(self):
         # Satelite # for channel 2
-        return self._data[4]
+        return self.field(4)
     
     def get_sat3(self):
         # Satelite # for channel 3
-        return self._data[5]
+        return self.field(5)
     
     def get_sat4(self):
         # Satelite # for channel 4
-        return self._data[6]
+        return self.field(6)
     
     def get_sat5(self):
         # Satelite # for channel 5
-        return self._data[7]
+        return self.field(7)
     
     def get_sat6(self):
         # Satelite # for channel 6
-        return self._data[8]
+        return self.field(8)
     
     def get_sat7(self):
         # Satelite # for channel 7
-        return self._data[9]
+        return self.field(9)
     
     def get_sat8(self):
         # Satelite # for channel 8
-        return self._data[10]
+        return self.field(10)
     
     def get_sat9(self):
         # Satelite # for channel 9
-        return self._data[11]
+        return self.field(11)
     
     def get_sat10(self):
         # Satelite # for channel 10
-        return self._data[12]
+        return self.field(12)
     
     def get_sat11(self):
         # Satelite # for channel 11
-        return self._data[13]
+        return self.field(13)
     
     def get_sat12(self):
         # Satelite # for channel 12
-        return self._data[14]
+        return self.field(14)
     
     def get_pdop(self):
         # Position Dilution of Precision
-        return self._data[15]
+        return self.field(15)
     
     def get_hdop(self):
         # Horizontal Dilution of Precision
-        return self._data[16]
+        return self.field(16)
     
     def get_vdop(self):
         # Vertical Dilution of Precision
-        return self._data[17]
+        return self.field(17)
     
-    
\ No newline at end of file
+    # === Typed values, decoded once per sentence ===
+    def _decode(self):
+        self._fix_mode = self._fixed(2, 0)
+        
+        # Channels 1 to 12 in fields 3 to 14
+        used = 0
+        index = 3
+        while index < 15:
+            if not self.field_empty(index):
+                used += 1
+            index += 1
+        self._satellites_used = used
+        
+        self._pdop = self._fixed(15, 2)
+        self._hdop = self._fixed(16, 2)
+        self._vdop = self._fixed(17, 2)
+    
+    @property
+    def fix_mode(self):
+        # 1 no fix, 2 2D, 3 3D
+        self._typed()
+        return self._fix_mode
+    
+    @property
+    def satellites_used(self):
+        self._typed()
+        return self._satellites_used
+    
+    @property
+    def pdop_x100(self):
+        # Dilution of precision, hundredths
+        self._typed()
+        return self._pdop
+    
+    @property
+    def hdop_x100(self):
+        self._typed()
+        return self._hdop
+    
+    @property
+    def vdop_x100(self):
+        self._typed()
+        return self._vdop
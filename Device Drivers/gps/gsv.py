@@ -1,35 +1,151 @@
+from array import array
+from gps.sentence import Sentence
 from gps.satellite import Satellite
 
-class GSV:
-    # Satellites in View
+class _Table:
+    # One complete set of satellites in view, parallel arrays by slot
+    __slots__ = ('prn', 'elevation', 'azimuth', 'snr', 'slot', 'count', 'in_view')
+
+    def __init__(self, size):
+        self.prn = bytearray(size)
+        self.elevation = array('b', [0] * size)
+        self.azimuth = array('H', [0] * size)
+        self.snr = bytearray(size)
+
+        # PRN to slot + 1, 0 when not in the table
+        self.slot = bytearray(256)
+        self.count = 0
+        self.in_view = 0
+
+    def clear(self):
+        # Only the PRNs in use have an index entry
+        index = self.count
+        while index > 0:
+            index -= 1
+            self.slot[self.prn[index]] = 0
+        self.count = 0
+        self.in_view = 0
+
+class GSV(Sentence):
+    """
+    GNSS Satellites in View.  A receiver splits the list over m sentences,
+    message n of m.  They are assembled in place into a spare table which
+    is swapped with the published one when message m arrives, so readers
+    never see half a sequence.  Both tables are allocated once.
+
+    Missing values (no elevation/azimuth yet, SNR when not tracking) read 0.
+    Elevation is signed, a satellite below the horizon is reported
+    negative, and kept within -90 to 90.
+    """
+    MAX_SATELLITES = 32
+
     def __init__(self):
-        self._sats = []
-        
+        super().__init__()
+        self._table = _Table(self.MAX_SATELLITES)
+        self._spare = _Table(self.MAX_SATELLITES)
+
+        # Next message number expected, 0 when waiting for message 1
+        self._expected = 0
+
+        # Sequences dropped for a lost or out of order message
+        self.incomplete = 0
+
     def clear_data(self):
         # Clear data
-        self._sats = []
-        
-    def add_satellite(self, nmea_sentence):
-        # Parse nmea_sentence into Satellite objects 
-        sat1 = Satellite(nmea_sentence[4:7])
-        sat2 = Satellite(nmea_sentence[8:11])
-        sat3 = Satellite(nmea_sentence[12:15])
-        
-        # Add satellite objects into list
-        self._sats.append(sat1)
-        self._sats.append(sat2)
-        self._sats.append(sat3)
-        
+        self._table.clear()
+        self._spare.clear()
+        self._expected = 0
+
+    def set_data(self, sentence):
+        # Stores and assembles latest sentence - must be checksum verified PRIOR to this call
+        if not Sentence.set_data(self, sentence):
+            return False
+
+        total = self._fixed(1, 0)
+        number = self._fixed(2, 0)
+        if total is None or number is None:
+            return False
+
+        if number == 1:
+            if self._expected:
+                self.incomplete += 1
+            self._spare.clear()
+        elif number != self._expected:
+            # Lost a message, wait for the next sequence
+            if self._expected:
+                self.incomplete += 1
+            self._expected = 0
+            return False
+
+        in_view = self._fixed(3, 0)
+        self._spare.in_view = 0 if in_view is None else in_view
+
+        # Four fields per satellite from field 4
+        index = 4
+        while index < self._count:
+            self.add_satellite(self._fixed(index, 0), self._fixed(index+1, 0),
+                               self._fixed(index+2, 0), self._fixed(index+3, 0))
+            index += 4
+
+        if number >= total:
+            # Sequence complete, publish in one assignment
+            self._table, self._spare = self._spare, self._table
+            self._expected = 0
+        else:
+            self._expected = number + 1
+        return True
+
+    def add_satellite(self, prn, elevation, azimuth, snr):
+        # Add one satellite to the table being assembled
+        table = self._spare
+        if prn is None or prn > 255 or table.count >= self.MAX_SATELLITES or table.slot[prn]:
+            return False
+        slot = table.count
+        table.prn[slot] = prn
+        table.elevation[slot] = 0 if elevation is None else max(-90, min(90, elevation))
+        table.azimuth[slot] = azimuth or 0
+        table.snr[slot] = snr or 0
+        table.slot[prn] = slot + 1
+        table.count = slot + 1
+        return True
+
+    @property
+    def count(self):
+        # Satellites in the table
+        return self._table.count
+
+    @property
+    def in_view(self):
+        # Satellites in view as reported by the receiver
+        return self._table.in_view
+
     def loc_sat_inlist(self, sat_channel):
-        # Find satelite channel to get data from
+        # Find satelite channel to get data from, None when not in view
         # Satellite ID / Channel (Range 1 to 32)
-        for sat in range(0, len(self._sats)):
-            if self._data[sat].id ==  sat_channel:
-                return sat
-            
+        if not 0 < sat_channel < 256:
+            return None
+        slot = self._table.slot[sat_channel]
+        return slot - 1 if slot else None
+
+    def prn(self, sat_num):
+        return self._table.prn[sat_num]
+
+    def elevation(self, sat_num):
+        # Degrees, -90 to 90, negative below the horizon
+        return self._table.elevation[sat_num]
+
+    def azimuth(self, sat_num):
+        # Degrees true, 0 to 359
+        return self._table.azimuth[sat_num]
+
+    def snr(self, sat_num):
+        # dB-Hz, 0 when not tracking
+        return self._table.snr[sat_num]
+
     def get_sat(self, sat_num):
-        # Returns Satellite object for interaction
-        return self._sats[sat_num]
-        
-        
-    
\ No newline at end of file
+        # Returns Satellite object for interaction, a copy of the table slot
+        table = self._table
+        if sat_num >= table.count:
+            return None
+        return Satellite([table.prn[sat_num], table.elevation[sat_num],
+                          table.azimuth[sat_num], table.snr[sat_num]])
@@ -18,29 +18,24 @@ SDCS = const(3)
 # Define pin objects
 pps = Pin(PPS, Pin.IN)
 fix = Pin(FIX, Pin.IN)
-gps_en_pin = Pin(PPS, Pin.OUT)
+gps_en_pin = Pin(GPS_EN, Pin.OUT)
 cs = Pin(SDCS, Pin.OUT) # 1 - High Impedance, 0 - LO
 
 # IRQ Flag
 data_ready = False
-pps_pulse = False
 
 # Hardware Communication Protocols
 uart = UART(1, 9600, tx = 43 , rx = 44)
 spi = SPI(1, baudrate=400_000, sck=Pin(36), mosi=Pin(35), miso=Pin(37))
 
 # Hardware Peripheral Instantiations
-gps = GPS(uart, 1, 2, gps_en_pin)
+gps = GPS(uart, fix, pps, gps_en_pin)
 
 # Service Routine
 def gps_service_routine(pin_object):
     gps.data_ready = True
-    
-def pps_service_routine(pin_object):
-    pps_pulse = True
   
-# Hardware Interrupts
-pps_interrupt = pps.irq(handler=pps_service_routine, trigger=Pin.IRQ_RISING)
+# Hardware Interrupts, the PPS interrupt belongs to gps.pps
 gps_interrupt = fix.irq(handler=gps_service_routine, trigger=Pin.IRQ_RISING)
 
 def init_gps(gps):
@@ -48,57 +43,27 @@ def init_gps(gps):
     
 def consume_output(gps):
     # Attempt to pull one line from buffer
-    output = gps.read()
-    
-    # If output was present and passes checksum
-    if output != None and gps.verify_output(output) == True:
-        gps.sort_sentence(output)
+    output = gps._uart.readline()
     
-    else:
+    # Sentences that pass checksum are sorted into the class
+    if output == None or gps.feed(output) == 0:
         print('No line consumed')
-        pass
 
 def consume_all_output(gps):
-    # Pull all data from buffer 
-    output = gps.readall()
-    
-    # If buffer empty, skip following code
-    if output == None:
-        return
-    
-    # Split into list of sentences
-    try:
-        output = output.split('$')
-    except:
-        # Error handling
-        pass
-    
-    # Process each sentence in output and store values in class
-    for sentence in range(0, len(output)):
-        # Valid
-        try:
-            if gps.verify_output(output[sentence]) == True:
-                gps.sort_sentence(output[sentence])
-                #print('sorted')
-            
-            # Invalid 
-            else:
-                # Skip sentence and continue
-                #print('skipped')
-                pass
-        except:
-            # Error handling
-            pass
+    # Pull all data from buffer, partial sentences are completed by the next call
+    gps.update()
         
     
 """""""""
 TEST CODE BELOW
 """""""""
 
+pps_edges = 0
+
 while True:
     if gps.data_ready == True:
         consume_all_output(gps)
         gps.data_ready = False
-    if pps_pulse == True:
-        print('pps')
-        pps_pulse = False
\ No newline at end of file
+    if gps.pps.edges != pps_edges:
+        pps_edges = gps.pps.edges
+        print('pps', gps.pps.utc(), gps.pps.drift_ppb)
\ No newline at end of file
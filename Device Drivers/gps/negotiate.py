@@ -0,0 +1,233 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) MicroPython
+    *   2) gps (GPS, pmtk)
+
+    * Purpose:
+        * Bring a MediaTek receiver and the host UART to the fastest
+        * link that works, the requested update rate, and an output set
+        * the link can carry.  Every step is verified on the received
+        * sentences and undone when it does not work.
+
+    * Notes:
+        1) Usage:
+             baudrate, rate_hz, sentences = negotiate(gps, 10, 1, ('RMC', 'GGA', 'GSA'))
+
+           The second rate is the one the receiver runs at now, 1 Hz
+           after power up.  It can not be read back and is what a
+           failed rate step restores, so pass the rate last set.
+
+        2) Steps:
+             detect   - host tries each baud rate until checksum valid
+                        sentences arrive
+             baud     - PMTK251 to each faster rate, fastest first, until
+                        one is clean, back to the last good rate if not
+             output   - sentences, in order of preference, that fit the
+                        link budget at rate_hz, PMTK314 acked
+             rate     - PMTK220 acked and epochs seen at rate_hz
+
+        3) The link budget is LINK_BUDGET of the line rate, against the
+           longest each sentence gets (SENTENCE_BYTES, GSV as a full
+           four message sequence).
+
+        4) PMTK251 is never acked, the baud rate is checked by listening.
+           A failed output step restores the receiver default (PMTK314,-1),
+           a failed rate step the rate it had.
+
+        5) Sentence types GPS parses but the receiver no longer sends are
+           unsubscribed, so Fix epochs do not wait for them.  Nothing is
+           subscribed, types left out with GPS(sentences=...) or
+           unsubscribe() stay out.
+
+"""
+
+from time import ticks_ms, ticks_diff, sleep_ms
+
+from gps.pmtk import ACK_OK, PMTKTimeout
+
+# Fastest first
+BAUDRATES = (115200, 57600, 38400, 19200, 14400, 9600, 4800)
+
+# Longest sentence, '$' to line end
+SENTENCE_BYTES = {
+    'GLL': 52,
+    'RMC': 72,
+    'VTG': 42,
+    'GGA': 82,
+    'GSA': 68,
+    'GSV': 4 * 72,
+}
+
+# PMTK314 field of each sentence, 19 fields in all
+OUTPUT_FIELDS = ('GLL', 'RMC', 'VTG', 'GGA', 'GSA', 'GSV')
+OUTPUT_FIELD_COUNT = 19
+
+# Fraction of the line rate NMEA may use
+LINK_BUDGET = 0.8
+
+# Time to judge a link, longer than one epoch at 1 Hz
+LISTEN_MS = 1500
+
+# Clean means at most one bad checksum in this many good sentences
+ERROR_RATIO = 20
+
+# Receiver needs this long to switch baud rate
+SWITCH_MS = 100
+
+class NegotiationError(RuntimeError):
+    pass
+
+def listen(gps, listen_ms=LISTEN_MS, minimum=2):
+    """ Parse for listen_ms, True when at least minimum clean sentences arrived """
+    stream = gps.stream
+    sentences = stream.sentences
+    errors = stream.checksum_errors
+
+    start = ticks_ms()
+    while ticks_diff(ticks_ms(), start) < listen_ms:
+        gps.update()
+        sleep_ms(10)
+
+    good = stream.sentences - sentences
+    bad = stream.checksum_errors - errors
+    return good >= minimum and bad * ERROR_RATIO <= good
+
+def detect_baudrate(gps, baudrates=BAUDRATES, listen_ms=LISTEN_MS):
+    """ Baud rate the receiver talks at, None when nothing is heard """
+    for baudrate in baudrates:
+        gps.set_baudrate(baudrate)
+        if listen(gps, listen_ms):
+            return baudrate
+    return None
+
+def link_fits(baudrate, rate_hz, sentences):
+    # 10 bits per byte on the wire
+    epoch_bytes = 0
+    for name in sentences:
+        epoch_bytes += SENTENCE_BYTES[name]
+    return epoch_bytes * rate_hz * 10 <= baudrate * LINK_BUDGET
+
+def output_data(sentences):
+    # PMTK314 fields, every epoch for the sentences given
+    fields = ['0'] * OUTPUT_FIELD_COUNT
+    for name in sentences:
+        fields[OUTPUT_FIELDS.index(name)] = '1'
+    return ','.join(fields)
+
+def _switch_baudrate(gps, current, target, listen_ms):
+    # Receiver first, then the host, checked by listening
+    gps.send_command(gps.PMTK_SET_NMEA_BAUDRATE, str(target))
+    gps.flush()
+    sleep_ms(SWITCH_MS)
+    gps.set_baudrate(target)
+    if listen(gps, listen_ms):
+        return True
+
+    # Rollback, the receiver may have switched without a clean link
+    gps.send_command(gps.PMTK_SET_NMEA_BAUDRATE, str(current))
+    gps.flush()
+    sleep_ms(SWITCH_MS)
+    gps.set_baudrate(current)
+    if listen(gps, listen_ms):
+        return False
+
+    # It did not switch, or never went back
+    found = detect_baudrate(gps, (current, target), listen_ms)
+    if found is None:
+        raise NegotiationError('Lost receiver switching to %d baud' % target)
+    if found != current:
+        gps.send_command(gps.PMTK_SET_NMEA_BAUDRATE, str(current))
+        gps.flush()
+        sleep_ms(SWITCH_MS)
+        gps.set_baudrate(current)
+    return False
+
+def _set_output(gps, sentences, listen_ms):
+    try:
+        if gps.send_and_confirm(gps.PMTK_API_SET_NMEA_OUTPUT, output_data(sentences)) == ACK_OK:
+            if listen(gps, listen_ms, 1):
+                return True
+    except PMTKTimeout:
+        pass
+
+    # Rollback to the receiver default
+    try:
+        gps.send_and_confirm(gps.PMTK_API_SET_NMEA_OUTPUT, '-1')
+    except PMTKTimeout:
+        pass
+    return False
+
+def _parsed(gps, timed):
+    # Parse count of each timed sentence, GGA or RMC is one per epoch
+    stats = gps.parse_stats()
+    return [stats[name][0] for name in timed]
+
+def _set_rate(gps, rate_hz, previous_hz, sentences, listen_ms):
+    try:
+        if gps.send_and_confirm(gps.PMTK_SET_NMEA_UPDATERATE, str(1000 // rate_hz)) == ACK_OK:
+            # Epochs are counted on what is both sent and parsed
+            subscribed = gps.subscribed
+            timed = [name for name in ('GGA', 'RMC') if name in sentences and name in subscribed]
+            if not timed:
+                return listen(gps, listen_ms, 1)
+
+            # Three quarters of the epochs expected in listen_ms
+            # Counted from a snapshot, the caller's stats are left alone
+            before = _parsed(gps, timed)
+            listen(gps, listen_ms, 1)
+            after = _parsed(gps, timed)
+            epochs = max(after[index] - before[index] for index in range(0, len(timed)))
+            if epochs * 4000 >= rate_hz * listen_ms * 3:
+                return True
+    except PMTKTimeout:
+        pass
+
+    # Rollback
+    try:
+        gps.send_and_confirm(gps.PMTK_SET_NMEA_UPDATERATE, str(1000 // previous_hz))
+    except PMTKTimeout:
+        pass
+    return False
+
+def negotiate(gps, rate_hz, previous_hz, sentences=('RMC', 'GGA', 'GSA', 'VTG', 'GSV'),
+              baudrates=BAUDRATES, listen_ms=LISTEN_MS):
+    """
+    Detect, then raise the baud rate, trim the output and set rate_hz.
+    previous_hz is the update rate the receiver runs at now, restored
+    when rate_hz does not work.  sentences are in order of preference.
+    Returns (baudrate, rate_hz, sentences) as configured, raises
+    NegotiationError when the receiver can not be heard or no sentence
+    fits the link.
+    """
+    # Every rate is detected, the receiver may be at one we would not use
+    current = detect_baudrate(gps, BAUDRATES, listen_ms)
+    if current is None:
+        raise NegotiationError('No NMEA at any baud rate')
+
+    # Fastest stable rate above the current one
+    for target in baudrates:
+        if target <= current:
+            break
+        if _switch_baudrate(gps, current, target, listen_ms):
+            current = target
+            break
+
+    # Preferred sentences while they fit
+    output = []
+    for name in sentences:
+        if link_fits(current, rate_hz, output + [name]):
+            output.append(name)
+    if not output:
+        raise NegotiationError('No sentence fits %d Hz at %d baud' % (rate_hz, current))
+    if not _set_output(gps, output, listen_ms):
+        raise NegotiationError('Receiver refused output ' + ','.join(output))
+
+    # Epoch waits only for what arrives, the caller's choice is kept
+    gps.unsubscribe(*[name for name in gps.subscribed if name not in output])
+
+    if not _set_rate(gps, rate_hz, previous_hz, output, listen_ms):
+        rate_hz = previous_hz
+
+    return current, rate_hz, tuple(output)
@@ -0,0 +1,222 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) MicroPython
+
+    * Purpose:
+        * Byte level NMEA 0183 / PMTK input stream.  UART data is read
+        * into a preallocated buffer and run through a state machine
+        * that checks the XOR checksum as the bytes arrive, nothing is
+        * decoded to str.
+
+    * Notes:
+        1) Usage:
+             stream = NMEAStream(uart, handler)
+             stream.poll()          # handler(sentence) per valid sentence
+
+        2) handler receives a memoryview of the sentence between '$'
+           and '*', e.g. GPGGA,123519.000,...,M,,  It is only valid
+           during the call, the buffer is reused for the next sentence.
+           The handler may call reset() or raise, the stream stays
+           consistent.  It must not poll() or feed() the same stream,
+           that raises RuntimeError - the nested read would overwrite
+           the sentence being handled.
+
+        3) A sentence cut off at the end of one read is completed by the
+           next.  A '$' always starts a new sentence, so a lost byte
+           costs one sentence and the stream resynchronises on its own.
+
+        4) Sentences without a checksum, with a bad one, or longer than
+           max_length are dropped and counted.
+
+        5) With accept set to a set or dict of sentence_key() values, a
+           sentence whose header is not in it is dropped as soon as its
+           fifth character arrives, before the checksum is complete:
+             stream.accept = {sentence_key('GPRMC'), sentence_key('GPGGA')}
+
+"""
+
+from micropython import const
+
+# Parser states
+_IDLE = const(0)            # Waiting for '$'
+_BODY = const(1)            # Talker to '*', checksum accumulating
+_CHECK_HIGH = const(2)      # First checksum digit
+_CHECK_LOW = const(3)       # Second checksum digit
+
+_DOLLAR = const(0x24)
+_STAR = const(0x2A)
+_CR = const(0x0D)
+_LF = const(0x0A)
+
+# Header characters in a key, 6 bits each keeps it a small int
+_KEY_LENGTH = const(5)
+
+def sentence_key(header):
+    """ Key of talker + type, the first five characters, -1 when shorter """
+    if isinstance(header, str):
+        header = header.encode()
+    if len(header) < _KEY_LENGTH:
+        return -1
+    key = 0
+    index = 0
+    while index < _KEY_LENGTH:
+        key = (key << 6) | (header[index] & 0x3F)
+        index += 1
+    return key
+
+def _hex_value(char):
+    # ASCII hex digit to 0-15, -1 for anything else
+    if 0x30 <= char <= 0x39:
+        return char - 0x30
+    char |= 0x20
+    if 0x61 <= char <= 0x66:
+        return char - 0x57
+    return -1
+
+class NMEAStream:
+    """ Checksum validated sentences from a UART, one state machine per port """
+    def __init__(self, uart, handler, max_length=255, chunk=64, accept=None):
+        self._uart = uart
+        self._handler = handler
+
+        # sentence_key() values to pass on, None for all
+        self.accept = accept
+
+        # UART reads land here
+        self._rx = bytearray(chunk)
+
+        # Sentence being assembled, carried over between reads
+        self._line = bytearray(max_length)
+        self._line_mv = memoryview(self._line)
+
+        self._state = _IDLE
+        self._length = 0
+        self._checksum = 0
+        self._received = 0
+        self._key = 0
+
+        # Set while the handler runs
+        self._busy = False
+
+        # Statistics
+        self.sentences = 0
+        self.checksum_errors = 0
+        self.overflows = 0
+        self.filtered = 0
+
+    def reset(self):
+        # Drop a partial sentence, i.e. after changing the baud rate
+        self._state = _IDLE
+        self._length = 0
+
+    def poll(self):
+        """ Read everything the UART holds, return number of sentences handled """
+        uart = self._uart
+        rx = self._rx
+        count = 0
+
+        # Before readinto, rx may still be in use by feed()
+        if self._busy:
+            raise RuntimeError('NMEAStream - poll() from its own handler')
+
+        available = uart.any()
+        while available > 0:
+            num_bytes = uart.readinto(rx, min(available, len(rx)))
+            if not num_bytes:
+                break
+            count += self.feed(rx, num_bytes)
+            available = uart.any()
+        return count
+
+    def feed(self, data, num_bytes=-1):
+        """ Run data[:num_bytes] through the parser, return number of sentences handled """
+        if self._busy:
+            raise RuntimeError('NMEAStream - feed() from its own handler')
+        if num_bytes < 0:
+            num_bytes = len(data)
+
+        # Locals, attribute access is slow in the byte loop
+        state = self._state
+        line = self._line
+        length = self._length
+        checksum = self._checksum
+        received = self._received
+        key = self._key
+        accept = self.accept
+        limit = len(line)
+        count = 0
+
+        index = 0
+        while index < num_bytes:
+            char = data[index]
+            index += 1
+
+            if char == _DOLLAR:
+                # Start of sentence, an unfinished one is dropped
+                state = _BODY
+                length = 0
+                checksum = 0
+                key = 0
+
+            elif state == _BODY:
+                if char == _STAR:
+                    state = _CHECK_HIGH
+                elif char == _CR or char == _LF:
+                    # No checksum
+                    self.checksum_errors += 1
+                    state = _IDLE
+                elif length < limit:
+                    line[length] = char
+                    length += 1
+                    checksum ^= char
+
+                    if length <= _KEY_LENGTH:
+                        key = (key << 6) | (char & 0x3F)
+                        if length == _KEY_LENGTH and accept is not None and key not in accept:
+                            # Nobody subscribed
+                            self.filtered += 1
+                            state = _IDLE
+                else:
+                    self.overflows += 1
+                    state = _IDLE
+
+            elif state == _CHECK_HIGH:
+                digit = _hex_value(char)
+                if digit < 0:
+                    self.checksum_errors += 1
+                    state = _IDLE
+                else:
+                    received = digit << 4
+                    state = _CHECK_LOW
+
+            elif state == _CHECK_LOW:
+                state = _IDLE
+                digit = _hex_value(char)
+                if digit >= 0 and received | digit == checksum:
+                    self.sentences += 1
+                    count += 1
+
+                    # Stored first, the handler may call reset() or raise
+                    self._state = state
+                    self._length = length
+                    self._checksum = checksum
+                    self._received = received
+                    self._key = key
+                    self._busy = True
+                    try:
+                        self._handler(self._line_mv[:length])
+                    finally:
+                        self._busy = False
+                    state = self._state
+                    length = self._length
+                else:
+                    self.checksum_errors += 1
+
+        self._state = state
+        self._length = length
+        self._checksum = checksum
+        self._received = received
+        self._key = key
+        return count
@@ -0,0 +1,172 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) MicroPython
+
+    * Purpose:
+        * PMTK command layer for MediaTek receivers.  Packets are framed
+        * and checksummed once and cached, $PMTK001 acks are matched to
+        * the command they answer.
+
+    * Notes:
+        1) Usage:
+             pmtk = PMTK(uart, gps.update)
+             pmtk.send('220', '1000')                      # no wait
+             pmtk.send_and_confirm('220', '1000')          # ACK_OK or raise
+             await pmtk.send_and_confirm_async('220', '1000')
+
+        2) poll is called while waiting and must feed received sentences
+           through to ack(), GPS does this from parse_ack.
+
+        3) data is the fields after the packet type, with or without the
+           leading comma.  A '*checksum' tail, as in the GPS constant
+           classes, is dropped and recomputed.
+
+        4) ACK_OK, ACK_INVALID and ACK_UNSUPPORTED are returned at once.
+           ACK_FAILED and no answer within timeout_ms are retried, after
+           the last retry ACK_FAILED is returned or PMTKTimeout raised.
+
+        5) Up to MAX_PACKETS distinct framed packets are cached, enough
+           for the constant commands a driver repeats.  Past that new
+           packets are framed on every send and not kept, so commands
+           with changing data do not grow the cache.
+
+"""
+
+from micropython import const
+from time import ticks_ms, ticks_diff, sleep_ms
+
+# $PMTK001,<command>,<flag>
+ACK_INVALID = const(0)
+ACK_UNSUPPORTED = const(1)
+ACK_FAILED = const(2)
+ACK_OK = const(3)
+
+# Outstanding, no ack yet
+_WAITING = const(-1)
+
+_COMMA = const(0x2C)
+_ZERO = const(0x30)
+
+# Interval ack is polled for
+POLL_MS = 10
+
+# Framed packets kept by PMTK.packet
+MAX_PACKETS = 16
+
+class PMTKTimeout(RuntimeError):
+    pass
+
+def frame(packet_type, data=''):
+    """ $PMTK<type>,<data>*<checksum>\\r\\n as bytes """
+    data = data.split('*')[0]
+    if data and data[0] != ',':
+        data = ',' + data
+    body = ('PMTK' + packet_type + data).encode()
+
+    checksum = 0
+    for char in body:
+        checksum ^= char
+    return b'$' + body + ('*%02X\r\n' % checksum).encode()
+
+class PMTK:
+    """ Cached PMTK packets and ack tracking for one receiver """
+    def __init__(self, uart, poll):
+        self._uart = uart
+        self._poll = poll
+
+        # (packet type, data): framed packet
+        self._packets = {}
+
+        # Command number: latest ack flag, _WAITING while outstanding
+        self._acks = {}
+
+        # Statistics
+        self.retries = 0
+        self.timeouts = 0
+
+    def packet(self, packet_type, data=''):
+        # Framed once, the constant commands are sent over and over
+        key = (packet_type, data)
+        packet = self._packets.get(key)
+        if packet is None:
+            packet = frame(packet_type, data)
+            if len(self._packets) < MAX_PACKETS:
+                self._packets[key] = packet
+        return packet
+
+    def send(self, packet_type, data=''):
+        # Write without waiting, the ack is still recorded
+        self._acks[int(packet_type)] = _WAITING
+        self._uart.write(self.packet(packet_type, data))
+
+    def ack(self, sentence):
+        """ Record a PMTK001,<command>,<flag> sentence, '$' to '*' exclusive """
+        length = len(sentence)
+        index = 8
+        command = 0
+        while index < length and sentence[index] != _COMMA:
+            command = command*10 + sentence[index] - _ZERO
+            index += 1
+        if index + 1 >= length:
+            return
+        if command in self._acks:
+            self._acks[command] = sentence[index+1] - _ZERO
+
+    def result(self, packet_type):
+        # Latest ack flag for a command, None while outstanding or never sent
+        flag = self._acks.get(int(packet_type), _WAITING)
+        return None if flag == _WAITING else flag
+
+    def send_and_confirm(self, packet_type, data='', timeout_ms=1000, retries=2):
+        """ Send and block until acked, returns the ack flag """
+        command = int(packet_type)
+        flag = _WAITING
+        for attempt in range(0, retries + 1):
+            if attempt:
+                self.retries += 1
+            self.send(packet_type, data)
+
+            start = ticks_ms()
+            while ticks_diff(ticks_ms(), start) < timeout_ms:
+                self._poll()
+                flag = self._acks[command]
+                if flag != _WAITING:
+                    break
+                sleep_ms(POLL_MS)
+
+            if flag != _WAITING and flag != ACK_FAILED:
+                return flag
+
+        if flag == ACK_FAILED:
+            return flag
+        self.timeouts += 1
+        raise PMTKTimeout('No ack for PMTK' + packet_type)
+
+    async def send_and_confirm_async(self, packet_type, data='', timeout_ms=1000, retries=2):
+        """ uasyncio version of send_and_confirm, other tasks run while waiting """
+        import uasyncio
+
+        command = int(packet_type)
+        flag = _WAITING
+        for attempt in range(0, retries + 1):
+            if attempt:
+                self.retries += 1
+            self.send(packet_type, data)
+
+            start = ticks_ms()
+            while ticks_diff(ticks_ms(), start) < timeout_ms:
+                self._poll()
+                flag = self._acks[command]
+                if flag != _WAITING:
+                    break
+                await uasyncio.sleep_ms(POLL_MS)
+
+            if flag != _WAITING and flag != ACK_FAILED:
+                return flag
+
+        if flag == ACK_FAILED:
+            return flag
+        self.timeouts += 1
+        raise PMTKTimeout('No ack for PMTK' + packet_type)
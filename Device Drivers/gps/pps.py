@@ -0,0 +1,159 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) MicroPython
+
+    * Purpose:
+        * Local ticks_us to UTC, disciplined by the receiver's PPS pulse.
+        * The interrupt latches ticks_us at the edge, the next whole
+        * second UTC from NMEA names it, and the tick rate is fitted
+        * against the edges so samples can be stamped between them.
+
+    * Notes:
+        1) Usage:
+             pps = PPSClock(Pin(17, Pin.IN))
+             pps.pair(gga.utc_ms)          # GPS does this per sentence
+             pps.utc()                     # now, (s since midnight UTC, us)
+             pps.utc(sample_ticks)         # ticks_us taken elsewhere
+             pps.ticks_at(fix.utc_ms)      # local ticks of an epoch
+
+        2) The PPS edge starts the UTC second, the receiver sends that
+           second's sentences after it.  An edge is paired with the
+           first whole second sentence that arrives less than a second
+           after it, edges with no such sentence are skipped.
+
+        3) The tick rate is kept as drift_ppb, ticks per UTC second above
+           1e6 in parts per billion, smoothed over FIT_WEIGHT edges.  A
+           second measured more than MAX_DRIFT_PPB off, i.e. a missed
+           edge, is not fitted.
+
+        4) Without a pairing for holdover_s the mapping is stale and
+           utc / ticks_at return None, ticks_at also for a UTC more than
+           holdover_s away from the last edge.  Keep holdover_s well below
+           the ticks_us wrap, 536 s on most ports.
+
+        5) The interrupt only reads ticks_us and counts, nothing is
+           allocated, so it can run as a hard IRQ.  pair() reads the
+           edge and its count with interrupts disabled.
+
+        6) All arithmetic stays within small ints, below 2**30.  The UTC
+           of a tick is split into seconds of day and us, and the drift
+           is applied per whole second and per ms of an interval.
+
+"""
+
+from micropython import const
+from machine import Pin, disable_irq, enable_irq
+from time import ticks_us, ticks_diff, ticks_add
+
+_SECOND_US = const(1_000_000)
+_DAY_S = const(86_400)
+_DAY_MS = const(86_400_000)
+
+# Fit weight, 1 / FIT_WEIGHT of each new second
+FIT_WEIGHT = 8
+
+# 500 ppm, far beyond any crystal
+MAX_DRIFT_PPB = 500_000
+
+class PPSClock:
+    """ ticks_us to UTC, fitted at every PPS edge """
+    def __init__(self, pin=None, holdover_s=10):
+        # Latched in the interrupt
+        self._edge = 0
+        self.edges = 0
+
+        # Edge count at the last pairing, nothing new while equal
+        self._paired = 0
+
+        # ticks_us at the start of UTC second _reference_s of the day
+        self._reference = 0
+        self._reference_s = None
+        self._holdover_us = holdover_s * _SECOND_US
+        self._holdover_ms = holdover_s * 1000
+
+        # Fitted local tick rate
+        self.drift_ppb = 0
+        self.pairs = 0
+
+        if pin is not None:
+            # Bound once, the interrupt must not allocate it
+            self._handler = self._irq
+            pin.irq(handler=self._handler, trigger=Pin.IRQ_RISING, hard=True)
+
+    def _irq(self, pin):
+        self._edge = ticks_us()
+        self.edges += 1
+
+    def pair(self, utc_ms):
+        """ Name the last PPS edge with the UTC of a sentence just received """
+        if utc_ms is None or utc_ms % 1000:
+            return False
+
+        # Edge and count from the same interrupt
+        state = disable_irq()
+        edges = self.edges
+        edge = self._edge
+        enable_irq(state)
+
+        if edges == self._paired:
+            return False
+        self._paired = edges
+
+        # Sentence for this edge arrives within the second
+        if not 0 <= ticks_diff(ticks_us(), edge) < _SECOND_US:
+            return False
+
+        utc_s = utc_ms // 1000
+        if self._reference_s is not None:
+            elapsed = ticks_diff(edge, self._reference)
+            seconds = (utc_s - self._reference_s) % _DAY_S
+            if 0 < seconds and 0 < elapsed < self._holdover_us:
+                # Bounded before scaling, error * 1000 stays a small int
+                error = elapsed - seconds * _SECOND_US
+                limit = MAX_DRIFT_PPB // 1000 * seconds
+                if -limit < error < limit:
+                    # Ticks per second above 1e6, in ppb
+                    measured = error * 1000 // seconds
+                    self.drift_ppb += (measured - self.drift_ppb) // FIT_WEIGHT
+
+        self._reference = edge
+        self._reference_s = utc_s
+        self.pairs += 1
+        return True
+
+    @property
+    def synced(self):
+        # Paired within holdover_s
+        return (self._reference_s is not None
+                and ticks_diff(ticks_us(), self._reference) < self._holdover_us)
+
+    def _drift_us(self, elapsed):
+        # Drift over elapsed us, per whole second and per ms
+        drift = self.drift_ppb
+        seconds = elapsed // _SECOND_US
+        ms = elapsed % _SECOND_US // 1000
+        return seconds * drift // 1000 + ms * drift // 1_000_000
+
+    def utc(self, ticks=None):
+        """ UTC of a ticks_us value, or of now, as (s since midnight, us) """
+        if not self.synced:
+            return None
+        if ticks is None:
+            ticks = ticks_us()
+        elapsed = ticks_diff(ticks, self._reference)
+        elapsed -= self._drift_us(elapsed)
+        seconds = self._reference_s + elapsed // _SECOND_US
+        return seconds % _DAY_S, elapsed % _SECOND_US
+
+    def ticks_at(self, utc_ms):
+        """ ticks_us value at a UTC time of day in ms, within holdover_s of the last edge """
+        if utc_ms is None or not self.synced:
+            return None
+        offset_ms = (utc_ms - self._reference_s * 1000 + _DAY_MS // 2) % _DAY_MS - _DAY_MS // 2
+        if not -self._holdover_ms < offset_ms < self._holdover_ms:
+            return None
+        elapsed = offset_ms * 1000
+        elapsed += self._drift_us(elapsed)
+        return ticks_add(self._reference, elapsed)
@@ -1,58 +1,140 @@
-class RMC:
+from gps.sentence import Sentence
+
+class RMC(Sentence):
     # Recommended minimum for navigation
-    def __init__(self):
-        self._data = []
-        
-    def set_data(self, nmea_sentence):
-        # Sets data, must be parsed and checked prior
-        self._data = nmea_sentence
-        
+    
     def get_messageid(self):
         # RMC protocol header
-        return self._data[0]
+        return self.field(0)
         
     def get_utctime(self):
         # hhmmss.sss
-        return self._data[1]
+        return self.field(1)
     
     def get_status(self):
         # A=data valid or V=data not valid
-        return self._data[2]
+        return self.field(2)
     
     def get_latitude(self):
         # dmm.mmmm
-        return self._data[3]
+        return self.field(3)
     
     def get_nsind(self):
         # N=north or S=south
-        return self._data[4]
+        return self.field(4)
     
     def get_longitude(self):
         # dddmm.mmmm
-        return self._data[5]
+        return self.field(5)
     
     def get_ewind(self):
         # E=east or W=west
-        return self._data[6]
+        return self.field(6)
     
     def get_speedoground(self):
         # Knots
-        return self._data[7]
+        return self.field(7)
     
     def get_courseoground(self):
         # Degrees
-        return self._data[8]
+        return self.field(8)
     
     def get_date(self):
         # ddmmyy
-        return self._data[9]
+        return self.field(9)
     
     def get_magvari(self):
         # Degrees
-        return self._data[10]
+        return self.field(10)
+    
+    def get_magvari_ewind(self):
+        # E=east or W=west
+        return self.field(11)
         
     def get_mode(self):
         # A = Autonomous 
         # D = Differential 
         # E = Estimated
-        return self._data[11]
\ No newline at end of file
+        return self.field(12)
+    
+    # === Typed values, decoded once per sentence ===
+    def _decode(self):
+        self._utc = self._utc_ms(1)
+        self._valid = self.field_bytes(2) == b'A'
+        self._latitude_udeg = self._coordinate(3, 4)
+        self._longitude_udeg = self._coordinate(5, 6)
+        
+        # Knots to mm/s, 1 knot = 1852/3600 m/s
+        knots = self._fixed(7, 3)
+        self._speed_mm_s = None if knots is None else (knots*1852 + 1800) // 3600
+        self._course_cdeg = self._fixed(8, 2)
+        
+        # ddmmyy
+        date = self._fixed(9, 0)
+        self._date = None if date is None else (2000 + date % 100, date // 100 % 100, date // 10000)
+
+    @property
+    def utc_ms(self):
+        # Milliseconds since midnight UTC
+        self._typed()
+        return self._utc
+    
+    @property
+    def utc_seconds(self):
+        # Seconds since midnight UTC
+        self._typed()
+        if self._utc is None:
+            return None
+        return self._utc // 1000
+
+    @property
+    def latitude_udeg(self):
+        # Signed micro-degrees, north positive
+        self._typed()
+        return self._latitude_udeg
+    
+    @property
+    def longitude_udeg(self):
+        # Signed micro-degrees, east positive
+        self._typed()
+        return self._longitude_udeg
+    
+    @property
+    def latitude(self):
+        # Float degrees
+        self._typed()
+        if self._latitude_udeg is None:
+            return None
+        return self._latitude_udeg / 1_000_000
+    
+    @property
+    def longitude(self):
+        # Float degrees
+        self._typed()
+        if self._longitude_udeg is None:
+            return None
+        return self._longitude_udeg / 1_000_000
+
+    @property
+    def valid(self):
+        # Status A, the receiver has a fix
+        self._typed()
+        return self._valid
+    
+    @property
+    def speed_mm_s(self):
+        # Speed over ground
+        self._typed()
+        return self._speed_mm_s
+    
+    @property
+    def course_cdeg(self):
+        # Course over ground, centi-degrees true
+        self._typed()
+        return self._course_cdeg
+    
+    @property
+    def date(self):
+        # (year, month, day)
+        self._typed()
+        return self._date
@@ -0,0 +1,166 @@
+from array import array
+from micropython import const
+
+_COMMA_BYTES = b','
+
+_MINUS = const(0x2D)
+_POINT = const(0x2E)
+_ZERO = const(0x30)
+_SOUTH = const(0x53)
+_WEST = const(0x57)
+
+class Sentence:
+    """
+    Base for the NMEA sentence classes.  Keeps a copy of the raw sentence
+    bytes and the offset of every field, found in one scan by set_data.
+    Fields are only sliced or converted when a getter asks for them.
+    
+    Typed values are decoded with integer math only, on first access
+    after set_data, and kept until the next sentence.  Every typed value
+    stays below 2**30 so it is a small int on MicroPython.
+    """
+    MAX_LENGTH = 96
+    MAX_FIELDS = 24
+
+    def __init__(self):
+        # Sentence from the talker ID up to, not including, '*'
+        self._raw = bytearray(self.MAX_LENGTH)
+        self._raw_mv = memoryview(self._raw)
+        self._length = 0
+
+        # Field n is _raw[_starts[n]:_starts[n+1]-1]
+        self._starts = array('H', [0] * (self.MAX_FIELDS + 1))
+        self._count = 0
+        
+        # Typed values are current
+        self._decoded = False
+
+    def set_data(self, sentence):
+        # Stores latest sentence - must be checksum verified PRIOR to this call
+        length = len(sentence)
+        if length > self.MAX_LENGTH:
+            return False
+        self._raw_mv[0:length] = sentence
+
+        # One pass for every comma, find() scans in C
+        find = self._raw.find
+        starts = self._starts
+        limit = self.MAX_FIELDS
+        count = 1
+        index = find(_COMMA_BYTES, 0, length)
+        while index >= 0 and count < limit:
+            starts[count] = index + 1
+            count += 1
+            index = find(_COMMA_BYTES, index + 1, length)
+
+        # End of the last field
+        starts[count] = length + 1
+        self._count = count
+        self._length = length
+        self._decoded = False
+        return True
+
+    @property
+    def field_count(self):
+        return self._count
+
+    def field_empty(self, index):
+        # Missing and empty fields look the same to a receiver without a fix
+        return index >= self._count or self._starts[index+1] - 1 == self._starts[index]
+
+    def field_bytes(self, index):
+        # memoryview of one field, valid until the next set_data
+        if index >= self._count:
+            return None
+        return self._raw_mv[self._starts[index]:self._starts[index+1]-1]
+
+    def field(self, index):
+        # One field as str, '' when empty, None before any sentence
+        if index >= self._count:
+            return None
+        return str(self._raw_mv[self._starts[index]:self._starts[index+1]-1], 'ascii')
+
+    # === Typed decoding ===
+    def _typed(self):
+        # Decode typed values once per sentence
+        if not self._decoded:
+            self._decode()
+            self._decoded = True
+
+    def _decode(self):
+        # Subclasses fill their typed values here
+        pass
+
+    def _fixed(self, index, places):
+        # Decimal field as an int scaled by 10**places, None when empty.
+        # Digits past places are truncated.
+        if self.field_empty(index):
+            return None
+        raw = self._raw
+        start = self._starts[index]
+        end = self._starts[index+1] - 1
+
+        negative = raw[start] == _MINUS
+        if negative:
+            start += 1
+
+        # Digits seen after the point, -1 before it
+        value = 0
+        decimals = -1
+        while start < end:
+            char = raw[start]
+            if char == _POINT:
+                decimals = 0
+            elif decimals < places:
+                value = value*10 + char - _ZERO
+                if decimals >= 0:
+                    decimals += 1
+            start += 1
+
+        if decimals < 0:
+            decimals = 0
+        while decimals < places:
+            value *= 10
+            decimals += 1
+        return -value if negative else value
+
+    def _coordinate(self, index, hemisphere):
+        # (d)ddmm.mmmm and N/S or E/W field to signed micro-degrees
+        if self.field_empty(index):
+            return None
+        raw = self._raw
+        start = self._starts[index]
+        end = self._starts[index+1] - 1
+
+        # Whole degrees and minutes, then fraction of a minute in 1e-6
+        whole = 0
+        while start < end and raw[start] != _POINT:
+            whole = whole*10 + raw[start] - _ZERO
+            start += 1
+        fraction = 0
+        scale = 100_000
+        start += 1
+        while start < end and scale > 0:
+            fraction += (raw[start] - _ZERO) * scale
+            scale //= 10
+            start += 1
+
+        micro_minutes = (whole % 100) * 1_000_000 + fraction
+        value = (whole // 100) * 1_000_000 + (micro_minutes + 30) // 60
+
+        if not self.field_empty(hemisphere):
+            char = raw[self._starts[hemisphere]]
+            if char == _SOUTH or char == _WEST:
+                value = -value
+        return value
+
+    def _utc_ms(self, index):
+        # hhmmss.sss field to milliseconds since midnight
+        if self.field_empty(index):
+            return None
+        raw = self._raw
+        start = self._starts[index]
+        hours = (raw[start] - _ZERO)*10 + raw[start+1] - _ZERO
+        minutes = (raw[start+2] - _ZERO)*10 + raw[start+3] - _ZERO
+        seconds = (raw[start+4] - _ZERO)*10 + raw[start+5] - _ZERO
+        return (hours*3600 + minutes*60 + seconds) * 1000 + self._fixed(index, 3) % 1000
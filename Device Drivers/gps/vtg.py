@@ -1,29 +1,56 @@
-class VTG:
+from gps.sentence import Sentence
+
+class VTG(Sentence):
     # Course and speed information relative to the ground
-    def init(self):
-        self._data
-        
-    def set_data(self, data):
-        self._data = data
-        
+    
     def get_course(self):
         # Measured 'True' heading - Degrees
-        return self._data[1]
+        return self.field(1)
     
     def get_magcourse(self):
         # Measured magnetic heading - Degrees
-        return self._data[3]
+        return self.field(3)
     
     def get_speed_knots(self):
         # Measured horizontal speed in knots
-        return self._data[5]
+        return self.field(5)
     
     def get_speed_kmhr(self):
         # Measured horizontal speed in km/hr
-        return self._data[7]
+        return self.field(7)
     
     def get_mode(self):
         # A - Autonomous
         # D - Differential
         # E - Estimated
-        return self._data[9]
\ No newline at end of file
+        return self.field(9)
+    
+    # === Typed values, decoded once per sentence ===
+    def _decode(self):
+        self._course_cdeg = self._fixed(1, 2)
+        self._magnetic_course_cdeg = self._fixed(3, 2)
+        
+        # km/h to mm/s, knots when the receiver leaves km/h empty
+        kmh = self._fixed(7, 3)
+        if kmh is not None:
+            self._speed_mm_s = (kmh*10 + 18) // 36
+        else:
+            knots = self._fixed(5, 3)
+            self._speed_mm_s = None if knots is None else (knots*1852 + 1800) // 3600
+    
+    @property
+    def course_cdeg(self):
+        # Course over ground, centi-degrees true
+        self._typed()
+        return self._course_cdeg
+    
+    @property
+    def magnetic_course_cdeg(self):
+        self._typed()
+        return self._magnetic_course_cdeg
+    
+    @property
+    def speed_mm_s(self):
+        # Speed over ground
+        self._typed()
+        return self._speed_mm_s
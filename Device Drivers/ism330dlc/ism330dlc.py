@@ -1,5 +1,6 @@
 # MicroPython Standard Library
 from micropython import const
+from machine import I2C
 
 # Non-Standard Libraries
 import register
@@ -100,14 +101,14 @@ class ism330dlc:
     Y_OFS_USR = const(0x74)
     Z_OFS_USR = const(0x75)
     
+    # Register Objects
+    func_cfg_access = register.RWRegBit(FUNC_CFG_ACCESS, 1, 7, 'B')
+    
     def __init__(self, i2c_bus:I2C, address ):
         
         # Data
         self._i2c = i2c_bus
-        self._address = address
-     
-        # Register Objects
-        func_cfg_access = RWRegBit(self._i2c, self._address, self.FUNC_CFG_ACCESS, 1, 7, 'B' )
+        self._dev_addr = address
 
 
 
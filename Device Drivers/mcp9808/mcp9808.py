@@ -1,7 +1,7 @@
 import ustruct
 from machine import I2C, Pin
 
-from Register import RWBits, ROBits, ROBytes
+from register import RWRegBit, RWRegBits, RORegStruct, Configure
 
 # Register Addresses
 _MCP9808_CONFIG = const(0x01)
@@ -15,33 +15,48 @@ _MCP9808_RESOLUTION = const(0x08)
 
 class MCP9808:
     """ This class contains serves to be a driver for the MCP9808 """
+    
+    # Registers are words behind a pointer, no auto increment
+    BURST = False
+    
+    # Writable configuration, (reg_addr, num_bytes), for register snapshots
+    CONFIG_REGISTERS = ((_MCP9808_CONFIG, 2),
+                        (_MCP9808_TUPPER, 2),
+                        (_MCP9808_TLOWER, 2),
+                        (_MCP9808_TCRIT, 2),
+                        (_MCP9808_RESOLUTION, 1))
+    
+    # Heap bytes allowed per call once warmed up, checked by alloctrace
+    # 25 floats, the raw int above 256 and range() on CPython
+    ALLOC_BUDGETS = {'ambient_temp_celsius': 896}
+    
+    # === Register objects ===
+    _tupper_sign = RWRegBit(_MCP9808_TUPPER, 2, 12, '>H')
+    _tupper_value = RWRegBits(_MCP9808_TUPPER, 2, 2, 11, '>H')
+    
+    _tlower_sign = RWRegBit(_MCP9808_TLOWER, 2, 12, '>H')
+    _tlower_value = RWRegBits(_MCP9808_TLOWER, 2, 2, 11, '>H')
+    
+    _tcrit_sign = RWRegBit(_MCP9808_TCRIT, 2, 12, '>H')
+    _tcrit_value = RWRegBits(_MCP9808_TCRIT, 2, 2, 11, '>H')
+    
+    _ta = RORegStruct(_MCP9808_TA, 2, '>H')
+    _device_id = RORegStruct(_MCP9808_DEV_ID, 2, '>H', volatile=False)
+    _manu_id = RORegStruct(_MCP9808_MANU_ID, 2, '>H', volatile=False)
+    _resolution = RWRegBits(_MCP9808_RESOLUTION, 1, 0, 1, '>B')
+    
     def __init__(self, i2c_bus:I2C, i2c_address:int, mute:bool = True):
-        self._i2c_bus = i2c_bus
-        self._device_address = i2c_address
+        self._i2c = i2c_bus
+        self._dev_addr = i2c_address
         self._mute = mute
         
         if self.addr_check() == True:
             pass
         else:
             print("INSERT ERROR MESSAGE")
-            
-        """ Registers Objects """
-        self._tupper_sign = RWBits(self._i2c_bus, '>H', self._device_address, _MCP9808_TUPPER, 2, 2, 10)
-        self._tupper_value = RWBits(self._i2c_bus, '>H', self._device_address, _MCP9808_TUPPER, 2, 2, 10)
-        
-        self._tlower_sign = RWBits(self._i2c_bus, '>H', self._device_address, _MCP9808_TLOWER, 2, 11, 1)
-        self._tlower_value = RWBits(self._i2c_bus, '>H', self._device_address, _MCP9808_TLOWER, 2, 2, 10)
-        
-        self._tcrit_sign = RWBits(self._i2c_bus, '>H', self._device_address, _MCP9808_TCRIT, 2, 11, 1)
-        self._tcrit_value = RWBits(self._i2c_bus, '>H', self._device_address, _MCP9808_TCRIT, 2, 2, 10)
-        
-        self._ta = ROBytes(self._i2c_bus, '>H', self._device_address, _MCP9808_TA, 2)
-        self._device_id = ROBytes(self._i2c_bus, '>H', self._device_address, _MCP9808_DEV_ID, 2)
-        self._manu_id = ROBytes(self._i2c_bus, '>H', self._device_address, _MCP9808_MANU_ID, 2)
-        self._resolution = RWBits(self._i2c_bus, '>B', self._device_address, _MCP9808_RESOLUTION, 1, 0, 2)
                 
     def __str__(self):
-        print(f'Device Address: {hex(self._i2c_bus.scan()[0])}\nDevice ID: {self.device_id}')
+        print(f'Device Address: {hex(self._i2c.scan()[0])}\nDevice ID: {self.device_id}')
         print(f'Revision: {self.revision}\nManufacturer ID: {self.manu_id}')
         print(f'Ambient Temp C°: {self.ambient_temp_celsius}')
         print(f'Ambient Temp F°: {self.ambient_temp_fahrenheit}')
@@ -49,9 +64,13 @@ class MCP9808:
         
     
     # Methods
+    def configure(self):
+        """ Defer register writes until the with block exits """
+        return Configure(self)
+    
     def addr_check(self) -> bool:
         """ Ensure I2C address matches documentation """
-        if self._device_address in range(0x18, 0x1F):
+        if self._dev_addr in range(0x18, 0x1F):
             return True
         else:
             print("INSERT ERROR MESSAGE")
@@ -69,12 +88,12 @@ class MCP9808:
         :rtype: hex(int)
     
     """
-        return hex(self._device_address)
+        return hex(self._dev_addr)
     
     @device_address.setter
     def device_address(self, value:int) -> None:
         """ Sets I2C address and checks for validity """
-        self._device_address = value
+        self._dev_addr = value
         self.addr_check()
     
     @property
@@ -89,14 +108,14 @@ class MCP9808:
     def hi_temperature(self) -> float:
         # Check sign bit
         sign = 1    
-        if self._tupper_sign.value == 1:
+        if self._tupper_sign == 1:
             sign = -sign
         else:
             pass
         
         # Check value
         temperature = 0
-        temp_bits = self._tupper_value.value
+        temp_bits = self._tupper_value
         
         for value in range (0, 10):
             if (temp_bits>>value)&0b1 == 0b1:
@@ -117,30 +136,30 @@ class MCP9808:
         
         # Convert total based on bit resolution
         integer_value = int(value)
-        fractional_value = (value - integer_value)/.25
+        fractional_value = int((value - integer_value)/.25)
         
         if value == 0:
-            self._tupper_sign.value = 0
-            self._tupper_value.value  = 0
+            self._tupper_sign = 0
+            self._tupper_value  = 0
         elif value > 0:
-            self._tupper_sign.value  = 0
-            self._tupper_value.value  = (integer_value << 2) + fractional_value
+            self._tupper_sign  = 0
+            self._tupper_value  = (integer_value << 2) + fractional_value
         else:
-            self._tupper_sign.value  = 1
-            self._tupper_value.value = (integer_value << 2) + fractional_value
+            self._tupper_sign  = 1
+            self._tupper_value = (integer_value << 2) + fractional_value
     
     @property
     def low_temperature(self) -> float:
         # Check sign bit
         sign = 1    
-        if self._tlower_sign.value == 1:
+        if self._tlower_sign == 1:
             sign = -sign
         else:
             pass
         
         # Check value
         temperature = 0
-        temp_bits = self._tlower_value.value
+        temp_bits = self._tlower_value
         
         for value in range (0, 10):
             if (temp_bits>>value)&0b1 == 0b1:
@@ -161,29 +180,29 @@ class MCP9808:
         
         # Convert total based on bit resolution
         integer_value = int(value)
-        fractional_value = (value - integer_value)/.25
+        fractional_value = int((value - integer_value)/.25)
         
         if value == 0:
-            self._tlower_sign.value = 0
-            self._tlower_value.value  = 0
+            self._tlower_sign = 0
+            self._tlower_value  = 0
         elif value > 0:
-            self._tlower_sign.value  = 0
-            self._tlower_value.value  = (integer_value << 2) + fractional_value
+            self._tlower_sign  = 0
+            self._tlower_value  = (integer_value << 2) + fractional_value
         else:
-            self._tlower_sign.value  = 1
-            self._tlower_value.value = (integer_value << 2) + fractional_value
+            self._tlower_sign  = 1
+            self._tlower_value = (integer_value << 2) + fractional_value
     
     @property
     def critical_temperature(self) -> float:         
         # Check value
         temperature = 0
-        temp_bits = self._tcrit_value.value        
+        temp_bits = self._tcrit_value        
         
         for value in range (0, 10):
             if (temp_bits>>value)&0b1 == 0b1:
                 temperature += 2**(-2 + value)
         
-        if self._tcrit_sign.value == 1:
+        if self._tcrit_sign == 1:
             return -temperature
         else:
             return temperature
@@ -205,34 +224,34 @@ class MCP9808:
         fractional_value = int((value - integer_value)/.25)
         
         if value == 0:
-            self._tcrit_sign.value  = 0
-            self._tcrit_value.value  = 0
+            self._tcrit_sign  = 0
+            self._tcrit_value  = 0
             
         elif value > 0:
-            self._tcrit_sign.value  = 0
-            self._tcrit_value.value = (integer_value << 2) + fractional_value
+            self._tcrit_sign  = 0
+            self._tcrit_value = (integer_value << 2) + fractional_value
 
         else:
-            self._tcrit_sign.value  = 1
-            self._tcrit_value.value = (integer_value << 2) + fractional_value
+            self._tcrit_sign  = 1
+            self._tcrit_value = (integer_value << 2) + fractional_value
             
     @property
     def device_id(self):
         """ Returns RO Device ID register value """
-        register = self._device_id.value
+        register = self._device_id
         device_id = register >> 8 & 0b11111111
         return device_id
     
     @property
     def revision(self):
         """ Returns RO Revision number register value """
-        register = self._device_id.value
+        register = self._device_id
         revision = register & 0b11111111
         return revision
     
     @property
     def manu_id(self):
-        return self._manu_id.value
+        return self._manu_id
     
     @property
     def ambient_temp_celsius(self) -> float:
@@ -241,7 +260,7 @@ class MCP9808:
         temperature = 0.0
         
         # Store register value
-        register_value = self._ta.__get__()
+        register_value = self._ta
         
         # Determine if temperature is positive or negative
         if (register_value>>sign_bit) & 0b1  == 1:
@@ -263,8 +282,8 @@ class MCP9808:
     
     @property
     def resolution(self):
-        return self._resolution.value
+        return self._resolution
     
     @resolution.setter
     def resolution(self, value):
-        self._resolution.value = value
\ No newline at end of file
+        self._resolution = value
\ No newline at end of file
@@ -12,13 +12,21 @@
 
     * Notes
     * 1) Set mpu6050.sleep = False to wake up sensor 
-    * 2) mpu6050.process_sensors() returns a tuple of all sensor data
-    *   a) (xa, ya, za, temp, xg, yg, zg)
+    * 2) mpu6050.process_sensors() returns a list of all sensor data
+    *   a) [xa, ya, za, temp, xg, yg, zg]
+    *   b) mpu6050.process_sensors_into(values) fills a caller owned
+    *      list/array('f') of 7 instead, without allocating a list
+    * 3) mpu6050.interrupt_status() returns all interrupt flags in one read
+    *   a) [data_rdy, i2c_mst_int, fifo_oflow]
+    * 4) Settings changed inside "with mpu6050.configure() as cfg:" are
+    *    written once, when the block exits
+    * 5) mpu6050.read_fifo(stream) drains the FIFO into a fifo.FifoStream
+    *   a) FifoStream('>hhhhhh', 64) for accel + gyro enabled in FIFO_EN
            
 """
 
 from machine import I2C
-from register import RORegBit, RWRegBit, RORegStruct, RORegBits, RWRegBits
+from register import RORegBit, RWRegBit, RORegStruct, RORegBits, RWRegBits, RORegBlock, RO_Transaction, Configure, invalidate, bus_lock
 import struct
 
 class Register:
@@ -48,82 +56,101 @@ class Register:
 
 class MPU6050:
     
+    # Writable configuration, (reg_addr, num_bytes), for register snapshots
+    CONFIG_REGISTERS = ((Register.SMPLRT_DIV, 4),
+                        (Register.FIFO_EN, 1),
+                        (Register.INT_PIN_CFG, 2),
+                        (Register.USER_CTRL, 1),
+                        (Register.PWR_MGMT_1, 2))
+    
+    # === Register objects ===
+    _smplrt_div = RWRegBits(Register.SMPLRT_DIV, 1, 0, 7, '>B')
+    
+    _dlpf_cfg = RWRegBits(Register.CONFIG, 1, 0, 2, '>B')
+    _ext_sync_set = RWRegBits(Register.CONFIG, 1, 3, 5, '>B')
+    
+    _fs_sel = RWRegBits(Register.GYRO_CONFIG, 1, 3, 4, '>B')
+    
+    _afs_sel = RWRegBits(Register.ACCEL_CONFIG, 1, 3, 4, '>B')
+    
+    _accel_fifo_en = RWRegBit(Register.FIFO_EN, 1, 3, '>B')
+    _zg_fifo_en = RWRegBit(Register.FIFO_EN, 1, 4, '>B')
+    _yg_fifo_en = RWRegBit(Register.FIFO_EN, 1, 5, '>B')
+    _xg_fifo_en = RWRegBit(Register.FIFO_EN, 1, 6, '>B')
+    _temp_fifo_en = RWRegBit(Register.FIFO_EN, 1, 7, '>B')
+    
+    i2c_bypass_en = RWRegBit(Register.INT_PIN_CFG, 1, 1, '>B')
+    fsync_int_en = RWRegBit(Register.INT_PIN_CFG, 1, 2, '>B')
+    fsync_int_level = RWRegBit(Register.INT_PIN_CFG, 1, 3, '>B')
+    int_rd_clear = RWRegBit(Register.INT_PIN_CFG, 1, 4, '>B')
+    latch_int_en = RWRegBit(Register.INT_PIN_CFG, 1, 5, '>B')
+    int_open = RWRegBit(Register.INT_PIN_CFG, 1, 6, '>B')
+    int_level = RWRegBit(Register.INT_PIN_CFG, 1, 7, '>B')
+    
+    data_rdy_en = RWRegBit(Register.INT_ENABLE, 1, 0, '>B')
+    i2c_mst_int_en = RWRegBit(Register.INT_ENABLE, 1, 3, '>B')
+    fifo_oflow_en = RWRegBit(Register.INT_ENABLE, 1, 4, '>B')
+    
+    data_rdy_int = RORegBit(Register.INT_STATUS, 1, 0, '>B')
+    i2c_mst_int_int = RORegBit(Register.INT_STATUS, 1, 3, '>B')
+    fifo_oflow_int = RORegBit(Register.INT_STATUS, 1, 4, '>B')
+    
+    _accel_x = RORegStruct(Register.ACCEL_XOUT, 2, '>h')
+    _accel_y = RORegStruct(Register.ACCEL_YOUT, 2, '>h')
+    _accel_z = RORegStruct(Register.ACCEL_ZOUT, 2, '>h')
+    
+    _temp = RORegStruct(Register.TEMP_OUT, 2, '>h')
+    
+    _gyro_x = RORegStruct(Register.GYRO_XOUT, 2, '>h')
+    _gyro_y = RORegStruct(Register.GYRO_YOUT, 2, '>h')
+    _gyro_z = RORegStruct(Register.GYRO_ZOUT, 2, '>h')
+    
+    # ACCEL_XOUT..GYRO_ZOUT in one read
+    _sensors = RORegBlock(Register.ACCEL_XOUT, 14)
+    
+    _fifo_count = RORegStruct(Register.FIFO_COUNT, 2, '>H')
+    
+    temp_reset = RWRegBit(Register.SIGNAL_PATH_RESET, 1, 0, '>B', volatile=True)
+    accel_reset = RWRegBit(Register.SIGNAL_PATH_RESET, 1, 1, '>B', volatile=True)
+    gyro_reset = RWRegBit(Register.SIGNAL_PATH_RESET, 1, 2, '>B', volatile=True)
+    
+    sig_cond_reset = RWRegBit(Register.USER_CTRL, 1, 0, '>B', volatile=True)
+    _i2c_mst_reset = RWRegBit(Register.USER_CTRL, 1, 1, '>B', volatile=True)
+    _fifo_reset = RWRegBit(Register.USER_CTRL, 1, 2, '>B', volatile=True)
+    _i2c_if_dis = RWRegBit(Register.USER_CTRL, 1, 4, '>B')
+    _i2c_mst_en = RWRegBit(Register.USER_CTRL, 1, 5, '>B')
+    _fifo_en = RWRegBit(Register.USER_CTRL, 1, 6, '>B')  
+    
+    _clksel = RWRegBits(Register.PWR_MGMT_1, 1, 0, 2, '>B')
+    temp_dis = RWRegBit(Register.PWR_MGMT_1, 1, 3, '>B')
+    cycle = RWRegBit(Register.PWR_MGMT_1, 1, 5, '>B')
+    sleep = RWRegBit(Register.PWR_MGMT_1, 1, 6, '>B')
+    _device_reset = RWRegBit(Register.PWR_MGMT_1, 1, 7, '>B', volatile=True)
+    
+    stby_zg = RWRegBit(Register.PWR_MGMT_2, 1, 0, '>B')
+    stby_yg = RWRegBit(Register.PWR_MGMT_2, 1, 1, '>B')
+    stby_xg = RWRegBit(Register.PWR_MGMT_2, 1, 2, '>B')
+    stby_za = RWRegBit(Register.PWR_MGMT_2, 1, 3, '>B')
+    stby_ya = RWRegBit(Register.PWR_MGMT_2, 1, 4, '>B')
+    stby_xa = RWRegBit(Register.PWR_MGMT_2, 1, 5, '>B')
+    _lp_wake_ctrl = RWRegBits(Register.PWR_MGMT_2, 1, 6, 7, '>B')
+    
+    who_am_i = RORegBits(Register.WHO_AM_I, 1, 0, 6)
+    
+    # Interrupt status flags in a single read
+    _int_status = RO_Transaction([data_rdy_int, i2c_mst_int_int, fifo_oflow_int])
+    
+    # Heap bytes allowed per call once warmed up, checked by alloctrace
+    ALLOC_BUDGETS = {'read_sensors': 0,
+                     'process_sensors_into': 896,   # 29 float intermediates
+                     'interrupt_status': 160}       # 2 list iterators, CPython only
+    
     # Create instance of MPU6050 with valid i2c 
     def __init__(self, i2c_instance, address):
        
         # Bring in instance variables
-        self.i2c = i2c_instance
-        self.dev_addr = address
-        
-        
-        # Declare register objects
-        self._smplrt_div =RWRegBits(self.i2c, self.dev_addr, Register.SMPLRT_DIV, 1, 0, 7, '>B')
-        
-        self._dlpf_cfg = RWRegBits(self.i2c, self.dev_addr, Register.CONFIG, 1, 0, 2, '>B')
-        self._ext_sync_set = RWRegBits(self.i2c, self.dev_addr, Register.CONFIG, 1, 3, 5, '>B')
-        
-        self._fs_sel = RWRegBits(self.i2c, self.dev_addr, Register.GYRO_CONFIG, 1, 3, 4, '>B')
-        
-        self._afs_sel = RWRegBits(self.i2c, self.dev_addr, Register.ACCEL_CONFIG, 1, 3, 4, '>B')
-        
-        self._accel_fifo_en = RWRegBit(self.i2c, self.dev_addr, Register.FIFO_EN, 1, 3, '>B')
-        self._zg_fifo_en = RWRegBit(self.i2c, self.dev_addr, Register.FIFO_EN, 1, 4, '>B')
-        self._yg_fifo_en = RWRegBit(self.i2c, self.dev_addr, Register.FIFO_EN, 1, 5, '>B')
-        self._xg_fifo_en = RWRegBit(self.i2c, self.dev_addr, Register.FIFO_EN, 1, 6, '>B')
-        self._temp_fifo_en = RWRegBit(self.i2c, self.dev_addr, Register.FIFO_EN, 1, 7, '>B')
-        
-        self._i2c_bypass_en = RWRegBit(self.i2c, self.dev_addr, Register.INT_PIN_CFG, 1, 1, '>B')
-        self._fsync_int_en = RWRegBit(self.i2c, self.dev_addr, Register.INT_PIN_CFG, 1, 2, '>B')
-        self._fsync_int_level = RWRegBit(self.i2c, self.dev_addr, Register.INT_PIN_CFG, 1, 3, '>B')
-        self._int_rd_clear = RWRegBit(self.i2c, self.dev_addr, Register.INT_PIN_CFG, 1, 4, '>B')
-        self._latch_int_en = RWRegBit(self.i2c, self.dev_addr, Register.INT_PIN_CFG, 1, 5, '>B')
-        self._int_open = RWRegBit(self.i2c, self.dev_addr, Register.INT_PIN_CFG, 1, 6, '>B')
-        self._int_level = RWRegBit(self.i2c, self.dev_addr, Register.INT_PIN_CFG, 1, 7, '>B')
-        
-        self._data_rdy_en = RWRegBit(self.i2c, self.dev_addr, Register.INT_ENABLE, 1, 0, '>B')
-        self._i2c_mst_int_en = RWRegBit(self.i2c, self.dev_addr, Register.INT_ENABLE, 1, 3, '>B')
-        self._fifo_oflow_en = RWRegBit(self.i2c, self.dev_addr, Register.INT_ENABLE, 1, 4, '>B')
-        
-        self._data_rdy_int = RORegBit(self.i2c, self.dev_addr, Register.INT_STATUS, 1, 0, '>B')
-        self._i2c_mst_int_int = RORegBit(self.i2c, self.dev_addr, Register.INT_STATUS, 1, 3, '>B')
-        self._fifo_oflow_int = RORegBit(self.i2c, self.dev_addr, Register.INT_STATUS, 1, 4, '>B')
-        
-        self._accel_x = RORegStruct(self.i2c, self.dev_addr, Register.ACCEL_XOUT, 2, '>h')
-        self._accel_y = RORegStruct(self.i2c, self.dev_addr, Register.ACCEL_YOUT, 2, '>h')
-        self._accel_z = RORegStruct(self.i2c, self.dev_addr, Register.ACCEL_ZOUT, 2, '>h')
-        
-        self._temp = RORegStruct(self.i2c, self.dev_addr, Register.TEMP_OUT, 2, '>h')
-        
-        self._gyro_x = RORegStruct(self.i2c, self.dev_addr, Register.GYRO_XOUT, 2, '>h')
-        self._gyro_y = RORegStruct(self.i2c, self.dev_addr, Register.GYRO_YOUT, 2, '>h')
-        self._gyro_z = RORegStruct(self.i2c, self.dev_addr, Register.GYRO_ZOUT, 2, '>h')
-        
-        self._temp_reset = RWRegBit(self.i2c, self.dev_addr, Register.SIGNAL_PATH_RESET, 1, 0, '>B')
-        self._accel_reset = RWRegBit(self.i2c, self.dev_addr, Register.SIGNAL_PATH_RESET, 1, 1, '>B')
-        self._gyro_reset = RWRegBit(self.i2c, self.dev_addr, Register.SIGNAL_PATH_RESET, 1, 2, '>B')
-        
-        self._sig_cond_reset = RWRegBit(self.i2c, self.dev_addr, Register.USER_CTRL, 1, 0, '>B')
-        self._i2c_mst_reset = RWRegBit(self.i2c, self.dev_addr, Register.USER_CTRL, 1, 1, '>B')
-        self._fifo_reset = RWRegBit(self.i2c, self.dev_addr, Register.USER_CTRL, 1, 2, '>B')
-        self._i2c_if_dis = RWRegBit(self.i2c, self.dev_addr, Register.USER_CTRL, 1, 4, '>B')
-        self._i2c_mst_en = RWRegBit(self.i2c, self.dev_addr, Register.USER_CTRL, 1, 5, '>B')
-        self._fifo_en = RWRegBit(self.i2c, self.dev_addr, Register.USER_CTRL, 1, 6, '>B')  
-        
-        self._clksel = RWRegBits(self.i2c, self.dev_addr, Register.PWR_MGMT_1, 1, 0, 2, '>B')
-        self._temp_dis = RWRegBit(self.i2c, self.dev_addr, Register.PWR_MGMT_1, 1, 3, '>B')
-        self._cycle = RWRegBit(self.i2c, self.dev_addr, Register.PWR_MGMT_1, 1, 5, '>B')
-        self._sleep = RWRegBit(self.i2c, self.dev_addr, Register.PWR_MGMT_1, 1, 6, '>B')
-        self._device_reset = RWRegBit(self.i2c, self.dev_addr, Register.PWR_MGMT_1, 1, 7, '>B')
-        
-        self._stby_zg = RWRegBit(self.i2c, self.dev_addr, Register.USER_CTRL, 1, 0, '>B')
-        self._stby_yg = RWRegBit(self.i2c, self.dev_addr, Register.USER_CTRL, 1, 1, '>B')
-        self._stby_xg = RWRegBit(self.i2c, self.dev_addr, Register.USER_CTRL, 1, 2, '>B')
-        self._stby_za = RWRegBit(self.i2c, self.dev_addr, Register.USER_CTRL, 1, 3, '>B')
-        self._stby_ya = RWRegBit(self.i2c, self.dev_addr, Register.USER_CTRL, 1, 4, '>B')
-        self._stby_xa = RWRegBit(self.i2c, self.dev_addr, Register.USER_CTRL, 1, 5, '>B')
-        self._lp_wake_ctrl = RWRegBits(self.i2c, self.dev_addr, Register.PWR_MGMT_1, 1, 6, 7, '>B')
-        
-        self._who_am_i = RORegBits(self.i2c, self.dev_addr, Register.WHO_AM_I, 1, 0, 6)
+        self._i2c = i2c_instance
+        self._dev_addr = address
         
         # Declare settings to reduce I2C transactions        
         self.accel_scale = 16384 / (2**self.afs_sel)
@@ -133,311 +160,188 @@ class MPU6050:
        
         
     # === Property ===
+    # Public names of the bus and address, as before the descriptors
+    # Read only, the shadow registers are kept per (bus, dev_addr)
+    @property
+    def i2c(self):
+        return self._i2c
+    
+    @property
+    def dev_addr(self):
+        return self._dev_addr
+        
     @property
     def sample_rate(self):
-        return self._smplrt_div.__get__()
+        return self._smplrt_div
     
     @sample_rate.setter
     def sample_rate(self, value):
         if value>=0 and value<=256:
-            self._smplrt_div.__set__(value)
+            self._smplrt_div = value
         else:
             print('Sample Rate Error - Value out of range')
             
     @property
     def dlpf(self):
-        return self._dlpf_cfg.__get__()
+        return self._dlpf_cfg
     
     @dlpf.setter
     def dlpf(self, value):
         if value>=0 and value<=7:
-            self._dlpf_cfg.__set__(value)
+            self._dlpf_cfg = value
         else:
             print('DLPF Error - Value out of range')
             
     @property
     def ext_sync(self):
-        return self._ext_sync_set.__get__()
+        return self._ext_sync_set
     
     @ext_sync.setter
     def ext_sync(self, value):
         if value>=0 and value<=7:
-            self._ext_sync_set.__set__(value)
+            self._ext_sync_set = value
         else:
             print('External Sync Set Error - Value out of range')
             
     @property
     def fs_sel(self):
-        return self._fs_sel.__get__()
+        return self._fs_sel
     
     @fs_sel.setter
     def fs_sel(self, value):
         if value>=0 and value<=3:
-            self._fs_sel.__set__(value)
-            self.gyro_scale = 131 / (2**self.fs_sel) 
+            self._fs_sel = value
+            self.gyro_scale = 131 / (2**value) 
         else:
             print('FS_SEL Error - Value out of range')
             
     @property
     def afs_sel(self):
-        return(self._afs_sel.__get__())
+        return self._afs_sel
     
     @afs_sel.setter
     def afs_sel(self, value):
         if value>=0 and value<=3:
-            self._afs_sel.__set__(value)
+            self._afs_sel = value
             self.accel_scale = 16384 / (2**value)
         else:
             print('AFS_SEL Error - Value out of Range')
-            
-    @property
-    def i2c_bypass_en(self):
-        return self._i2c_bypass_en.__get__()
-    
-    @i2c_bypass_en.setter
-    def i2c_bypass_en(self, value):
-        self._i2c_bypass_en.__set__(value)
-        
-    @property
-    def fsync_int_en(self):
-        return self._fsync_int_en.__get__()
-        
-    @fsync_int_en.setter
-    def fsync_int_en(self, value):
-        self._fsync_int_en.__set__(value)
-        
-    @property
-    def int_rd_clear(self):
-        return self._int_rd_clear.__get__()
-        
-    @int_rd_clear.setter
-    def int_rd_clear(self, value):
-        self._int_rd_clear.__set__(value)
-        
-    @property
-    def latch_int_en(self):
-        return self._latch_int_en.__get__()
-    
-    @latch_int_en.setter
-    def latch_int_en(self, value):
-        self._latch_int_en.__set__(value)
-    
-    @property
-    def int_open(self):
-        return self._int_open.__get__()
-    
-    @int_open.setter
-    def int_open(self, value):
-        self._int_open.__set__(value)
-        
-    @property
-    def int_level(self):
-        return self._int_level.__get__()
-    
-    @int_level.setter
-    def int_level(self, value):
-        self._int_level.__set__(value)
-        
-    @property
-    def data_rdy_en(self):
-        self._data_rdy_en.__get__()
-    
-    @data_rdy_en.setter
-    def data_rdy_en(self, value):
-        self._data_rdy_en.__set__(value)
-    
-    @property
-    def data_rdy_int(self):
-        self._data_rdy_int.__get__()
     
     @property
     def accel_x(self):
-        return(self._accel_x.__get__()/(self.accel_scale))
+        return(self._accel_x/(self.accel_scale))
     
     @property
     def accel_y(self):
-        return(self._accel_y.__get__()/(self.accel_scale))
+        return(self._accel_y/(self.accel_scale))
     
     @property
     def accel_z(self):
-        return(self._accel_z.__get__()/(self.accel_scale))
+        return(self._accel_z/(self.accel_scale))
     
     @property
     def temp(self):
-        return((self._temp.__get__()/340)+36.53)
+        return((self._temp/340)+36.53)
     
     @property
     def gyro_x(self):
-        return(self._gyro_x.__get__()/(self.gyro_scale))
+        return(self._gyro_x/(self.gyro_scale))
     
     @property
     def gyro_y(self):
-        return(self._gyro_y.__get__()/(self.gyro_scale))
+        return(self._gyro_y/(self.gyro_scale))
     
     @property
     def gyro_z(self):
-        return(self._gyro_z.__get__()/(self.gyro_scale))
-    
-    @property
-    def temp_reset(self):
-        return self._temp_reset.__get__()
-    
-    @temp_reset.setter
-    def temp_reset(self, value):
-        self._temp_reset.__set__(value)
-    
-    @property
-    def accel_reset(self):
-        return self._accel_reset.__get__()
-    
-    @accel_reset.setter
-    def accel_reset(self, value):
-        self._accel_reset.__set__(value)
-    
-    @property
-    def gyro_reset(self):
-        return self._gyro_reset.__get__()
-    
-    @gyro_reset.setter
-    def gyro_reset(self, value):
-        self._gyro_reset.__set__(value)
-    
-    @property
-    def sig_cond_reset(self):
-        return self._sig_cond_reset.__get__()
-    
-    @sig_cond_reset.setter
-    def sig_cond_reset(self, value):
-        self._sig_cond_reset.__set__(value)
+        return(self._gyro_z/(self.gyro_scale))
         
     @property
     def clksel(self):
-        return self._clksel.__get__()
+        return self._clksel
         
     @clksel.setter
     def clksel(self, value):
         if value>=0 and value<=7:
-            self._clksel.__set__(value)
+            self._clksel = value
         else:
             print('CLKSEL Error - Value out of range')
     
-    @property
-    def temp_dis(self):
-        return self._temp_dis.__get__()
-    
-    @temp_dis.setter
-    def temp_dis(self, value):
-        self._temp_dis.__set__(value)
-        
-    @property
-    def cycle(self):
-        return self._cycle.__get__()
-    
-    @cycle.setter
-    def cycle(self, value):
-        self._cycle.__set__(value)
-    
-    @property
-    def sleep(self):
-        return self._sleep.__get__()
-    
-    @sleep.setter
-    def sleep(self, value):
-        self._sleep.__set__(value)
-    
     @property
     def device_reset(self):
-        return self._device_reset.__get__()
+        return self._device_reset
         
     @device_reset.setter
     def device_reset(self, value):
-        self._device_reset.__set__(value)
-        
-    @property
-    def stby_zg(self):
-        return self._stby_zg.__get__()
-        
-    @stby_zg.setter
-    def stby_zg(self, value):
-        self._stby_zg.__set__(value)
-    
-    @property
-    def stby_yg(self):
-        return self._stby_yg.__get__()
-    
-    @stby_yg.setter
-    def stby_yg(self):
-        self._stby_yg.__set__(value)
-    
-    @property
-    def stby_xg(self):
-        return self._stby_xg.__get__()
-    
-    @stby_xg.setter
-    def stby_xg(self):
-        self._stby_xg.__set__(value)
-    
-    @property
-    def stby_za(self):
-        return self._stby_za.__get__()
-    
-    @stby_za.setter
-    def stby_za(self, value):
-        self._stby_za.__set__(value)
-    
-    @property
-    def stby_ya(self):
-        return self._stby_ya.__get__()
-    
-    @stby_ya.setter
-    def stby_ya(self, value):
-        self._stby_ya.__set__(value)
+        self._device_reset = value
         
-    @property
-    def stby_xa(self):
-        return self._stby_xa.__get__()
-    
-    @stby_xa.setter
-    def stby_xa(self, value):
-        self._stby_xa.__set__(value)
+        # Device returns to power-on defaults
+        if value:
+            invalidate(self._i2c, self._dev_addr)
     
     @property
     def lp_wake_ctrl(self):
-        return self._lp_wake_ctrl.__get__()
+        return self._lp_wake_ctrl
         
     @lp_wake_ctrl.setter
     def lp_wake_ctrl(self, value):
         if value>=0 and value<=3:
-            self._lp_wake_ctrl.__set__(value)
+            self._lp_wake_ctrl = value
         else:
             print('LP_Wake_Ctrl Error - Value out of range')
-            
-    @property
-    def who_am_i(self):
-        return self._who_am_i.__get__()
         
     # Functions
+    def configure(self):
+        return Configure(self)
+    
+    def interrupt_status(self):
+        return self._int_status
+    
+    def read_fifo(self, stream):
+        # Burst read all whole frames waiting in the FIFO, returns frame count
+        return stream.read(self, Register.FIFO_R_W, self._fifo_count)
+    
     def read_sensors(self):        
-        return(self.i2c.readfrom_mem(self.dev_addr, Register.ACCEL_XOUT, 14))
+        return self._sensors
     
     def unpack_sensors(self):
         return list(struct.unpack('>hhhhhhh', self.read_sensors()))
     
     def process_sensors(self):
-        list_of_values = self.unpack_sensors()
-
-        # Accel's
-        for value in range(0,3):
-            list_of_values[value] = list_of_values[value] / self.accel_scale
-        
-        # Temp
-        list_of_values[3] = (list_of_values[3]/340)+36.53
-        
-        # Gyro's
-        for value in range(4,7):
-            list_of_values[value] = list_of_values[value] / self.gyro_scale
-        
-        return list_of_values
+        return self.process_sensors_into([0.0] * 7)
+    
+    def process_sensors_into(self, values):
+        """
+        Scaled sensor data written into values, a list or array('f') of
+        7 supplied by the caller.  No list is allocated and the raw bytes
+        are combined in floats so no large ints are created, the float
+        intermediates are still heap objects on most ports.
+        """
+        # Block buffer is reused by the next read of this device, decode under the bus lock
+        lock = bus_lock(self._i2c)
+        lock.acquire()
+        try:
+            raw = self.read_sensors()
+            
+            # while, a range() iterator would be a heap object on CPython
+            value = 0
+            while value < 7:
+                high = raw[2*value]
+                reading = high * 256.0 + raw[2*value + 1]
+                if high & 0x80:
+                    reading -= 65536.0
+                
+                # Accel's, Temp, Gyro's
+                if value < 3:
+                    values[value] = reading / self.accel_scale
+                elif value == 3:
+                    values[value] = (reading/340)+36.53
+                else:
+                    values[value] = reading / self.gyro_scale
+                value += 1
+        finally:
+            lock.release()
+        
+        return values
     
     def pack_sensors(self):
         list_of_values = self.process_sensors()
@@ -0,0 +1,175 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) MicroPython
+    *   2) register
+    *   3) numpy (optional, CPython only)
+
+    * Purpose:
+        * Drain a sensor's hardware FIFO and split the repeated frames
+        * into one typed array per channel.
+
+            * FifoStream - Ring of raw buffers plus decoded channels
+
+
+    * Notes:
+        1) frame_fmt is a struct format for ONE frame, i.e. an MPU6050
+           with accel + gyro enabled in FIFO_EN produces '>6h'.  Every
+           value is a channel, repeat counts give that many channels.
+           Integer and float codes b B h H i I l L q Q f d are supported,
+           any other raises ValueError.
+
+        2) stream.read(device, data_reg, num_bytes) does a single burst
+           read of whole frames into the next raw buffer of the ring,
+           decodes them and returns the number of frames.  Channel k of
+           frame n is then stream.channels[k][n].
+
+        3) With scales=(s0, s1, ...) the channels are array('f') holding
+           raw * scale, otherwise they use the frame's integer type.
+
+        4) On CPython with NumPy installed the frames are decoded with
+           numpy.frombuffer, otherwise struct.unpack_from runs over the
+           buffer once, frame by frame.
+
+"""
+
+from array import array
+import struct
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# struct format character -> (array typecode, numpy kind + size)
+_TYPES = {
+    'b': ('b', 'i1'),
+    'B': ('B', 'u1'),
+    'h': ('h', 'i2'),
+    'H': ('H', 'u2'),
+    'i': ('i', 'i4'),
+    'I': ('I', 'u4'),
+    'l': ('l', 'i4'),
+    'L': ('L', 'u4'),
+    'q': ('q', 'i8'),
+    'Q': ('Q', 'u8'),
+    'f': ('f', 'f4'),
+    'd': ('d', 'f8'),
+}
+
+def _channels(frame_fmt, fields):
+    # One format character per channel, repeat counts expanded
+    channels = []
+    count = ''
+    for char in fields:
+        if char in '0123456789':
+            count += char
+            continue
+        if char not in _TYPES:
+            raise ValueError('FifoStream - Unsupported format character %r in %r' % (char, frame_fmt))
+        channels.append(char * int(count or '1'))
+        count = ''
+    if count:
+        raise ValueError('FifoStream - Repeat count without format character in %r' % frame_fmt)
+    return ''.join(channels)
+
+class FifoStream:
+    def __init__(self, frame_fmt, max_frames, scales=None, num_buffers=2):
+        # Byte order prefix and one format character per channel
+        if frame_fmt[0] in '<>!=@':
+            order = frame_fmt[0]
+            fields = frame_fmt[1:]
+        else:
+            order = '@'
+            fields = frame_fmt
+        self._order = order
+        self._fields = _channels(frame_fmt, fields)
+
+        self.frame_fmt = frame_fmt
+        self.frame_size = struct.calcsize(frame_fmt)
+        self.max_frames = max_frames
+        self.scales = scales
+        self.frames = 0
+
+        # Ring of raw FIFO buffers
+        self._buffers = [bytearray(self.frame_size * max_frames) for buffer in range(0, num_buffers)]
+        self._views = [memoryview(buffer) for buffer in self._buffers]
+        self._index = 0
+        self.last = self._views[0][:0]
+
+        # Decoded channels
+        self.channels = []
+        for field in self._fields:
+            if scales is None:
+                typecode = _TYPES[field][0]
+            else:
+                typecode = 'f'
+            self.channels.append(array(typecode, [0] * max_frames))
+
+        if numpy is not None:
+            self._dtype = self._numpy_dtype()
+
+    def _numpy_dtype(self):
+        # Structured dtype matching one frame
+        if self._order in '>!':
+            prefix = '>'
+        elif self._order == '<':
+            prefix = '<'
+        else:
+            prefix = '='
+        return numpy.dtype([('c%d' % index, prefix + _TYPES[field][1])
+                            for index, field in enumerate(self._fields)])
+
+    def read(self, obj, data_reg, num_bytes):
+        """
+        Read up to num_bytes of FIFO data from obj's device, whole frames
+        only, and decode them.  Returns the number of frames.
+        """
+        frames = min(num_bytes // self.frame_size, self.max_frames)
+        if frames == 0:
+            self.frames = 0
+            return 0
+
+        view = self._views[self._index][:frames * self.frame_size]
+        self._index = (self._index + 1) % len(self._views)
+
+        obj._i2c.readfrom_mem_into(obj._dev_addr, data_reg, view)
+        self.last = view
+        return self.decode(view, frames)
+
+    def decode(self, buf, frames):
+        """ Split frames of buf into the channel arrays, one pass """
+        if numpy is not None:
+            return self._decode_numpy(buf, frames)
+
+        channels = self.channels
+        scales = self.scales
+        num_channels = len(channels)
+        offset = 0
+
+        for frame in range(0, frames):
+            values = struct.unpack_from(self.frame_fmt, buf, offset)
+            if scales is None:
+                for channel in range(0, num_channels):
+                    channels[channel][frame] = values[channel]
+            else:
+                for channel in range(0, num_channels):
+                    channels[channel][frame] = values[channel] * scales[channel]
+            offset += self.frame_size
+
+        self.frames = frames
+        return frames
+
+    def _decode_numpy(self, buf, frames):
+        records = numpy.frombuffer(buf, dtype=self._dtype, count=frames)
+
+        for index, channel in enumerate(self.channels):
+            out = numpy.frombuffer(channel, dtype=channel.typecode)[:frames]
+            if self.scales is None:
+                out[:] = records['c%d' % index]
+            else:
+                numpy.multiply(records['c%d' % index], self.scales[index], out=out, casting='unsafe')
+
+        self.frames = frames
+        return frames
@@ -0,0 +1,178 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) MicroPython
+
+    * Purpose:
+        * Measure how much bus time each driver uses.  InstrumentedI2C
+        * wraps a machine.I2C (or any transport) and is handed to drivers
+        * in its place.
+
+            * InstrumentedI2C - Per (device, register) counters and
+            *                   ticks_us latency histograms
+
+
+    * Notes:
+        1) Usage:
+             bus = InstrumentedI2C(I2C(0, scl=Pin(1), sda=Pin(0)))
+             mpu = MPU6050(bus, 0x68)
+             ...
+             bus.stats()                 # dict
+             bus.dump()                  # compact bytes
+             bus.summary(mpu, ('accel_x', 'process_sensors'))
+
+        2) Latency histogram bucket n counts transactions that took
+           less than 2**n us, the last bucket collects everything slower.
+
+        3) dump() format, big endian:
+             b'IS', bucket count (1 byte), entry count (2 bytes)
+             per entry: dev_addr (2), reg_addr (2), reads (4), writes (4),
+                        bytes (4), buckets (4 each)
+
+        4) Raw readfrom/readfrom_into/writeto transfers carry no register
+           address, they are counted under reg_addr RAW (0xFFFF).
+
+"""
+
+from time import ticks_us, ticks_diff
+from micropython import const
+import struct
+
+HISTOGRAM_BUCKETS = const(16)
+
+# reg_addr of raw transfers, readfrom() etc.
+RAW = const(0xFFFF)
+
+# Per register entry: reads, writes, bytes, then histogram buckets
+_READS = const(0)
+_WRITES = const(1)
+_BYTES = const(2)
+_HIST = const(3)
+
+class InstrumentedI2C:
+    def __init__(self, i2c):
+        self._i2c = i2c
+
+        # {dev_addr: {reg_addr: [reads, writes, bytes, bucket0...]}}
+        self._stats = {}
+        self.transactions = 0
+
+    def _record(self, dev_addr, reg_addr, num_bytes, start, write):
+        latency = ticks_diff(ticks_us(), start)
+
+        registers = self._stats.get(dev_addr)
+        if registers is None:
+            registers = self._stats[dev_addr] = {}
+        entry = registers.get(reg_addr)
+        if entry is None:
+            entry = registers[reg_addr] = [0] * (_HIST + HISTOGRAM_BUCKETS)
+
+        if write:
+            entry[_WRITES] += 1
+        else:
+            entry[_READS] += 1
+        entry[_BYTES] += num_bytes
+
+        # Bucket n holds latencies below 2**n us
+        bucket = 0
+        while latency > 0 and bucket < HISTOGRAM_BUCKETS - 1:
+            latency >>= 1
+            bucket += 1
+        entry[_HIST + bucket] += 1
+
+        self.transactions += 1
+
+    def readfrom_mem(self, dev_addr, reg_addr, num_bytes, **kwargs):
+        start = ticks_us()
+        data = self._i2c.readfrom_mem(dev_addr, reg_addr, num_bytes, **kwargs)
+        self._record(dev_addr, reg_addr, num_bytes, start, False)
+        return data
+
+    def readfrom_mem_into(self, dev_addr, reg_addr, buf, **kwargs):
+        start = ticks_us()
+        self._i2c.readfrom_mem_into(dev_addr, reg_addr, buf, **kwargs)
+        self._record(dev_addr, reg_addr, len(buf), start, False)
+
+    def writeto_mem(self, dev_addr, reg_addr, buf, **kwargs):
+        start = ticks_us()
+        self._i2c.writeto_mem(dev_addr, reg_addr, buf, **kwargs)
+        self._record(dev_addr, reg_addr, len(buf), start, True)
+
+    def readfrom(self, dev_addr, num_bytes, stop=True):
+        start = ticks_us()
+        data = self._i2c.readfrom(dev_addr, num_bytes, stop)
+        self._record(dev_addr, RAW, num_bytes, start, False)
+        return data
+
+    def readfrom_into(self, dev_addr, buf, stop=True):
+        start = ticks_us()
+        self._i2c.readfrom_into(dev_addr, buf, stop)
+        self._record(dev_addr, RAW, len(buf), start, False)
+
+    def writeto(self, dev_addr, buf, stop=True):
+        start = ticks_us()
+        acks = self._i2c.writeto(dev_addr, buf, stop)
+        self._record(dev_addr, RAW, len(buf), start, True)
+        return acks
+
+    def __getattr__(self, name):
+        # scan(), init(), etc. go straight to the bus
+        return getattr(self._i2c, name)
+
+    def reset(self):
+        self._stats = {}
+        self.transactions = 0
+
+    def stats(self):
+        """ {(dev_addr, reg_addr): {'reads', 'writes', 'bytes', 'histogram'}} """
+        result = {}
+        for dev_addr, registers in self._stats.items():
+            for reg_addr, entry in registers.items():
+                result[(dev_addr, reg_addr)] = {
+                    'reads': entry[_READS],
+                    'writes': entry[_WRITES],
+                    'bytes': entry[_BYTES],
+                    'histogram': entry[_HIST:],
+                }
+        return result
+
+    def dump(self):
+        """ Compact binary form of stats(), see module notes """
+        entries = []
+        for dev_addr, registers in self._stats.items():
+            for reg_addr, entry in registers.items():
+                entries.append((dev_addr, reg_addr, entry))
+
+        data = bytearray(b'IS')
+        data.extend(struct.pack('>BH', HISTOGRAM_BUCKETS, len(entries)))
+        for dev_addr, reg_addr, entry in entries:
+            data.extend(struct.pack('>HH', dev_addr, reg_addr))
+            data.extend(struct.pack('>%dI' % len(entry), *entry))
+        return bytes(data)
+
+    def measure(self, obj, name, iterations=1):
+        """
+        Transactions used by one attribute read or method call of a
+        driver, averaged over iterations.
+        """
+        # Methods are called, properties and registers are just read
+        method = callable(getattr(type(obj), name, None))
+        before = self.transactions
+        for iteration in range(0, iterations):
+            value = getattr(obj, name)
+            if method:
+                value()
+        return (self.transactions - before) / iterations
+
+    def summary(self, obj, names, iterations=1):
+        """ Lines such as 'MPU6050.accel_x: 2 transactions per read' """
+        lines = []
+        for name in names:
+            count = self.measure(obj, name, iterations)
+            if count == int(count):
+                count = int(count)
+            else:
+                count = round(count, 2)
+            lines.append('%s.%s: %s transactions per read' % (type(obj).__name__, name, count))
+        return lines
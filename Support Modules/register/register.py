@@ -16,7 +16,21 @@
             * RWRegBits - Multi-bit Read/Write
             
             * RORegStruct - C-Types Read Only
-            * RWRegStruct - C-Types Read/Write
+            
+            * RORegBlock - Consecutive registers Read Only
+            * RWRegBlock - Consecutive registers Read/Write
+            
+            * RegCache - Shadow register values per device
+            
+            * RO_Transaction - Burst read of many Register objects
+            
+            * Configure - Deferred, merged and burst written field writes
+            
+            * snapshot / restore - Configuration save and reload
+            
+            * wait_until - Wait for a field value, IRQ or backoff polling
+            
+            * bus_lock - Atomic sections on a transport.SharedBus
             
         
     * Notes:
@@ -35,240 +49,921 @@
                 Q         unsigned long long      8
                 f         float                   4
                 d         double                  8
+                
+        2) Shadow register cache:
+             RW fields are non-volatile by default.  Their register value is
+             kept in a RegCache shared by every field of the device, so a
+             field write is a single I2C write and a field read costs no bus
+             time.  Pass volatile=True for self-clearing or hardware-updated
+             bits (resets, status flags).  After a soft reset or power loss
+             call invalidate(i2c, dev_addr) or refresh(i2c, dev_addr).
+             reg_cache(i2c, dev_addr).stats returns (hits, misses).  The
+             shadow holds raw register bits, unsigned in the register's
+             byte order, as regmap generated drivers do, and fields are
+             decoded from them.
+             
+        3) Allocation free reads:
+             Every Register reads with readfrom_mem_into into a transfer
+             buffer of the device, allocated on first use.  Integer formats
+             are decoded without struct, so polling a register allocates
+             nothing on the heap.
+             
+        4) Class level declaration:
+             Register objects are descriptors.  Declare them once in the
+             driver class body, the driver instance only has to provide
+             _i2c and _dev_addr:
+             
+             class Device:
+                 dlpf = RWRegBits(0x1A, 1, 0, 2, '>B')
+                 
+                 def __init__(self, i2c, addr):
+                     self._i2c = i2c
+                     self._dev_addr = addr
+                     
+             device.dlpf = 3
+             
+        5) Deferred configuration:
+             Field writes made inside a Configure block are merged per
+             register and flushed on exit, contiguous registers in a single
+             burst write.  Devices without register address auto increment
+             (MCP9808: word registers behind a pointer) set BURST = False
+             in the driver class, each register is then written on its own.
+             Drivers expose it as device.configure():
+             
+             with mpu.configure() as cfg:
+                 cfg.dlpf = 3
+                 cfg.ext_sync = 0
+                 cfg.fs_sel = 2
+                 
+        6) Transports:
+             Registers only use readfrom_mem_into/writeto_mem of the
+             driver's _i2c object.  To run a driver over SPI, or an I2C
+             device with 16 bit register addresses, pass an SPITransport
+             or I2CTransport from transport.py in place of machine.I2C.
+             
+        7) Snapshot and restore:
+             Drivers list their writable configuration registers in
+             CONFIG_REGISTERS as (reg_addr, num_bytes) spans.  After a
+             brown-out the whole configuration is rewritten in a few burst
+             writes instead of re-running the constructor:
+             
+             save_snapshot(mpu, 'mpu.bin')
+             ...
+             load_snapshot(mpu, 'mpu.bin')
+             
+        8) Waiting on a field:
+             wait_until(dps, '_coef_rdy', 1, timeout_ms=100) replaces fixed
+             sleeps.  Pass pin= with the device's interrupt line to wake on
+             its edge, await wait_until_async(...) from uasyncio tasks.
+             RegisterTimeout is raised when timeout_ms expires.  The pin
+             must be dedicated to the device, its IRQ handler is replaced
+             while waiting and removed on return.
+             
+        9) Shared buses:
+             Transfer buffers, RORegBlock views and RO_Transaction lists
+             belong to the device's RegCache, not to the class, so devices
+             of one driver on different buses never share a buffer.  On a
+             transport.SharedBus every read-and-decode, read-modify-write,
+             burst read, Configure block and snapshot holds the bus lock,
+             so drivers may be used from both cores.  On a plain bus
+             bus_lock() returns a do-nothing lock and the cost is one
+             attribute lookup.  Hold it in drivers around a block read
+             and its decode, with acquire()/release() in paths that must
+             not allocate:
+             
+             with bus_lock(self._i2c):
+                 raw = self._raw_readings
+                 ...
         
 """
 
-from machine import I2C
+from machine import I2C, Pin, idle
+from micropython import const
+from time import ticks_us, ticks_diff, sleep_us
 import struct
 
-class RORegBit:
-    def __init__(self, i2c, dev_addr, reg_addr, num_bytes, bit_location, fmt_str):
+class _NoLock:
+    # Stands in for the BusLock of a bus that is not shared
+    def acquire(self):
+        pass
+    
+    def release(self):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NO_LOCK = _NoLock()
+
+def bus_lock(i2c):
+    """ BusLock of a transport.SharedBus, a no-op lock for any other bus """
+    return getattr(i2c, 'lock', _NO_LOCK)
+
+def _burst(obj):
+    # False for a driver whose device has no register auto increment
+    return getattr(obj, 'BURST', True)
+
+class RegCache:
+    """
+    Shadow copy of the raw register bits of one physical device.
+    
+    Every Register object pointing at the same (bus, dev_addr) shares one
+    RegCache, so fields packed into the same byte see each other's writes
+    and a write to a non-volatile field costs a single I2C transaction.
+    """
+    def __init__(self, i2c, dev_addr):
         self.i2c = i2c
         self.dev_addr = dev_addr
-        self.reg_addr = reg_addr
-        self.num_bytes = num_bytes
-        self.bit_location = bit_location
-        self.pre_bits = 0
-        self.fmt_str = fmt_str
+        self.values = {}
+        self.formats = {}
+        self.hits = 0
+        self.misses = 0
+        
+        # {reg_addr: (value, Register)} while inside Configure
+        self.pending = None
+        
+        # {Register or RO_Transaction: transfer buffer} of this device
+        self.buffers = {}
+        
+    def store(self, reg_addr, value, fmt_str):
+        # Record a value that has just been written to the device
+        self.values[reg_addr] = value
+        self.formats[reg_addr] = fmt_str
+        
+    def invalidate(self, reg_addr=None):
+        # Forget one register, or all of them (i.e. after a soft reset)
+        # Cleared in place, generated drivers hold a reference to it
+        if reg_addr is None:
+            self.values.clear()
+        elif reg_addr in self.values:
+            del self.values[reg_addr]
+            
+    def refresh(self, reg_addr=None):
+        # Re-read one register, or every register currently shadowed
+        # A register never shadowed has no known format and is skipped
+        if reg_addr is None:
+            addresses = list(self.values)
+        elif reg_addr in self.formats:
+            addresses = [reg_addr]
+        else:
+            return
+            
+        for addr in addresses:
+            # Raw register bits, like every other shadowed value
+            fmt_str = self.formats[addr]
+            data = self.i2c.readfrom_mem(self.dev_addr, addr, struct.calcsize(fmt_str))
+            self.values[addr] = int.from_bytes(data, 'big' if fmt_str[0] in '>!' else 'little')
+            
+    def flush(self, burst=True):
+        # Write deferred registers, contiguous addresses as one burst write
+        # Without burst, i.e. no address auto increment, one write each
+        pending = self.pending
+        self.pending = None
+        
+        addresses = sorted(pending)
+        index = 0
+        while index < len(addresses):
+            start = addresses[index]
+            next_addr = start
+            data = bytearray()
+            
+            while (index < len(addresses) and addresses[index] == next_addr
+                   and (burst or next_addr == start)):
+                value, reg = pending[next_addr]
+                buf = reg.buffer(self)
+                reg.pack(value, buf)
+                data.extend(buf)
+                
+                # Self-clearing bits are not kept in the shadow
+                if reg.volatile:
+                    self.invalidate(next_addr)
+                    
+                next_addr += reg.num_bytes
+                index += 1
+                
+            self.i2c.writeto_mem(self.dev_addr, start, data)
+            
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def stats(self):
+        # (hits, misses) - every hit is one I2C read saved
+        return (self.hits, self.misses)
+
+# One RegCache per (bus, dev_addr), nested so lookups build no key tuple
+_caches = {}
+
+def reg_cache(i2c, dev_addr):
+    """ Return the RegCache shared by all registers of a device """
+    devices = _caches.get(i2c)
+    if devices is None:
+        devices = _caches[i2c] = {}
+    cache = devices.get(dev_addr)
+    if cache is None:
+        cache = devices[dev_addr] = RegCache(i2c, dev_addr)
+    return cache
+
+def invalidate(i2c, dev_addr, reg_addr=None):
+    """ Drop shadowed values - call after a device reset or power loss """
+    reg_cache(i2c, dev_addr).invalidate(reg_addr)
+    
+def refresh(i2c, dev_addr, reg_addr=None):
+    """ Re-synchronise shadowed values with the device """
+    reg_cache(i2c, dev_addr).refresh(reg_addr)
+
+# Snapshot blob: b'RS', version, span count, then per span
+# reg_addr (2 bytes, big endian), length (1 byte), register data
+SNAPSHOT_MAGIC = b'RS'
+SNAPSHOT_VERSION = const(1)
+
+def snapshot(obj, spans=None):
+    """
+    Capture a device's configuration registers as a compact bytes blob.
+    spans is a sequence of (reg_addr, num_bytes) and defaults to the
+    driver's CONFIG_REGISTERS map, which leaves out data and status
+    registers.  One burst read per span.
+    """
+    if spans is None:
+        spans = obj.CONFIG_REGISTERS
         
-        for bit in range(0,(self.bit_location-1)):
-            self.pre_bits = self.pre_bits+1
+    blob = bytearray(SNAPSHOT_MAGIC)
+    blob.append(SNAPSHOT_VERSION)
+    blob.append(len(spans))
     
-    def __get__(self):
-        # Retrieve register value and unpack to int
-        [value] = self.i2c.readfrom_mem(self.dev_addr, self.reg_addr, self.num_bytes)
+    with bus_lock(obj._i2c):
+        for reg_addr, num_bytes in spans:
+            blob.extend(struct.pack('>HB', reg_addr, num_bytes))
+            blob.extend(obj._i2c.readfrom_mem(obj._dev_addr, reg_addr, num_bytes))
         
-        # Perform shift followed by _AND_ operation to determine bit state
-        bit_value = (value >> self.bit_location)&1
+    return bytes(blob)
+
+def restore(obj, blob):
+    """
+    Write a snapshot blob back to the device.  Spans that follow each
+    other in the register map are merged into a single burst write,
+    unless the driver sets BURST = False.
+    """
+    if blob[0:2] != SNAPSHOT_MAGIC or blob[2] != SNAPSHOT_VERSION:
+        raise ValueError('Snapshot - Not a register snapshot')
+    
+    # [reg_addr, data] in blob order
+    burst = _burst(obj)
+    spans = []
+    offset = 4
+    for span in range(0, blob[3]):
+        reg_addr, num_bytes = struct.unpack_from('>HB', blob, offset)
+        offset += 3
+        data = blob[offset:offset+num_bytes]
+        offset += num_bytes
         
-        return bit_value
+        if burst and len(spans) > 0 and spans[-1][0] + len(spans[-1][1]) == reg_addr:
+            spans[-1][1] = spans[-1][1] + data
+        else:
+            spans.append([reg_addr, data])
     
-class RWRegBit:
-    def __init__(self, i2c, dev_addr, reg_addr, num_bytes, bit_location, fmt_str):
-        self.i2c = i2c
-        self.dev_addr = dev_addr
+    with bus_lock(obj._i2c):
+        for reg_addr, data in spans:
+            obj._i2c.writeto_mem(obj._dev_addr, reg_addr, data)
+            
+        # Shadow no longer matches the device
+        invalidate(obj._i2c, obj._dev_addr)
+    
+def save_snapshot(obj, path, spans=None):
+    """ Capture configuration registers to a file on flash """
+    with open(path, 'wb') as file:
+        file.write(snapshot(obj, spans))
+        
+def load_snapshot(obj, path):
+    """ Restore configuration registers from a file on flash """
+    with open(path, 'rb') as file:
+        restore(obj, file.read())
+
+class Register:
+    """
+    Base for every Register type.  Registers are descriptors declared once
+    at class level, the owning driver instance supplies the bus and device
+    address through its _i2c and _dev_addr attributes.
+    
+    Transfers go through a buffer of the device, kept in its RegCache, so
+    reads use readfrom_mem_into and integer fields are decoded by hand, a
+    steady state read or write allocates nothing.
+    """
+    __slots__ = ('reg_addr', 'num_bytes', 'fmt_str', 'volatile',
+                 'integer', 'signed', 'little', 'sign_bit')
+    
+    def __init__(self, reg_addr, num_bytes, fmt_str, volatile):
         self.reg_addr = reg_addr
         self.num_bytes = num_bytes
-        self.bit_location = bit_location
         self.fmt_str = fmt_str
-        self.premask = 0
+        self.volatile = volatile
+        
+        # Integer formats bypass struct, unpack_from allocates a tuple
+        self.integer = fmt_str[-1] in 'bBhHiIlLqQ'
+        self.signed = fmt_str[-1] in 'bhilq'
+        self.little = fmt_str[0] not in '>!'
+        self.sign_bit = 1 << (8*num_bytes - 1)
+        
+    def buffer(self, cache):
+        # Transfer buffer of cache's device, allocated on first use
+        buf = cache.buffers.get(self)
+        if buf is None:
+            buf = cache.buffers[self] = memoryview(bytearray(self.num_bytes))
+        return buf
+    
+    def raw(self, buf, offset=0):
+        # Register bits of buf[offset:offset+num_bytes], unsigned
+        # while, a range() iterator would be a heap object on CPython
+        value = 0
+        if self.little:
+            index = offset + self.num_bytes
+            while index > offset:
+                index -= 1
+                value = (value<<8) | buf[index]
+        else:
+            index = offset
+            end = offset + self.num_bytes
+            while index < end:
+                value = (value<<8) | buf[index]
+                index += 1
+        return value
+    
+    def from_raw(self, value):
+        # Register value of its raw bits
+        if not self.integer:
+            data = value.to_bytes(self.num_bytes, 'little' if self.little else 'big')
+            return struct.unpack(self.fmt_str, data)[0]
         
-        # Masking for values prior to desired bitfield... if needed
-        if self.bit_location > 0:
-            for bit in range(0, self.bit_location):
-                self.premask = self.premask + 2**bit
+        # Two's complement
+        if self.signed and value & self.sign_bit:
+            value -= self.sign_bit<<1
+        return value
+    
+    def unpack(self, buf, offset=0):
+        # Decode register value from buf[offset:offset+num_bytes]
+        if not self.integer:
+            return struct.unpack_from(self.fmt_str, buf, offset)[0]
+        return self.from_raw(self.raw(buf, offset))
     
-    def __get__(self):
-        # Retrieve register value and unpack to int
-        [value] = self.i2c.readfrom_mem(self.dev_addr, self.reg_addr, self.num_bytes)
+    def pack(self, value, buf):
+        # Encode raw register bits into transfer buffer
+        if self.little:
+            index = 0
+            while index < self.num_bytes:
+                buf[index] = value & 0xFF
+                value >>= 8
+                index += 1
+        else:
+            index = self.num_bytes
+            while index > 0:
+                index -= 1
+                buf[index] = value & 0xFF
+                value >>= 8
+    
+    def read(self, obj, cache=None):
+        # Raw register bits from device, bypassing shadow
+        if cache is None:
+            cache = reg_cache(obj._i2c, obj._dev_addr)
+        buf = self.buffer(cache)
         
-        # Perform shift followed by _AND_ operation to determine bit state        
-        return (value >> self.bit_location)&1
+        # Device buffer, decode before another thread reads into it
+        lock = bus_lock(obj._i2c)
+        lock.acquire()
+        try:
+            obj._i2c.readfrom_mem_into(obj._dev_addr, self.reg_addr, buf)
+            return self.raw(buf)
+        finally:
+            lock.release()
     
-    def __set__(self, bit_value):
-        # Retrieve register value and unpack as int
-        [value] = self.i2c.readfrom_mem(self.dev_addr, self.reg_addr, self.num_bytes)
+    def value(self, obj):
+        # Raw register bits, from shadow if non-volatile
+        cache = reg_cache(obj._i2c, obj._dev_addr)
+        if self.volatile:
+            return self.read(obj, cache)
+        
+        if self.reg_addr in cache.values:
+            cache.hits += 1
+            return cache.values[self.reg_addr]
+        
+        cache.misses += 1
+        value = self.read(obj, cache)
+        cache.store(self.reg_addr, value, self.fmt_str)
+        return value
+    
+    def current(self, obj):
+        # Value a field write merges into, including deferred writes
+        pending = reg_cache(obj._i2c, obj._dev_addr).pending
+        if pending is not None and self.reg_addr in pending:
+            return pending[self.reg_addr][0]
+        return self.value(obj)
+    
+    def write(self, obj, value):
+        cache = reg_cache(obj._i2c, obj._dev_addr)
+        
+        # Inside Configure the write is held until the block exits
+        if cache.pending is not None:
+            cache.pending[self.reg_addr] = (value, self)
+            if not self.volatile:
+                cache.store(self.reg_addr, value, self.fmt_str)
+            return
+        
+        # Write full register value to device
+        buf = self.buffer(cache)
+        self.pack(value, buf)
+        obj._i2c.writeto_mem(obj._dev_addr, self.reg_addr, buf)
+        
+        # Self-clearing bits must not be replayed by later shadowed writes
+        if self.volatile:
+            cache.invalidate(self.reg_addr)
+        else:
+            cache.store(self.reg_addr, value, self.fmt_str)
+            
+    def __set__(self, obj, value):
+        raise AttributeError('Read only register')
 
-        # Pack to bytes object
-        new_value = (value>>(self.bit_location+1)) + (bit_value<<self.bit_location) + (value&self.premask)
-        new_value = struct.pack(self.fmt_str, new_value)
+class RORegBit(Register):
+    __slots__ = ('bit_location',)
+    
+    def __init__(self, reg_addr, num_bytes, bit_location, fmt_str, volatile=True):
+        super().__init__(reg_addr, num_bytes, fmt_str, volatile)
+        self.bit_location = bit_location
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
         
-        # Write to I2C
-        self.i2c.writeto_mem(self.dev_addr, self.reg_addr, new_value)
+        # Perform shift followed by _AND_ operation to determine bit state
+        return (self.value(obj) >> self.bit_location)&1
+
+    def decode(self, buf, offset=0):
+        # Extract bit state from a buffer filled by a burst read
+        return (self.raw(buf, offset) >> self.bit_location)&1
+    
+class RWRegBit(Register):
+    __slots__ = ('bit_location',)
+    
+    def __init__(self, reg_addr, num_bytes, bit_location, fmt_str, volatile=False):
+        super().__init__(reg_addr, num_bytes, fmt_str, volatile)
+        self.bit_location = bit_location
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
         
-class RORegBits:
-    def __init__(self, i2c, dev_addr, reg_addr, num_bytes, lsb, msb):
-        self.i2c = i2c
-        self.dev_addr = dev_addr
-        self.reg_addr = reg_addr
-        self.num_bytes = num_bytes
+        # Perform shift followed by _AND_ operation to determine bit state        
+        return (self.value(obj) >> self.bit_location)&1
+
+    def decode(self, buf, offset=0):
+        # Extract bit state from a buffer filled by a burst read
+        return (self.raw(buf, offset) >> self.bit_location)&1
+    
+    def __set__(self, obj, bit_value):
+        lock = bus_lock(obj._i2c)
+        lock.acquire()
+        try:
+            # Volatile registers are read back, others come from the shadow
+            value = self.current(obj)
+            
+            # Clear bit then OR in new state
+            self.write(obj, (value & ~(1<<self.bit_location)) | ((bit_value&1)<<self.bit_location))
+        finally:
+            lock.release()
+        
+class RORegBits(Register):
+    """
+    Read only bitfield, bits lsb to msb of the register.
+
+    Reads return the field shifted down to bit 0, as RWRegBits does, so a
+    value read can be compared with or written back to the RW field.
+    Earlier versions returned the register masked in place, the field
+    still at bit lsb - shift that value right by lsb when porting code
+    written against it.
+    """
+    __slots__ = ('lsb', 'msb', 'mask')
+    
+    def __init__(self, reg_addr, num_bytes, lsb, msb, fmt_str='>B', volatile=True):
+        super().__init__(reg_addr, num_bytes, fmt_str, volatile)
         self.lsb = lsb
         self.msb = msb
-        self.width = msb - lsb
-        self.mask = 1
         
         # Generate bitmask
-        for bit in range(0, self.width):
-            self.mask = (self.mask<<1) + 1
-            
-        # Locate mask
-        self.mask = self.mask << self.lsb
+        self.mask = (1<<(msb-lsb+1)) - 1
+        
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
         
-    def __get__(self):
         # Return value of bitfield
-        [value] = self.i2c.readfrom_mem(self.dev_addr, self.reg_addr, self.num_bytes)        
-        return value & self.mask
+        return (self.value(obj) >> self.lsb)&self.mask
+
+    def decode(self, buf, offset=0):
+        # Extract bitfield from a buffer filled by a burst read
+        return (self.raw(buf, offset) >> self.lsb)&self.mask
         
-class RWRegBits:
-    def __init__(self, i2c, dev_addr, reg_addr, num_bytes, lsb, msb, fmt_str):
-        self.i2c = i2c
-        self.dev_addr = dev_addr
-        self.reg_addr = reg_addr
-        self.num_bytes = num_bytes
+class RWRegBits(Register):
+    __slots__ = ('lsb', 'msb', 'mask')
+    
+    def __init__(self, reg_addr, num_bytes, lsb, msb, fmt_str, volatile=False):
+        super().__init__(reg_addr, num_bytes, fmt_str, volatile)
         self.lsb = lsb
         self.msb = msb
-        self.fmt_str = fmt_str
-        self.mask = 0
-        self.premask = 0
         
         # Masking for bitfield that will be over written
-        for bit in range(0, (self.msb-self.lsb+1)):
-            self.mask = self.mask + 2**bit
+        self.mask = (1<<(msb-lsb+1)) - 1
         
-        # Masking for values prior to desired bitfield... if needed
-        if self.lsb > 0:
-            for bit in range(0, self.lsb-1):
-                self.premask = self.premask + 2**bit
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
         
-    def __get__(self):
-        # Retrieve register value and unpack to int
-        [value] = self.i2c.readfrom_mem(self.dev_addr, self.reg_addr, self.num_bytes)        
-        return (value >> self.lsb)&self.mask
+        # Return value of bitfield
+        return (self.value(obj) >> self.lsb)&self.mask
+
+    def decode(self, buf, offset=0):
+        # Extract bitfield from a buffer filled by a burst read
+        return (self.raw(buf, offset) >> self.lsb)&self.mask
     
-    def __set__(self, setting):
-        [value] = self.i2c.readfrom_mem(self.dev_addr, self.reg_addr, self.num_bytes)
+    def __set__(self, obj, setting):
+        lock = bus_lock(obj._i2c)
+        lock.acquire()
+        try:
+            # Volatile registers are read back, others come from the shadow
+            value = self.current(obj)
+            
+            # Clear bitfield then OR in new setting
+            self.write(obj, (value & ~(self.mask<<self.lsb)) | ((setting&self.mask)<<self.lsb))
+        finally:
+            lock.release()
         
-        new_value = ((value>>(self.msb+1))<<(self.msb+1)) + (setting<<self.lsb) + (value&self.premask)
+class RORegStruct(Register):
+    __slots__ = ()
+    
+    def __init__(self, reg_addr, num_bytes, fmt_str, volatile=True):
+        super().__init__(reg_addr, num_bytes, fmt_str, volatile)
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return self.from_raw(self.value(obj))
+
+    def decode(self, buf, offset=0):
+        # Unpack value from a buffer filled by a burst read
+        return self.unpack(buf, offset)
+
+class RegisterTimeout(RuntimeError):
+    """ Raised when wait_until gives up on a register field """
+    pass
+
+# wait_until polling delay, doubles after each miss
+WAIT_START_US = const(10)
+WAIT_MAX_US = const(10_000)
+
+def _field_value(obj, field):
+    # field is an attribute name or a Register object of obj's class
+    if isinstance(field, str):
+        return getattr(obj, field)
+    return field.__get__(obj)
+
+def wait_until(obj, field, value, timeout_ms, pin=None):
+    """
+    Block until obj.field == value or raise RegisterTimeout.
+    
+    With pin, a rising edge on the device's interrupt/data-ready line
+    triggers the next read and the CPU idles in between.  The pin must be
+    dedicated to the device, any handler it had is replaced and the IRQ
+    is removed on return.  Otherwise the field is polled with an
+    exponential backoff that starts at WAIT_START_US and is capped at
+    WAIT_MAX_US.
+    """
+    start = ticks_us()
+    timeout_us = timeout_ms * 1000
+    
+    if pin is not None:
+        flag = [False]
         
-        """
-        post = value>>(self.msb+1)
-        pre = value&self.premask
-        #print('Start: ', bin(value))
-        #print('Pre:', post)
-        #print('Value: ', (setting<<self.lsb))
-        #print('Post: ', pre)
-        new_value = post + (setting<<self.lsb) + pre
-        #print('End: ', bin(new_value))
-        """
-        new_value = struct.pack(self.fmt_str, new_value)        
-        self.i2c.writeto_mem(self.dev_addr, self.reg_addr, new_value)        
+        def handler(irq_pin):
+            flag[0] = True
         
-class RORegStruct:
-    def __init__(self, i2c, dev_addr, reg_addr, num_bytes, fmt_str):
-        self.i2c = i2c
-        self.dev_addr = dev_addr
-        self.reg_addr = reg_addr
-        self.num_bytes = num_bytes
-        self.fmt_str = fmt_str
+        pin.irq(handler=handler, trigger=Pin.IRQ_RISING)
+        
+    try:
+        delay = WAIT_START_US
+        while True:
+            # Cleared before the read, an edge during it is not lost
+            if pin is not None:
+                flag[0] = False
+            if _field_value(obj, field) == value:
+                return
+            
+            remaining = timeout_us - ticks_diff(ticks_us(), start)
+            if remaining <= 0:
+                raise RegisterTimeout('Timeout waiting for ' + str(field))
+            
+            if pin is None:
+                sleep_us(min(delay, remaining))
+                delay = min(delay*2, WAIT_MAX_US)
+            else:
+                # Idle until the edge, re-check at the latest every WAIT_MAX_US
+                wait = min(WAIT_MAX_US, remaining)
+                idle_start = ticks_us()
+                while not flag[0] and ticks_diff(ticks_us(), idle_start) < wait:
+                    idle()
+    finally:
+        if pin is not None:
+            pin.irq(handler=None)
+
+async def wait_until_async(obj, field, value, timeout_ms, pin=None):
+    """
+    uasyncio version of wait_until.  Other tasks run while waiting, with
+    pin the task sleeps on a ThreadSafeFlag set from the interrupt.  As
+    with wait_until the pin must be dedicated to the device.
+    """
+    import uasyncio
+    
+    start = ticks_us()
+    timeout_us = timeout_ms * 1000
+    
+    if pin is not None:
+        flag = uasyncio.ThreadSafeFlag()
+        pin.irq(handler=lambda irq_pin: flag.set(), trigger=Pin.IRQ_RISING)
+        
+    try:
+        delay_ms = 0
+        while _field_value(obj, field) != value:
+            remaining = timeout_us - ticks_diff(ticks_us(), start)
+            if remaining <= 0:
+                raise RegisterTimeout('Timeout waiting for ' + str(field))
+            
+            if pin is None:
+                await uasyncio.sleep_ms(delay_ms)
+                delay_ms = min(max(delay_ms*2, 1), WAIT_MAX_US//1000)
+            else:
+                try:
+                    await uasyncio.wait_for_ms(flag.wait(), max(remaining//1000, 1))
+                except uasyncio.TimeoutError:
+                    pass
+    finally:
+        if pin is not None:
+            pin.irq(handler=None)
+
+class RORegBlock(Register):
+    """
+    Run of num_bytes consecutive registers moved in one transaction.
+    Reading the attribute fills the device's buffer and returns a
+    memoryview of it, slice it for sub-fields or pass it straight to
+    struct.unpack_from - nothing is copied.  Each device has its own
+    buffer, reused by the next read of that device.
+    """
+    __slots__ = ()
     
-    def __get__(self):
-        value = self.i2c.readfrom_mem(self.dev_addr, self.reg_addr, self.num_bytes)
-        real_value = struct.unpack(self.fmt_str, value)
-        return real_value[0]
+    def __init__(self, reg_addr, num_bytes, volatile=True):
+        super().__init__(reg_addr, num_bytes, 'B', volatile)
+        
+    def view(self, obj):
+        # Block buffer of obj's device, allocated on first use
+        return self.buffer(reg_cache(obj._i2c, obj._dev_addr))
+        
+    def read(self, obj):
+        # Fill block from device
+        mv = self.view(obj)
+        obj._i2c.readfrom_mem_into(obj._dev_addr, self.reg_addr, mv)
+        return mv
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return self.read(obj)
+    
+    def decode(self, buf, offset=0):
+        # Block view of a buffer filled by a burst read
+        return memoryview(buf)[offset:offset+self.num_bytes]
+        
+class RWRegBlock(RORegBlock):
+    """
+    Read/Write run of consecutive registers.  Assigning any bytes-like
+    object of num_bytes length writes the whole block in one transaction.
+    """
+    __slots__ = ()
+    
+    def pack(self, data, buf):
+        # Copy data into block buffer, length must match
+        buf[:] = data
+        
+    def write(self, obj, data):
+        cache = reg_cache(obj._i2c, obj._dev_addr)
+        
+        # Inside Configure the write is held until the block exits
+        if cache.pending is not None:
+            cache.pending[self.reg_addr] = (bytes(data), self)
+        else:
+            buf = self.buffer(cache)
+            self.pack(data, buf)
+            obj._i2c.writeto_mem(obj._dev_addr, self.reg_addr, buf)
+        
+        # Shadowed fields inside the block are now out of date
+        for reg_addr in range(self.reg_addr, self.reg_addr+self.num_bytes):
+            cache.invalidate(reg_addr)
+            
+    def __set__(self, obj, data):
+        # Device buffer, hold the bus from pack to write
+        with bus_lock(obj._i2c):
+            self.write(obj, data)
+
+class Configure:
+    """
+    Context manager that defers every RW field write of one device until
+    the block exits.  Fields sharing a register are merged into a single
+    value and registers at contiguous addresses are written in one burst.
+    
+    with Configure(device) as cfg:
+        cfg.dlpf = 3
+        cfg.ext_sync = 0
+        cfg.fs_sel = 2
+        
+    1) Registers are written in ascending address order on exit
+    2) Reads of volatile fields inside the block still see the device
+    3) If the block raises, the deferred writes are discarded
+    4) On a shared bus the bus lock is held for the whole block
+    5) A driver with BURST = False gets one write per register
+    """
+    def __init__(self, obj):
+        self._obj = obj
+        self._cache = reg_cache(obj._i2c, obj._dev_addr)
+        self._lock = bus_lock(obj._i2c)
+        self._outer = False
+        
+    def __enter__(self):
+        self._lock.acquire()
+        
+        # Nested blocks are flushed by the outermost one
+        if self._cache.pending is None:
+            self._cache.pending = {}
+            self._outer = True
+        return self._obj
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if not self._outer:
+                return False
+            self._outer = False
+            
+            if exc_type is None:
+                self._cache.flush(_burst(self._obj))
+            else:
+                # Shadow holds values that never reached the device
+                for reg_addr in self._cache.pending:
+                    self._cache.invalidate(reg_addr)
+                self._cache.pending = None
+            return False
+        finally:
+            self._lock.release()
 
 class RO_Transaction:
     """
     The user can supply a transaction object with a list of any number of
-    Register objects. The Transaction object will then perform one I2C
-    transaction and return all data as a list OR perform all write operations.
+    Register objects. The Transaction object will then perform as few I2C
+    reads as possible and decode every field from the device's buffers.
     
     1) The Register objects should all be from one physical I2C device
-    2) True = Read, False = Write (Default is read)
-    3) Reads can be from non-sequential registers
-    4) Writes can be made only to sequential registers OR more than one
-       transaction will be generated
+    2) Reads can be from non-sequential registers
+    3) Registers no more than max_gap bytes apart are merged into one
+       contiguous read, larger holes start a new read
+    4) Values are returned in the order the registers were added, in a
+       list owned by the device and reused by its next read.  The span
+       buffers are per device as well
     
-    i.e.
+    Like the Register objects it is declared at class level and reading
+    the attribute performs the transaction.
     
-    # Define Register objects
-    register1 = [ROBits Object]
-    register2 = [ROBits Object]
-    register3 = [ROBits Object]
-    
-    # Create list object containing only Register objects
-    list_of_registers = [register1, register2, register3]
+    i.e.
     
-    # Instantiate Transaction object
-    data_from_device = Transaction(list_of_registers)
+    class Device:
+        # Define Register objects
+        register1 = RORegBits(...)
+        register2 = RORegBits(...)
+        register3 = RORegBits(...)
+        
+        # Instantiate Transaction object from Register objects
+        status = RO_Transaction([register1, register2, register3])
     
     # Retrieve data
-    data = data_from_device.__get__()
+    data = device.status
     
     # Use data as desired
-    datapoint_1 = data_from_device[0]
-    datapoint_2 = data_from_device[1]
-    datapoint_3 = data_from_device[2]
+    datapoint_1 = data[0]
+    datapoint_2 = data[1]
+    datapoint_3 = data[2]
     """
     
-    def __init__(self, read_or_write:bool = True, list_of_registers:list() =[]):
+    def __init__(self, list_of_registers:list = None, max_gap:int = 4):
         # Data
-        self._list_of_registers = list_of_registers
+        self._list_of_registers = []
+        self._max_gap = max_gap
+        self._spans = []
+        self._ordered = False
         
-        # Check container type
-        if self._list_of_registers.__class__() == list():
-            
-            # Check each element against all possible Register types
-            for reg in self._list_of_registers:
-                if self._list_of_registers[reg].__class__() in [RORegBit, RORegBits, RWRegBit, RWRegBits, RORegStruct]:
-                    pass
-                else:
-                    # Error
-                    pass
+        # Check each element against all possible Register types
+        if list_of_registers is not None:
+            for reg in list_of_registers:
+                self.add_reg(reg)
                 
     def add_reg(self, reg_object):
         """
         This function allows for register objects to be added to an already
         instantiated Transaction object
         """
-        if reg_object.__class__() in [RORegBit, RORegBits, RWRegBit, RWRegBits, RORegStruct]:
-            self._list_of_registers.append(reg_object)
-        else:
-            # Error
-            pass
+        if not isinstance(reg_object, Register):
+            raise TypeError('RO_Transaction - Not a Register object')
+        
+        self._list_of_registers.append(reg_object)
+        self._ordered = False
         
     def rem_reg(self, reg_object):
         """
         This function allows for a register object to be removed from an
         already instantiated transaction object
         """
-        if reg_object.__class__() in [RORegBit, RORegBits, RWRegBit, RWRegBits, RORegStruct]:
-            self._list_of_registers.remove(reg_object)
-        else:
-            # Error
-            pass
+        self._list_of_registers.remove(reg_object)
+        self._ordered = False
         
     def order_list(self):        
         """
-        1) Inspect each register to verify all the same device
-        2) Order register objects in ascending register location 0x0000... 0xffff
-        3) Perform single I2C Read from LowReg - HighReg location
-        4) Iterate through list and unpack data using Register Object data
+        1) Order register objects in ascending register location 0x0000... 0xffff
+        2) Merge registers into contiguous spans, one I2C read per span
+        3) Preallocate one buffer per span and record each field's offset
+        """
+        if len(self._list_of_registers) == 0:
+            raise ValueError('RO_Transaction - No registers')
         
-        reg_addresses  = []
+        # Indices of registers in ascending address order
+        order = sorted(range(len(self._list_of_registers)),
+                       key=lambda index: self._list_of_registers[index].reg_addr)
         
-        for reg in self._list_of_registers:
-            reg_addresses.append(self._list_of_registers[reg].reg_address)
+        # [start, end, [(index, offset)...]]
+        spans = []
+        for index in order:
+            reg = self._list_of_registers[index]
+            end = reg.reg_addr + reg.num_bytes
             
-        """
-        pass
+            if len(spans) > 0 and reg.reg_addr <= spans[-1][1] + self._max_gap:
+                span = spans[-1]
+                if end > span[1]:
+                    span[1] = end
+            else:
+                span = [reg.reg_addr, end, []]
+                spans.append(span)
             
+            span[2].append((index, reg.reg_addr - span[0]))
         
-            
-            
+        # (start address, num_bytes, fields), buffers are per device
+        self._spans = [(span[0], span[1]-span[0], span[2]) for span in spans]
+        self._ordered = True
         
-            
-                 
+    @property
+    def num_transactions(self):
+        # I2C reads issued per transaction
+        if not self._ordered:
+            self.order_list()
+        return len(self._spans)
+    
+    def read(self, obj):
+        """
+        Perform the burst reads against obj's device and return list of
+        decoded values.  The same list object is reused between calls on
+        one device, another device of the driver gets its own.
+        """
+        if not self._ordered:
+            self.order_list()
         
-                 
+        registers = self._list_of_registers
+        buffers = reg_cache(obj._i2c, obj._dev_addr).buffers
+        
+        # (spans it was built for, values, [(start, buffer, fields)...])
+        state = buffers.get(self)
+        if state is None or state[0] is not self._spans:
+            state = buffers[self] = (self._spans, [0] * len(registers),
+                                     [(start, bytearray(num_bytes), fields)
+                                      for start, num_bytes, fields in self._spans])
+        values = state[1]
         
-        
\ No newline at end of file
+        # Every span read back to back, status and data stay coherent
+        lock = bus_lock(obj._i2c)
+        lock.acquire()
+        try:
+            for start, buf, fields in state[2]:
+                obj._i2c.readfrom_mem_into(obj._dev_addr, start, buf)
+                
+                for index, offset in fields:
+                    values[index] = registers[index].decode(buf, offset)
+        finally:
+            lock.release()
+                
+        return values
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return self.read(obj)
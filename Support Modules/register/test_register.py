@@ -0,0 +1,146 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) CPython 3.9+
+    *   2) simulator (benchmark, machine)
+
+    * Purpose:
+        * Register module tests against the simulator's device models
+        * and the drivers in "Device Drivers".
+
+    * Notes:
+        1) Usage:
+             python3 -m pytest test_register.py
+             python3 test_register.py
+
+"""
+
+import os
+import struct
+import sys
+import threading
+import unittest
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [_HERE, os.path.join(os.path.dirname(_HERE), 'simulator')]
+
+import benchmark
+from machine import I2C, clock, models
+import register
+
+class WordRegisterTest(unittest.TestCase):
+    """ MCP9808 word registers, no address auto increment """
+    def setUp(self):
+        from mcp9808 import MCP9808
+        clock.reset()
+        self.i2c = I2C(0)
+        self.model = models.MCP9808(self.i2c)
+        register.invalidate(self.i2c, 0x18)
+        self.mcp = MCP9808(self.i2c, 0x18)
+
+    def test_configure(self):
+        with self.mcp.configure():
+            self.mcp.hi_temperature = 30
+            self.mcp.critical_temperature = 40
+        self.assertEqual(self.model.values[0x02], 0x1E0)
+        self.assertEqual(self.model.values[0x04], 0x280)
+
+    def test_restore(self):
+        mcp = self.mcp
+        mcp.hi_temperature = 30
+        mcp.low_temperature = 10
+        mcp.critical_temperature = 40
+        mcp.resolution = 1
+
+        # Word registers listed so that two of them follow each other
+        spans = ((0x02, 2), (0x04, 2), (0x03, 2), (0x08, 1))
+        blob = register.snapshot(mcp, spans)
+        saved = [self.model.values[reg_addr] for reg_addr, num_bytes in spans]
+
+        self.model.power_on()
+        register.restore(mcp, blob)
+        self.assertEqual([self.model.values[reg_addr] for reg_addr, num_bytes in spans], saved)
+        self.assertEqual(mcp.critical_temperature, 40)
+
+class _Accel:
+    # Class level descriptors shared by every instance
+    x = register.RORegStruct(0x3B, 2, '>h')
+    y = register.RORegStruct(0x3D, 2, '>h')
+    xy = register.RO_Transaction([x, y])
+
+    def __init__(self, i2c):
+        self._i2c = i2c
+        self._dev_addr = 0x68
+
+class SharedBusTest(unittest.TestCase):
+    """ One device per SharedBus, each polled from its own thread """
+    def test_two_buses(self):
+        from transport import SharedBus
+        clock.reset()
+        devices = []
+        for index in range(0, 2):
+            i2c = I2C(index)
+            model = models.MPU6050(i2c)
+            model.accel = [0.5 - index, index - 0.5, 1.0]
+            model.regs[0x6B] = 0
+            devices.append(_Accel(SharedBus(i2c)))
+        clock.advance(1_000)
+        expected = [(device.x, list(device.xy)) for device in devices]
+        self.assertNotEqual(expected[0], expected[1])
+
+        wrong = [0, 0]
+        def poll(index):
+            device = devices[index]
+            for sample in range(0, 1000):
+                if (device.x, device.xy) != expected[index]:
+                    wrong[index] += 1
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=poll, args=(index,)) for index in range(0, 2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(wrong, [0, 0])
+
+class FifoFormatTest(unittest.TestCase):
+    """ FifoStream frame formats """
+    def test_repeat_count(self):
+        from fifo import FifoStream
+        stream = FifoStream('>6h', 2)
+        self.assertEqual(len(stream.channels), 6)
+        stream.decode(struct.pack('>6h', 1, -2, 3, -4, 5, -6) * 2, 2)
+        self.assertEqual([channel[1] for channel in stream.channels], [1, -2, 3, -4, 5, -6])
+
+    def test_64_bit(self):
+        from fifo import FifoStream
+        stream = FifoStream('<qQd', 1)
+        stream.decode(struct.pack('<qQd', -2**40, 2**63, 0.5), 1)
+        self.assertEqual([channel[0] for channel in stream.channels], [-2**40, 2**63, 0.5])
+
+    def test_bad_format(self):
+        from fifo import FifoStream
+        with self.assertRaisesRegex(ValueError, "'x'"):
+            FifoStream('>6x', 2)
+
+class InstrumentTest(unittest.TestCase):
+    """ InstrumentedI2C counts raw transfers as well """
+    def test_raw(self):
+        from instrument import InstrumentedI2C, RAW
+        i2c = I2C(0)
+        models.MCP9808(i2c)
+        bus = InstrumentedI2C(i2c)
+        bus.writeto(0x18, b'\x06')
+        bus.readfrom(0x18, 2)
+        bus.readfrom_into(0x18, bytearray(2))
+        entry = bus.stats()[(0x18, RAW)]
+        self.assertEqual(bus.transactions, 3)
+        self.assertEqual((entry['reads'], entry['writes'], entry['bytes']), (2, 1, 5))
+
+if __name__ == '__main__':
+    unittest.main()
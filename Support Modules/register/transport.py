@@ -0,0 +1,285 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) MicroPython
+
+    * Purpose:
+        * Bus transports for the register module.  Every transport
+        * provides the memory access API of machine.I2C, so it can be
+        * handed to any driver in place of the I2C object and all
+        * Register objects work over it unchanged.
+
+            * I2CTransport - I2C with fixed 8 or 16 bit register addresses
+            * SPITransport - 3/4 wire SPI with per device chip select
+            * SharedBus    - Any of the above shared between cores/threads
+
+
+    * Notes:
+        1) Methods provided by every transport:
+             readfrom_mem(dev_addr, reg_addr, num_bytes)
+             readfrom_mem_into(dev_addr, reg_addr, buf)
+             writeto_mem(dev_addr, reg_addr, buf)
+             readfrom(dev_addr, num_bytes), readfrom_into(dev_addr, buf)
+             writeto(dev_addr, buf)
+           On SPITransport the last three are raw transfers with no
+           command byte, stop=False keeps chip select low so the next
+           transfer continues the same transaction.
+
+        2) SPITransport is created once per device since it owns the chip
+           select pin.  The dev_addr passed by the driver is ignored.
+
+             spi = SPI(1, baudrate=10_000_000, polarity=1, phase=1, ...)
+             mag = LIS2MDL(SPITransport(spi, Pin(5, Pin.OUT)))
+
+        3) SPI command byte:
+             read_bit is OR'd into the register address for reads.
+             auto_inc_bit is OR'd in for transfers longer than one byte,
+             leave it 0 for devices that always auto increment (DPS310,
+             LIS2MDL) and use 0x40 for the ST "MS" bit convention.
+             Both bits take address bits away, a register address that
+             has either set raises ValueError instead of being sent as
+             a different register.
+
+        4) SharedBus serialises every transfer with a BusLock.  Create
+           one per physical bus and hand it to every driver on it, on
+           either core:
+
+             bus = SharedBus(I2C(0))
+             mpu = MPU6050(bus, 0x68)
+             _thread.start_new_thread(acquisition, (mpu,))
+
+           The register module holds the lock across read-modify-write,
+           burst reads and Configure blocks, and keeps its transfer
+           buffers per device, so devices on different SharedBus objects
+           can be used from different cores at the same time.  For other
+           multi-step sequences hold it yourself, the lock is reentrant:
+
+             with bus:
+                 if dps._prs_rdy:
+                     raw = bytes(dps._raw_readings)
+
+           SPI devices on one SPI bus share a BusLock:
+             lock = BusLock()
+             mag = LIS2MDL(SharedBus(SPITransport(spi, cs1), lock))
+             imu = ism330dlc(SharedBus(SPITransport(spi, cs2), lock), 0x6A)
+
+        5) Do not use a SharedBus from a hard IRQ handler, it may block.
+
+"""
+
+from machine import I2C, SPI, Pin
+import _thread
+
+class I2CTransport:
+    """ machine.I2C with the register address size fixed per device """
+    def __init__(self, i2c, addrsize=8):
+        self._i2c = i2c
+        self._addrsize = addrsize
+
+    def readfrom_mem(self, dev_addr, reg_addr, num_bytes, addrsize=None):
+        if addrsize is None:
+            addrsize = self._addrsize
+        return self._i2c.readfrom_mem(dev_addr, reg_addr, num_bytes, addrsize=addrsize)
+
+    def readfrom_mem_into(self, dev_addr, reg_addr, buf, addrsize=None):
+        if addrsize is None:
+            addrsize = self._addrsize
+        self._i2c.readfrom_mem_into(dev_addr, reg_addr, buf, addrsize=addrsize)
+
+    def writeto_mem(self, dev_addr, reg_addr, buf, addrsize=None):
+        if addrsize is None:
+            addrsize = self._addrsize
+        self._i2c.writeto_mem(dev_addr, reg_addr, buf, addrsize=addrsize)
+
+    def __getattr__(self, name):
+        # scan(), readfrom(), etc. go straight to the bus
+        return getattr(self._i2c, name)
+
+class SPITransport:
+    """ Register access over SPI for one device """
+    def __init__(self, spi, cs, read_bit=0x80, auto_inc_bit=0x00):
+        self._spi = spi
+        self._cs = cs
+        self._read_bit = read_bit
+        self._auto_inc_bit = auto_inc_bit
+
+        # Preallocated command byte
+        self._cmd = bytearray(1)
+
+        # Chip select idles high
+        self._cs.value(1)
+
+    def _command(self, reg_addr, num_bytes, read):
+        # Build command byte in place
+        if reg_addr & (self._read_bit | self._auto_inc_bit) or reg_addr > 0xFF:
+            raise ValueError('SPITransport - Register 0x%02X overlaps the command bits' % reg_addr)
+        cmd = reg_addr
+        if read:
+            cmd |= self._read_bit
+        if num_bytes > 1:
+            cmd |= self._auto_inc_bit
+        self._cmd[0] = cmd
+
+    def readfrom_mem(self, dev_addr, reg_addr, num_bytes, addrsize=8):
+        buf = bytearray(num_bytes)
+        self.readfrom_mem_into(dev_addr, reg_addr, buf)
+        return buf
+
+    def readfrom_mem_into(self, dev_addr, reg_addr, buf, addrsize=8):
+        self._command(reg_addr, len(buf), True)
+        self._cs.value(0)
+        try:
+            self._spi.write(self._cmd)
+            self._spi.readinto(buf)
+        finally:
+            self._cs.value(1)
+
+    def writeto_mem(self, dev_addr, reg_addr, buf, addrsize=8):
+        self._command(reg_addr, len(buf), False)
+        self._cs.value(0)
+        try:
+            self._spi.write(self._cmd)
+            self._spi.write(buf)
+        finally:
+            self._cs.value(1)
+
+    def _end(self, stop):
+        # Deselect, unless the caller continues the transaction
+        if stop:
+            self._cs.value(1)
+
+    def readfrom(self, dev_addr, num_bytes, stop=True):
+        buf = bytearray(num_bytes)
+        self.readfrom_into(dev_addr, buf, stop)
+        return buf
+
+    def readfrom_into(self, dev_addr, buf, stop=True):
+        # Raw read, no command byte
+        self._cs.value(0)
+        try:
+            self._spi.readinto(buf)
+        except Exception:
+            self._cs.value(1)
+            raise
+        self._end(stop)
+
+    def writeto(self, dev_addr, buf, stop=True):
+        # Raw write, no command byte, returns bytes written like I2C acks
+        self._cs.value(0)
+        try:
+            self._spi.write(buf)
+        except Exception:
+            self._cs.value(1)
+            raise
+        self._end(stop)
+        return len(buf)
+
+class BusLock:
+    """
+    Reentrant lock for a shared bus.  An uncontended acquire is one
+    non-blocking try on the underlying lock, the same thread may nest
+    acquires freely.  contended counts acquires that had to wait.
+    """
+    def __init__(self):
+        self._lock = _thread.allocate_lock()
+        self._owner = None
+        self._depth = 0
+        self.contended = 0
+
+    def acquire(self):
+        ident = _thread.get_ident()
+
+        # Only this thread ever stores its own ident
+        if self._owner == ident:
+            self._depth += 1
+            return
+        if not self._lock.acquire(0):
+            self.contended += 1
+            self._lock.acquire()
+        self._owner = ident
+        self._depth = 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            self._owner = None
+            self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+class SharedBus:
+    """ Bus used from several threads/cores, every transfer is atomic """
+    def __init__(self, bus, lock=None):
+        self._bus = bus
+        if lock is None:
+            lock = BusLock()
+        self.lock = lock
+
+    def readfrom_mem(self, dev_addr, reg_addr, num_bytes, **kwargs):
+        self.lock.acquire()
+        try:
+            return self._bus.readfrom_mem(dev_addr, reg_addr, num_bytes, **kwargs)
+        finally:
+            self.lock.release()
+
+    def readfrom_mem_into(self, dev_addr, reg_addr, buf, **kwargs):
+        self.lock.acquire()
+        try:
+            self._bus.readfrom_mem_into(dev_addr, reg_addr, buf, **kwargs)
+        finally:
+            self.lock.release()
+
+    def writeto_mem(self, dev_addr, reg_addr, buf, **kwargs):
+        self.lock.acquire()
+        try:
+            self._bus.writeto_mem(dev_addr, reg_addr, buf, **kwargs)
+        finally:
+            self.lock.release()
+
+    def readfrom_into(self, addr, buf, stop=True):
+        self.lock.acquire()
+        try:
+            self._bus.readfrom_into(addr, buf, stop)
+        finally:
+            self.lock.release()
+
+    def readfrom(self, addr, nbytes, stop=True):
+        self.lock.acquire()
+        try:
+            return self._bus.readfrom(addr, nbytes, stop)
+        finally:
+            self.lock.release()
+
+    def writeto(self, addr, buf, stop=True):
+        self.lock.acquire()
+        try:
+            return self._bus.writeto(addr, buf, stop)
+        finally:
+            self.lock.release()
+
+    def scan(self):
+        self.lock.acquire()
+        try:
+            return self._bus.scan()
+        finally:
+            self.lock.release()
+
+    # Atomic section, with bus: ...
+    def __enter__(self):
+        self.lock.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.lock.release()
+        return False
+
+    def __getattr__(self, name):
+        # init(), deinit(), etc. go straight to the bus
+        return getattr(self._bus, name)
@@ -0,0 +1,518 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) CPython 3.6+
+    *   2) PyYAML, only for .yaml/.yml register maps
+
+    * Purpose:
+        * Offline generator that turns a declarative register map into a
+        * MicroPython driver module.  Every field becomes a plain property
+        * with its address, mask and shift folded into literals, instead
+        * of a generic Register descriptor doing the same work at run time.
+
+            * load     - Read and check a JSON/YAML register map
+            * generate - Driver module source for a map
+            * compare  - Check a map against a hand written driver class
+
+    * Notes:
+        1) Usage:
+             python3 regmap.py maps/lis2mdl.json -o lis2mdl_regs.py
+             python3 regmap.py maps/lis2mdl.json --compare lis2mdl:LIS2MDL
+
+           --compare imports the driver, put "Support Modules/simulator",
+           "Support Modules/register" and the driver folder on PYTHONPATH.
+
+        2) Map format, hex strings or integers for addresses:
+             {
+               "device": "LIS2MDL",
+               "address": "0x1E",
+               "format": "<B",
+               "registers": [
+                 {"name": "CFG_REG_A", "address": "0x60", "fields": [
+                   {"name": "mode", "bits": [0, 1], "access": "rw"},
+                   {"name": "soft_rst", "bits": 5, "access": "rw", "volatile": true}]},
+                 {"name": "OUTX_L_REG", "address": "0x68", "format": "<h", "fields": [
+                   {"name": "x", "access": "ro", "scale": 1.5}]}
+               ]
+             }
+
+           format      - struct format of the register, 1, 2 or 4 byte
+                         integers.  Map level value is the default.
+           bits        - bit number or [lsb, msb], whole register if absent
+           access      - ro, rw or wo
+           volatile    - defaults like the register module, ro fields
+                         are read every time, rw fields are shadowed
+           scale       - reads are multiplied, writes divided by it
+           doc         - comment placed above the property
+
+        3) Generated drivers keep the register module's RegCache, so
+           invalidate()/refresh() and snapshot() (CONFIG_REGISTERS is
+           emitted) work as before, and read-modify-write holds
+           bus_lock().  Writes are not deferred by Configure.  Shadow
+           hits are not counted, only misses.  Both keep raw register
+           bits in the shadow, generated accessors and Register
+           descriptors can be mixed on one device.
+
+        4) Accessors are emitted inline: one shadow lookup or one read,
+           then the byte order, shift and mask as literals.  Only a
+           shadow miss calls a helper.
+
+        5) Each instance owns its transfer buffers, use one instance
+           per thread.  Pass a transport.SharedBus to share the bus.
+
+"""
+
+import argparse
+import json
+import struct
+import sys
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+GENERATOR_VERSION = 2
+
+ACCESS = ('ro', 'rw', 'wo')
+
+# Unsigned format per register size, kept in the shadow
+_UNSIGNED = {1: 'B', 2: 'H', 4: 'I'}
+
+class RegMapError(ValueError):
+    """ Raised for a register map that cannot be generated """
+    pass
+
+class Field:
+    __slots__ = ('name', 'register', 'lsb', 'msb', 'access', 'volatile', 'scale', 'doc')
+
+    def __init__(self, name, register, lsb, msb, access, volatile, scale, doc):
+        self.name = name
+        self.register = register
+        self.lsb = lsb
+        self.msb = msb
+        self.access = access
+        self.volatile = volatile
+        self.scale = scale
+        self.doc = doc
+
+    @property
+    def mask(self):
+        # Field mask before shifting
+        return (1 << (self.msb - self.lsb + 1)) - 1
+
+    @property
+    def whole(self):
+        # Field covers the whole register
+        return self.lsb == 0 and self.msb == 8*self.register.num_bytes - 1
+
+class RegisterSpec:
+    __slots__ = ('name', 'address', 'fmt_str', 'num_bytes', 'signed', 'fields')
+
+    def __init__(self, name, address, fmt_str):
+        self.name = name
+        self.address = address
+        self.fmt_str = fmt_str
+        self.num_bytes = struct.calcsize(fmt_str)
+        self.signed = fmt_str[1].islower()
+        self.fields = []
+
+    @property
+    def unsigned(self):
+        # Format the generated helpers read and write with
+        return self.fmt_str[0] + _UNSIGNED[self.num_bytes]
+
+class RegMap:
+    __slots__ = ('device', 'address', 'registers')
+
+    def __init__(self, device, address, registers):
+        self.device = device
+        self.address = address
+        self.registers = registers
+
+    @property
+    def fields(self):
+        return [field for register in self.registers for field in register.fields]
+
+# === Loading ===
+def _number(value, what):
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value), 0)
+    except ValueError:
+        raise RegMapError('%s - Not a number: %r' % (what, value))
+
+def _format(fmt_str, what):
+    if (not isinstance(fmt_str, str) or len(fmt_str) != 2 or fmt_str[0] not in '<>'
+            or fmt_str[1] not in 'bBhHiIlL'):
+        raise RegMapError('%s - Format must be < or > and a 1, 2 or 4 byte integer: %r'
+                          % (what, fmt_str))
+    return fmt_str
+
+def _identifier(name, what):
+    if not isinstance(name, str) or not name.isidentifier() or name.startswith('_'):
+        raise RegMapError('%s - Not a public identifier: %r' % (what, name))
+    return name
+
+def parse(data):
+    """ RegMap from the decoded JSON/YAML document """
+    device = _identifier(data.get('device'), 'device')
+    default_fmt = _format(data.get('format', '>B'), device)
+    address = _number(data.get('address'), device + ' address')
+
+    names = set()
+    registers = []
+    for reg_data in data.get('registers', ()):
+        reg_name = _identifier(reg_data.get('name'), 'register')
+        what = '%s.%s' % (device, reg_name)
+        register = RegisterSpec(reg_name, _number(reg_data.get('address'), what),
+                                _format(reg_data.get('format', default_fmt), what))
+        used = 0
+
+        for field_data in reg_data.get('fields', ()):
+            name = _identifier(field_data.get('name'), what + ' field')
+            field_what = '%s.%s' % (device, name)
+            if name in names:
+                raise RegMapError(field_what + ' - Defined twice')
+            names.add(name)
+
+            bits = field_data.get('bits')
+            if bits is None:
+                lsb, msb = 0, 8*register.num_bytes - 1
+            elif isinstance(bits, list):
+                lsb, msb = bits
+            else:
+                lsb = msb = bits
+            if not 0 <= lsb <= msb < 8*register.num_bytes:
+                raise RegMapError('%s - Bits %s outside %s' % (field_what, bits, register.name))
+
+            mask = ((1 << (msb - lsb + 1)) - 1) << lsb
+            if used & mask:
+                raise RegMapError(field_what + ' - Overlaps another field of ' + register.name)
+            used |= mask
+
+            access = field_data.get('access', 'rw')
+            if access not in ACCESS:
+                raise RegMapError('%s - Access must be one of %s' % (field_what, ', '.join(ACCESS)))
+
+            volatile = field_data.get('volatile', access == 'ro')
+            scale = field_data.get('scale')
+            register.fields.append(Field(name, register, lsb, msb, access, bool(volatile),
+                                         scale, field_data.get('doc')))
+        registers.append(register)
+
+    if not registers:
+        raise RegMapError(device + ' - No registers')
+    return RegMap(device, address, registers)
+
+def load(path):
+    """ Read and check a .json, .yaml or .yml register map """
+    with open(path) as file:
+        text = file.read()
+    if path.endswith(('.yaml', '.yml')):
+        if yaml is None:
+            raise RegMapError('PyYAML is needed to read ' + path)
+        return parse(yaml.safe_load(text))
+    return parse(json.loads(text))
+
+# === Generation ===
+_HELPERS = '''
+    def _fetch(self, reg_addr, buf, order):
+        # Shadow miss, read the register once and keep it
+        self._cache.misses += 1
+        self._i2c.readfrom_mem_into(self._dev_addr, reg_addr, buf)
+        value = int.from_bytes(buf, order)
+        self._shadow[reg_addr] = value
+        return value
+'''
+
+_ORDERS = {'<': 'little', '>': 'big'}
+
+def _hex(value, num_bytes=1):
+    return '0x%0*X' % (2*num_bytes, value)
+
+def _config_spans(regmap):
+    # Writable, shadowed registers as merged (reg_addr, num_bytes) spans
+    spans = []
+    for register in sorted(regmap.registers, key=lambda register: register.address):
+        if not any(field.access != 'ro' and not field.volatile for field in register.fields):
+            continue
+        if spans and spans[-1][0] + spans[-1][1] == register.address:
+            spans[-1][1] += register.num_bytes
+        else:
+            spans.append([register.address, register.num_bytes])
+    return spans
+
+def _buf(register):
+    return 'self._buf%d' % register.num_bytes
+
+def _decode(register):
+    # Unsigned value of buf, byte order folded in
+    count = register.num_bytes
+    terms = []
+    for index in range(0, count):
+        shift = 8 * (count - 1 - index if register.fmt_str[0] == '>' else index)
+        terms.append('buf[%d] << %d' % (index, shift) if shift else 'buf[%d]' % index)
+    return ' | '.join('(%s)' % term if '<<' in term else term for term in terms)
+
+def _encode(register, value):
+    # Lines filling buf from value, byte order folded in
+    count = register.num_bytes
+    lines = []
+    for index in range(0, count):
+        shift = 8 * (count - 1 - index if register.fmt_str[0] == '>' else index)
+        byte = '%s >> %d' % (value, shift) if shift else value
+        if count > 1 and index != (0 if register.fmt_str[0] == '>' else count - 1):
+            byte = '(%s) & 0xFF' % byte if shift else '%s & 0xFF' % byte
+        lines.append('buf[%d] = %s' % (index, byte))
+    return lines
+
+def _fetch(register, name):
+    # Lines leaving the unsigned register value in name
+    address = _hex(register.address)
+    return ['%s = self._shadow.get(%s)' % (name, address),
+            'if %s is None:' % name,
+            '    %s = self._fetch(%s, %s, %r)' % (name, address, _buf(register),
+                                                  _ORDERS[register.fmt_str[0]])]
+
+def _read(register, name):
+    # Lines reading the register from the device into name
+    return ['buf = ' + _buf(register),
+            'self._i2c.readfrom_mem_into(self._dev_addr, %s, buf)' % _hex(register.address),
+            '%s = %s' % (name, _decode(register))]
+
+def _getter(field):
+    register = field.register
+    lines = ['    @property', '    def %s(self):' % field.name]
+    body = _read(register, 'value') if field.volatile else _fetch(register, 'value')
+
+    value = 'value'
+    if field.whole and register.signed:
+        # Two's complement with the sign bit folded in
+        sign_bit = 1 << (8*register.num_bytes - 1)
+        body.append('if value & %s:' % _hex(sign_bit, register.num_bytes))
+        body.append('    value -= %s' % hex(sign_bit << 1))
+    elif not field.whole:
+        if field.lsb:
+            value = '%s >> %d' % (value, field.lsb)
+        if field.msb < 8*register.num_bytes - 1:
+            if field.lsb:
+                value = '(%s)' % value
+            value = '%s & %s' % (value, _hex(field.mask, register.num_bytes))
+
+    if field.scale is not None:
+        if value != 'value':
+            value = '(%s)' % value
+        value = '%s * %r' % (value, field.scale)
+
+    # A volatile field of a single byte is decoded straight from buf
+    if field.volatile and register.num_bytes == 1 and body[-1] == 'value = buf[0]':
+        body.pop()
+        value = value.replace('value', 'buf[0]')
+    body.append('return ' + value)
+    return lines + ['        ' + line for line in body]
+
+def _setter(field):
+    register = field.register
+    address = _hex(register.address)
+    lines = []
+    if field.access == 'rw':
+        lines.append('    @%s.setter' % field.name)
+    lines.append('    def %s(self, value):' % (field.name if field.access == 'rw' else '_set_' + field.name))
+
+    body = []
+    if field.scale is not None:
+        body.append('value = int(round(value / %r))' % field.scale)
+
+    if field.whole:
+        body.append('value &= %s' % _hex(field.mask, register.num_bytes))
+        body.append('buf = ' + _buf(register))
+        body += _encode(register, 'value')
+        body.append('self._i2c.writeto_mem(self._dev_addr, %s, buf)' % address)
+        stored = 'value'
+    else:
+        # Read-modify-write, field mask and its complement folded in
+        in_place = field.mask << field.lsb
+        keep = ((1 << 8*register.num_bytes) - 1) & ~in_place
+        bits = '(value << %d)' % field.lsb if field.lsb else 'value'
+        inner = _read(register, 'current') if field.volatile else _fetch(register, 'current')
+        if not field.volatile:
+            inner.append('buf = ' + _buf(register))
+        inner.append('current = (current & %s) | (%s & %s)'
+                     % (_hex(keep, register.num_bytes), bits, _hex(in_place, register.num_bytes)))
+        inner += _encode(register, 'current')
+        inner.append('self._i2c.writeto_mem(self._dev_addr, %s, buf)' % address)
+        stored = 'current'
+
+    # Self-clearing bits must not be replayed by later shadowed writes
+    if field.volatile:
+        store = 'self._shadow.pop(%s, None)' % address
+    else:
+        store = 'self._shadow[%s] = %s' % (address, stored)
+
+    if field.whole:
+        body.append(store)
+    else:
+        body.append('self._lock.acquire()')
+        body.append('try:')
+        body += ['    ' + line for line in inner + [store]]
+        body.append('finally:')
+        body.append('    self._lock.release()')
+    return lines + ['        ' + line for line in body]
+
+def generate(regmap, source=None):
+    """ Driver module source for regmap """
+    lines = ['"""',
+             '    * Author(s): regmap.py v%d - edit the register map, not this file' % GENERATOR_VERSION,
+             '',
+             '    * Dependencies:',
+             '    *   1) MicroPython',
+             '    *   2) register',
+             '',
+             '    * Purpose:',
+             '        * Register access for the %s%s.' % (regmap.device,
+                                                         ', from ' + source if source else ''),
+             '',
+             '"""',
+             '',
+             'from micropython import const',
+             'from register import reg_cache, bus_lock',
+             '',
+             '# Unsigned format of each register, for RegCache.refresh()',
+             '_FORMATS = {%s}' % ', '.join('%s: %r' % (_hex(register.address), register.unsigned)
+                                           for register in sorted(regmap.registers,
+                                                                  key=lambda register: register.address)),
+             '',
+             'class Register:']
+    width = max(len(register.name) for register in regmap.registers)
+    for register in sorted(regmap.registers, key=lambda register: register.address):
+        lines.append('    %-*s = const(%s)' % (width, register.name, _hex(register.address)))
+
+    lines += ['', 'class %s:' % regmap.device, '',
+              '    # Writable configuration, (reg_addr, num_bytes), for register snapshots']
+    spans = ['(%s, %d)' % (_hex(address), num_bytes) for address, num_bytes in _config_spans(regmap)]
+    if len(spans) == 1:
+        spans.append('')
+    lines.append('    CONFIG_REGISTERS = (%s)' % ', '.join(spans).rstrip())
+
+    lines += ['',
+              '    def __init__(self, i2c, address=%s):' % _hex(regmap.address),
+              '        self._i2c = i2c',
+              '        self._dev_addr = address',
+              '        self._cache = reg_cache(i2c, address)',
+              '        self._cache.formats.update(_FORMATS)',
+              '        self._lock = bus_lock(i2c)',
+              '',
+              '        # Shadowed register values, shared with the register module',
+              '        self._shadow = self._cache.values',
+              '',
+              '        # Transfer buffer per register size']
+    for size in sorted(set(register.num_bytes for register in regmap.registers)):
+        lines.append('        self._buf%d = bytearray(%d)' % (size, size))
+    lines += _HELPERS.split('\n')
+
+    for register in regmap.registers:
+        lines.append('    # === %s - %s ===' % (register.name, _hex(register.address)))
+        for field in register.fields:
+            if field.doc:
+                lines.append('    # ' + field.doc)
+            if field.access != 'wo':
+                lines += _getter(field)
+                lines.append('')
+            if field.access != 'ro':
+                lines += _setter(field)
+                lines.append('')
+            if field.access == 'wo':
+                lines.append('    %s = property(None, _set_%s)' % (field.name, field.name))
+                lines.append('')
+
+    while lines[-1] == '':
+        lines.pop()
+    return '\n'.join(lines) + '\n'
+
+# === Comparison ===
+def _descriptor(cls, name):
+    # Hand written drivers keep raw fields private behind a property
+    for attr in (name, '_' + name):
+        for klass in cls.__mro__:
+            if attr in klass.__dict__ and hasattr(klass.__dict__[attr], 'reg_addr'):
+                return attr, klass.__dict__[attr]
+    return None, None
+
+def compare(regmap, cls):
+    """ Differences between regmap and the Register objects of cls """
+    differences = []
+    covered = set()
+    for field in regmap.fields:
+        register = field.register
+        attr, desc = _descriptor(cls, field.name)
+        if desc is None:
+            differences.append('%s: not in %s' % (field.name, cls.__name__))
+            continue
+        covered.add(attr)
+
+        if desc.reg_addr != register.address:
+            differences.append('%s: address %s, %s has %s'
+                               % (field.name, _hex(register.address), attr, _hex(desc.reg_addr)))
+        if desc.num_bytes != register.num_bytes:
+            differences.append('%s: %d bytes, %s has %d'
+                               % (field.name, register.num_bytes, attr, desc.num_bytes))
+        if hasattr(desc, 'bit_location'):
+            lsb = msb = desc.bit_location
+        elif hasattr(desc, 'lsb'):
+            lsb, msb = desc.lsb, desc.msb
+        else:
+            lsb, msb = 0, 8*desc.num_bytes - 1
+        if (lsb, msb) != (field.lsb, field.msb):
+            differences.append('%s: bits %d..%d, %s has %d..%d'
+                               % (field.name, field.lsb, field.msb, attr, lsb, msb))
+        writable = type(desc).__name__.startswith('RW')
+        if writable != (field.access != 'ro'):
+            differences.append('%s: access %s, %s is %s'
+                               % (field.name, field.access, attr, type(desc).__name__))
+        if desc.volatile != field.volatile:
+            differences.append('%s: volatile %s, %s has %s'
+                               % (field.name, field.volatile, attr, desc.volatile))
+
+    for klass in cls.__mro__:
+        for attr, desc in klass.__dict__.items():
+            if attr not in covered and hasattr(desc, 'reg_addr'):
+                differences.append('%s: not in the map' % attr)
+                covered.add(attr)
+    return differences
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a driver module from a register map')
+    parser.add_argument('map', help='register map, .json, .yaml or .yml')
+    parser.add_argument('-o', '--output', help='write the module here instead of stdout')
+    parser.add_argument('--compare', metavar='MODULE:CLASS',
+                        help='check the map against a hand written driver, exit 1 on a difference')
+    args = parser.parse_args(argv)
+
+    try:
+        regmap = load(args.map)
+    except RegMapError as error:
+        print('regmap:', error, file=sys.stderr)
+        return 2
+
+    if args.compare:
+        import importlib
+        module_name, class_name = args.compare.split(':')
+        cls = getattr(importlib.import_module(module_name), class_name)
+        differences = compare(regmap, cls)
+        for line in differences:
+            print(line)
+        return 1 if differences else 0
+
+    source = generate(regmap, args.map.replace('\\', '/').split('/')[-1])
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(source)
+    else:
+        sys.stdout.write(source)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
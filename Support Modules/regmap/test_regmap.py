@@ -0,0 +1,141 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) CPython 3.9+
+    *   2) simulator (benchmark, machine), register
+
+    * Purpose:
+        * Generates the LIS2MDL module from maps/lis2mdl.json and runs it
+        * against the simulator's LIS2MDL model and the hand written
+        * driver.
+
+    * Notes:
+        1) Usage:
+             python3 -m pytest test_regmap.py
+             python3 test_regmap.py
+
+"""
+
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [_HERE, os.path.join(os.path.dirname(_HERE), 'simulator')]
+
+import benchmark
+from machine import I2C, clock, models
+import register
+import regmap
+
+_MAP = os.path.join(_HERE, 'maps', 'lis2mdl.json')
+
+# LIS2MDL hard iron offset, a signed shadowed register
+_OFFSET_MAP = {'device': 'Offset', 'address': '0x1E', 'registers': [
+    {'name': 'OFFSET_X_REG_L', 'address': '0x45', 'format': '<h',
+     'fields': [{'name': 'offset_x', 'access': 'rw'}]}]}
+
+class _Offset:
+    # Hand written descriptors for the same register
+    offset_x = register.RWRegBits(0x45, 2, 0, 15, '<h')
+    signed_x = register.RORegStruct(0x45, 2, '<h', volatile=False)
+
+    def __init__(self, i2c):
+        self._i2c = i2c
+        self._dev_addr = 0x1E
+
+def _generated(mapping=None, name='lis2mdl_regs'):
+    # Module generated from the map, imported from a scratch file
+    if mapping is None:
+        source = regmap.generate(regmap.load(_MAP), 'lis2mdl.json')
+    else:
+        source = regmap.generate(regmap.parse(mapping))
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, name + '.py')
+        with open(path, 'w') as file:
+            file.write(source)
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module
+
+class GeneratedDriverTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = _generated()
+
+    def setUp(self):
+        clock.reset()
+        self.i2c = I2C(0)
+        self.model = models.LIS2MDL(self.i2c)
+        register.invalidate(self.i2c, 0x1E)
+        self.mag = self.module.LIS2MDL(self.i2c)
+
+    def test_matches_hand_written(self):
+        from lis2mdl import LIS2MDL
+        self.assertEqual(regmap.compare(regmap.load(_MAP), LIS2MDL), [])
+
+    def test_field_round_trip(self):
+        mag = self.mag
+        mag.odr = 2
+        mag.mode = 0
+        mag.temp_comp_en = 1
+        self.assertEqual(self.model.regs[0x60], 0x88)
+        self.assertEqual((mag.odr, mag.mode, mag.temp_comp_en), (2, 0, 1))
+
+        # Fields sharing the register are merged, not overwritten
+        mag.low_power_mode = 1
+        self.assertEqual(self.model.regs[0x60], 0x98)
+
+    def test_shadow(self):
+        mag = self.mag
+        mag.odr = 3
+        hits, misses = register.reg_cache(self.i2c, 0x1E).stats
+
+        # Shadowed read, no bus traffic
+        self.model.regs[0x60] = 0
+        self.assertEqual(mag.odr, 3)
+
+        # Reloaded after the shadow is dropped, and by refresh()
+        register.invalidate(self.i2c, 0x1E)
+        self.assertEqual(mag.odr, 0)
+        self.model.regs[0x60] = 0x08
+        register.refresh(self.i2c, 0x1E)
+        self.assertEqual(mag.odr, 2)
+        self.assertEqual(register.reg_cache(self.i2c, 0x1E).stats[1], misses + 1)
+
+    def test_signed_scaled(self):
+        from lis2mdl import LIS2MDL
+        hand = LIS2MDL(self.i2c)
+        self.model.field = [-0.3, 0.1, 0.0]
+        self.mag.mode = 0
+        clock.advance(200_000)
+        self.assertLess(self.mag.x, 0)
+        self.assertEqual(self.mag.x, hand.x)
+        self.assertEqual(self.mag.y, hand.y)
+        self.assertEqual(self.mag.temp, hand._temp)
+
+    def test_mixed_signed(self):
+        # Generated accessor and descriptors share one shadow
+        generated = _generated(_OFFSET_MAP, 'offset_regs').Offset(self.i2c)
+        hand = _Offset(self.i2c)
+
+        generated.offset_x = -2
+        self.assertEqual(self.model.regs[0x45:0x47], b'\xfe\xff')
+        self.assertEqual(hand.signed_x, -2)
+        self.assertEqual(hand.offset_x, 0xFFFE)
+
+        hand.offset_x = -3
+        self.assertEqual(generated.offset_x, -3)
+
+        # Reloaded from the device in the same representation
+        self.model.regs[0x45:0x47] = b'\xfc\xff'
+        register.refresh(self.i2c, 0x1E, 0x45)
+        self.assertEqual(generated.offset_x, -4)
+        self.assertEqual(hand.signed_x, -4)
+
+if __name__ == '__main__':
+    unittest.main()
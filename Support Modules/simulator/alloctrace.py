@@ -0,0 +1,127 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) CPython 3.9+
+    *   2) simulator (benchmark, replay)
+
+    * Purpose:
+        * Guard that hot driver paths stay allocation free.  Each call is
+        * traced with tracemalloc after a warm up and must stay within
+        * the budget its driver declares.
+
+    * Notes:
+        1) Drivers declare budgets, in heap bytes per call, as a plain
+           class attribute so nothing extra runs on the device:
+             ALLOC_BUDGETS = {'process_sensors_into': 0}
+           Methods are called (arguments from CALL_ARGS), anything else
+           is read as an attribute.
+
+        2) Usage:
+             python3 alloctrace.py          # every driver, exit 1 on
+                                            # a budget overrun
+           or from code:
+             alloctrace.check(mpu.process_sensors_into, 0, args=(out,))
+
+        3) The number is the peak of bytes allocated during one call,
+           objects freed again before it returns still count.  Calls run
+           on a ReplayBus so the bus and device models add nothing.
+
+        4) A budget is what the call allocates by design, counted at
+           CPython object sizes and rounded up by a quarter as headroom:
+             every float, tuple, list, bytes, str or other object the
+             code creates, on MicroPython as well (float 24, tuple 40
+             plus 8 per item, bytes 33 and str 49 plus their length)
+             ints above 256, iterators and range() objects, CPython only
+             (32 and 48 bytes)
+           The traced number is often lower, CPython reuses freed floats
+           and tuples, so a path is only budgeted 0 when it creates no
+           object at all, not because the trace read 0.
+
+"""
+
+from array import array
+import sys
+import tracemalloc
+
+import benchmark
+
+WARMUP = 10
+ITERATIONS = 100
+
+# Arguments for budgeted methods, {class name: {method: args}}
+CALL_ARGS = {
+    'MPU6050': {'process_sensors_into': (array('f', [0.0] * 7),)},
+    'GPS': {'sort_sentence': (benchmark.NMEA_BODIES[0],)},
+}
+
+class AllocationError(AssertionError):
+    pass
+
+def measure(call, args=(), warmup=WARMUP, iterations=ITERATIONS):
+    """ Largest number of bytes one call allocated after warm up """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        for iteration in range(0, warmup):
+            call(*args)
+        worst = 0
+        for iteration in range(0, iterations):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            call(*args)
+            worst = max(worst, tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        if started:
+            tracemalloc.stop()
+    return worst
+
+def check(call, budget, args=(), warmup=WARMUP, iterations=ITERATIONS, name=None):
+    """ measure() and raise AllocationError above budget """
+    allocated = measure(call, args, warmup, iterations)
+    if allocated > budget:
+        if name is None:
+            name = getattr(call, '__qualname__', repr(call))
+        raise AllocationError('%s allocated %d bytes per call, budget %d' % (name, allocated, budget))
+    return allocated
+
+def _caller(driver, name):
+    # Methods are called, properties and registers are read
+    attr = getattr(type(driver), name)
+    if callable(attr):
+        args = CALL_ARGS.get(type(driver).__name__, {}).get(name, ())
+        method = getattr(driver, name)
+        return lambda: method(*args)
+    return lambda: getattr(driver, name)
+
+def check_driver(driver, warmup=WARMUP, iterations=ITERATIONS):
+    """ [(name, allocated, budget, ok)] for every budget driver declares """
+    results = []
+    for name, budget in getattr(type(driver), 'ALLOC_BUDGETS', {}).items():
+        call = _caller(driver, name)
+
+        # Harness cost of the call wrapper itself
+        overhead = measure(lambda: None, (), warmup, iterations)
+        allocated = max(0, measure(call, (), warmup, iterations) - overhead)
+        results.append(('%s.%s' % (type(driver).__name__, name), allocated, budget, allocated <= budget))
+    return results
+
+def main():
+    failures = 0
+    for case_name in benchmark.CASES:
+        case = benchmark.setup_case(case_name)
+
+        # Record the device answers once, then replay
+        case.call()
+        if case.bus is not None:
+            case.bus.replay = True
+
+        for name, allocated, budget, ok in check_driver(case.driver):
+            print('%-40s %6d / %-6d %s' % (name, allocated, budget, 'ok' if ok else 'OVER BUDGET'))
+            if not ok:
+                failures += 1
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
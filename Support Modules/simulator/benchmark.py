@@ -0,0 +1,298 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) CPython 3.9+
+    *   2) simulator (machine, replay), register (instrument)
+
+    * Purpose:
+        * Throughput and allocation benchmark for the hot read path of
+        * every driver, run against the simulator.
+
+    * Notes:
+        1) Usage:
+             python3 benchmark.py                       # print table
+             python3 benchmark.py -o baseline.json      # store results
+             python3 benchmark.py -b baseline.json      # compare, exit 1
+                                                        # on a regression
+
+        2) Per sample, i.e. per call of the read API:
+             transactions - bus transactions, live against the models
+             bytes        - bytes moved on the bus (GPS: sentence length)
+             decode_us    - CPU time of the driver code, bus replayed
+             alloc_bytes  - peak bytes allocated inside one call,
+                            bus replayed, harness overhead removed
+
+        3) transactions, bytes and alloc_bytes are exact and must not
+           grow.  decode_us may grow by --tolerance (default 25%).
+
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_ROOT = os.path.dirname(os.path.dirname(_HERE))
+_DRIVERS = os.path.join(_ROOT, 'Device Drivers')
+sys.path[:0] = ([_HERE, os.path.join(_ROOT, 'Support Modules', 'register'), _DRIVERS]
+                + [os.path.join(_DRIVERS, name) for name in
+                   ('mpu6050', 'dps310', 'lis2mdl', 'vl53l1x', 'mcp9808', 'ds3231')])
+
+import machine
+from machine import I2C, UART, clock, models
+from instrument import InstrumentedI2C
+from replay import ReplayBus
+
+BENCHMARK_VERSION = 1
+DEFAULT_TOLERANCE = 0.25
+
+# One 10 Hz epoch of receiver output, without '$' and line ends
+NMEA_SENTENCES = (
+    'GPGGA,123519.000,4807.0380,N,01131.0000,E,1,08,0.9,545.4,M,46.9,M,,*59',
+    'GPRMC,123519.000,A,4807.0380,N,01131.0000,E,022.4,084.4,230394,003.1,W*74',
+    'GPVTG,054.7,T,034.4,M,005.5,N,010.2,K*48',
+    'GPGSA,A,3,04,05,,09,12,,,24,,,,,2.5,1.3,2.1*39',
+    'GPGSV,2,1,08,01,40,083,46,02,17,308,41,12,07,344,39,14,22,228,45*75',
+)
+
+# As received on the UART
+NMEA_BURST = b''.join(b'$' + sentence.encode() + b'\r\n' for sentence in NMEA_SENTENCES)
+
+# As handed to GPS.sort_sentence by the stream, '$' to '*' exclusive
+NMEA_BODIES = tuple(memoryview(sentence.split('*')[0].encode()) for sentence in NMEA_SENTENCES)
+
+class _Case:
+    """ Read API under test plus the buses it runs on """
+    def __init__(self, driver, call, bus=None, samples_per_call=1, sample_bytes=None):
+        self.driver = driver
+        self.call = call
+        self.bus = bus
+        self.samples_per_call = samples_per_call
+        self.sample_bytes = sample_bytes
+
+def _bus(model):
+    # Driver -> ReplayBus -> InstrumentedI2C -> simulated I2C -> model
+    i2c = I2C(0)
+    model(i2c)
+    return ReplayBus(InstrumentedI2C(i2c))
+
+# === Cases ===
+def _mpu6050():
+    from MPU6050 import MPU6050
+    bus = _bus(models.MPU6050)
+    mpu = MPU6050(bus, 0x68)
+    return _Case(mpu, mpu.process_sensors, bus)
+
+def _dps310():
+    from dps310 import DPS310
+    bus = _bus(models.DPS310)
+    dps = DPS310(bus)
+    return _Case(dps, dps.readings, bus)
+
+def _lis2mdl():
+    from lis2mdl import LIS2MDL
+    bus = _bus(models.LIS2MDL)
+    mag = LIS2MDL(bus)
+
+    def read():
+        mag.x
+        mag.y
+        mag.z
+    return _Case(mag, read, bus)
+
+def _vl53l1x():
+    from vl53l1x import VL53L1X
+    bus = _bus(models.VL53L1X)
+    tof = VL53L1X(bus)
+
+    # First range
+    time.sleep_ms(2 * tof.timing_budget)
+
+    def read():
+        tof.distance_mm
+    return _Case(tof, read, bus)
+
+def _mcp9808():
+    from mcp9808 import MCP9808
+    bus = _bus(models.MCP9808)
+    sensor = MCP9808(bus, 0x18)
+
+    def read():
+        sensor.ambient_temp_celsius
+    return _Case(sensor, read, bus)
+
+def _ds3231():
+    from DS3231 import DS3231
+    bus = _bus(models.DS3231)
+    rtc = DS3231(bus)
+    return _Case(rtc, rtc.rtc_clock, bus)
+
+def _gps():
+    from gps.gps import GPS
+    gps = GPS(UART(1, 9600), None, None, None)
+    sort_sentence = gps.sort_sentence
+
+    def read():
+        for sentence in NMEA_BODIES:
+            sort_sentence(sentence)
+    size = sum(len(sentence) for sentence in NMEA_BODIES) / len(NMEA_BODIES)
+    return _Case(gps, read, None, len(NMEA_BODIES), size)
+
+def _gps_stream():
+    from gps.gps import GPS
+    gps = GPS(UART(1, 9600), None, None, None)
+
+    # Checksum and framing, then sort_sentence
+    def read():
+        gps.feed(NMEA_BURST)
+    return _Case(gps._stream, read, None, len(NMEA_SENTENCES), len(NMEA_BURST) / len(NMEA_SENTENCES))
+
+# name: (setup, simulated time between samples in us)
+CASES = {
+    'MPU6050.process_sensors': (_mpu6050, 1_000),
+    'DPS310.readings': (_dps310, 1_000_000),
+    'LIS2MDL.x/y/z': (_lis2mdl, 10_000),
+    'VL53L1X.distance_mm': (_vl53l1x, 50_000),
+    'MCP9808.ambient_temp_celsius': (_mcp9808, 250_000),
+    'DS3231.rtc_clock': (_ds3231, 1_000_000),
+    'GPS.sort_sentence': (_gps, 100_000),
+    'GPS.feed': (_gps_stream, 100_000),
+}
+
+# === Measurements ===
+def _nothing():
+    pass
+
+def _peak_alloc(call, samples):
+    """ Mean peak bytes allocated by one call, tracemalloc running """
+    total = 0
+    for sample in range(0, samples):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        call()
+        total += tracemalloc.get_traced_memory()[1] - before
+    return total / samples
+
+def setup_case(name):
+    """ Fresh simulated world with the driver of case name on it """
+    clock.reset()
+
+    # Drivers print during init
+    with contextlib.redirect_stdout(io.StringIO()):
+        return CASES[name][0]()
+
+def run_case(name, samples=200, warmup=20):
+    interval_us = CASES[name][1]
+    case = setup_case(name)
+    call = case.call
+    per_call = case.samples_per_call
+
+    result = {}
+
+    # Bus traffic, live
+    for sample in range(0, warmup):
+        call()
+        clock.advance(interval_us)
+    if case.bus is not None:
+        instrument = case.bus._bus
+        instrument.reset()
+        for sample in range(0, samples):
+            call()
+            clock.advance(interval_us)
+        moved = sum(entry['bytes'] for entry in instrument.stats().values())
+        result['transactions'] = round(instrument.transactions / (samples * per_call), 3)
+        result['bytes'] = round(moved / (samples * per_call), 3)
+        case.bus.replay = True
+    else:
+        result['transactions'] = 0
+        result['bytes'] = round(case.sample_bytes, 3)
+
+    # CPU time of the driver code
+    start = time.perf_counter()
+    for sample in range(0, samples):
+        call()
+    elapsed = time.perf_counter() - start
+    result['decode_us'] = round(elapsed * 1_000_000 / (samples * per_call), 2)
+
+    # Allocations after warm up, minus the cost of the measuring itself
+    tracemalloc.start()
+    try:
+        for sample in range(0, warmup):
+            call()
+        overhead = _peak_alloc(_nothing, samples)
+        allocated = _peak_alloc(call, samples) - overhead
+    finally:
+        tracemalloc.stop()
+    result['alloc_bytes'] = max(0, int(round(allocated / per_call)))
+
+    return result
+
+def run(names=None, samples=200, warmup=20):
+    if not names:
+        names = list(CASES)
+    results = {}
+    for name in names:
+        results[name] = run_case(name, samples, warmup)
+    return {'version': BENCHMARK_VERSION, 'samples': samples, 'results': results}
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """ Regressions of report against baseline, as readable lines """
+    regressions = []
+    old_results = baseline.get('results', {})
+    for name, new in report['results'].items():
+        old = old_results.get(name)
+        if old is None:
+            continue
+        for key in ('transactions', 'bytes', 'alloc_bytes'):
+            if new[key] > old[key]:
+                regressions.append('%s: %s %s -> %s' % (name, key, old[key], new[key]))
+        if new['decode_us'] > old['decode_us'] * (1 + tolerance):
+            regressions.append('%s: decode_us %s -> %s (+%d%%)'
+                               % (name, old['decode_us'], new['decode_us'],
+                                  round(100 * (new['decode_us'] / old['decode_us'] - 1))))
+    return regressions
+
+def format_table(report):
+    lines = ['%-30s %12s %8s %10s %12s' % ('', 'transactions', 'bytes', 'decode_us', 'alloc_bytes')]
+    for name, result in report['results'].items():
+        lines.append('%-30s %12s %8s %10s %12s' % (name, result['transactions'], result['bytes'],
+                                                   result['decode_us'], result['alloc_bytes']))
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Driver read path benchmark')
+    parser.add_argument('-o', '--output', help='write results to this JSON file')
+    parser.add_argument('-b', '--baseline', help='compare against this JSON file')
+    parser.add_argument('-t', '--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed decode_us growth, fraction')
+    parser.add_argument('-n', '--samples', type=int, default=200)
+    parser.add_argument('-w', '--warmup', type=int, default=20)
+    parser.add_argument('-c', '--case', action='append', choices=list(CASES),
+                        help='only run this case, repeatable')
+    args = parser.parse_args(argv)
+
+    report = run(args.case, args.samples, args.warmup)
+    print(format_table(report))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print('REGRESSION', line)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
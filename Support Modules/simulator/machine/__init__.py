@@ -0,0 +1,385 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) CPython 3
+
+    * Purpose:
+        * Stand-in for MicroPython's machine module so the drivers run
+        * unmodified on a PC, against the device models in
+        * machine.models instead of real hardware.
+
+            * Pin     - Shared per pin id, inputs driven by the models
+            * I2C     - Byte accurate bus with per byte latency
+            * SoftI2C - Same as I2C
+            * SPI     - Chip select aware, 1 command byte + data
+            * UART    - Line rate limited receive buffer
+
+    * Notes:
+        1) Put "Support Modules/simulator" ahead of everything else on
+           sys.path and import machine BEFORE any driver.  Importing it
+           installs const(), time.ticks_*/sleep_us/sleep_ms, and the
+           micropython/ustruct/uasyncio modules sit next to it.
+
+             import machine
+             from machine import I2C, Pin, models
+             i2c = I2C(0, freq=400_000)
+             imu = models.MPU6050(i2c, int_pin=Pin(15))
+             mpu = MPU6050(i2c, 0x68)
+
+        2) Bus time is charged per byte on the wire, including the
+           address and register bytes: 9 bit times per byte at freq.
+           Override with i2c.byte_us / i2c.overhead_us.
+
+        3) A device that is not attached raises OSError(ENODEV) like a
+           NACK on real hardware.
+
+        4) Pin.drive(level) is simulator only, it is how models (or a
+           test) move an input and fire its irq handler.
+
+"""
+
+import errno
+
+from . import clock
+
+clock.install()
+
+# === Interrupts ===
+def disable_irq():
+    return 0
+
+def enable_irq(state=0):
+    pass
+
+def freq():
+    return 125_000_000
+
+def idle():
+    clock.advance(1)
+
+def unique_id():
+    return b'\x53\x49\x4d\x55\x4c\x41\x54\x45'
+
+# === Pin ===
+class _PinState:
+    __slots__ = ('level', 'handler', 'trigger', 'falls')
+
+    def __init__(self):
+        self.level = 0
+        self.handler = None
+        self.trigger = 0
+        self.falls = 0
+
+_pins = {}
+
+class Pin:
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        state = _pins.get(id)
+        if state is None:
+            state = _pins[id] = _PinState()
+            if pull == Pin.PULL_UP:
+                state.level = 1
+        self._state = state
+        self.mode = mode
+        if value is not None:
+            self.value(value)
+
+    def __repr__(self):
+        return 'Pin(%s)' % (self.id,)
+
+    def value(self, value=None):
+        if value is None:
+            return self._state.level
+        self.drive(value)
+
+    def on(self):
+        self.drive(1)
+
+    def off(self):
+        self.drive(0)
+
+    def __call__(self, value=None):
+        return self.value(value)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self._state.handler = handler
+        self._state.trigger = trigger
+        return self
+
+    def drive(self, level):
+        """ Set the level seen on the pin and run its irq handler on an edge """
+        state = self._state
+        level = 1 if level else 0
+        if level == state.level:
+            return
+        state.level = level
+        if level:
+            edge = Pin.IRQ_RISING
+        else:
+            edge = Pin.IRQ_FALLING
+            state.falls += 1
+        if state.handler is not None and state.trigger & edge:
+            state.handler(self)
+
+# === I2C ===
+class I2C:
+    def __init__(self, id=0, scl=None, sda=None, freq=400_000, timeout=50_000):
+        self.id = id
+        self._devices = []
+        self.init(freq=freq)
+        self.overhead_us = 0
+
+    def init(self, scl=None, sda=None, freq=400_000, timeout=50_000):
+        self.freq = freq
+
+        # ACK bit included
+        self.byte_us = 9_000_000 / freq
+
+    def attach(self, device):
+        self._devices.append(device)
+        return device
+
+    def detach(self, device):
+        self._devices.remove(device)
+
+    def _device(self, addr):
+        # Models may change their own address, e.g. VL53L1X
+        for device in self._devices:
+            if device.address == addr:
+                return device
+        raise OSError(errno.ENODEV)
+
+    def _charge(self, num_bytes):
+        clock.advance(self.overhead_us + num_bytes * self.byte_us)
+
+    def scan(self):
+        self._charge(len(self._devices))
+        return sorted(device.address for device in self._devices)
+
+    # Raw transfers, the register pointer is part of the data
+    def writeto(self, addr, buf, stop=True):
+        device = self._device(addr)
+        device.update(clock.now_us())
+        device.i2c_write(bytes(buf))
+        self._charge(1 + len(buf))
+        return len(buf)
+
+    def writevto(self, addr, vector, stop=True):
+        return self.writeto(addr, b''.join(bytes(buf) for buf in vector), stop)
+
+    def readfrom_into(self, addr, buf, stop=True):
+        device = self._device(addr)
+        device.update(clock.now_us())
+        buf[:] = device.i2c_read(len(buf))
+        self._charge(1 + len(buf))
+
+    def readfrom(self, addr, nbytes, stop=True):
+        buf = bytearray(nbytes)
+        self.readfrom_into(addr, buf, stop)
+        return bytes(buf)
+
+    # Memory transfers
+    def writeto_mem(self, addr, memaddr, buf, addrsize=8):
+        header = memaddr.to_bytes(addrsize // 8, 'big')
+        device = self._device(addr)
+        device.update(clock.now_us())
+        device.i2c_write(header + bytes(buf))
+        self._charge(1 + len(header) + len(buf))
+
+    def readfrom_mem_into(self, addr, memaddr, buf, addrsize=8):
+        header = memaddr.to_bytes(addrsize // 8, 'big')
+        device = self._device(addr)
+        device.update(clock.now_us())
+        device.i2c_write(header)
+        buf[:] = device.i2c_read(len(buf))
+
+        # Address + pointer, repeated start + address, data
+        self._charge(2 + len(header) + len(buf))
+
+    def readfrom_mem(self, addr, memaddr, nbytes, addrsize=8):
+        buf = bytearray(nbytes)
+        self.readfrom_mem_into(addr, memaddr, buf, addrsize=addrsize)
+        return bytes(buf)
+
+class SoftI2C(I2C):
+    pass
+
+# === SPI ===
+class SPI:
+    MSB = 0
+    LSB = 1
+
+    def __init__(self, id=0, baudrate=1_000_000, polarity=0, phase=0, bits=8,
+                 firstbit=MSB, sck=None, mosi=None, miso=None):
+        self.id = id
+        self._devices = []
+        self.init(baudrate=baudrate)
+
+        # Chip select fall count seen at the last transfer, per device
+        self._falls = {}
+        self._read = {}
+
+    def init(self, baudrate=1_000_000, **kwargs):
+        self.baudrate = baudrate
+        self.byte_us = 8_000_000 / baudrate
+
+    def attach(self, device, cs):
+        self._devices.append((device, cs))
+        self._falls[device] = -1
+        self._read[device] = False
+        return device
+
+    def _selected(self):
+        for device, cs in self._devices:
+            if cs.value() == 0:
+                device.update(clock.now_us())
+
+                # New chip select cycle, next byte is a command
+                new = cs._state.falls != self._falls[device]
+                self._falls[device] = cs._state.falls
+                return device, new
+        return None, False
+
+    def write(self, buf):
+        device, new = self._selected()
+        data = bytes(buf)
+        if device is not None and data:
+            if new:
+                self._read[device] = bool(data[0] & device.SPI_READ_BIT)
+                device.pointer = data[0] & device.SPI_ADDR_MASK
+                data = data[1:]
+            if data and not self._read[device]:
+                device.write(device.pointer, data)
+        clock.advance(len(buf) * self.byte_us)
+
+    def readinto(self, buf, write=0x00):
+        device, new = self._selected()
+        if device is None:
+            buf[:] = b'\xff' * len(buf)
+        elif new or not self._read[device]:
+            buf[:] = bytes(len(buf))
+        else:
+            buf[:] = device.read(device.pointer, len(buf))
+        clock.advance(len(buf) * self.byte_us)
+
+    def read(self, nbytes, write=0x00):
+        buf = bytearray(nbytes)
+        self.readinto(buf, write)
+        return bytes(buf)
+
+    def write_readinto(self, write_buf, read_buf):
+        self.write(write_buf[:1])
+        self.readinto(memoryview(read_buf)[1:])
+
+    def deinit(self):
+        pass
+
+class SoftSPI(SPI):
+    pass
+
+# === UART ===
+class UART:
+    def __init__(self, id=0, baudrate=9600, bits=8, parity=None, stop=1,
+                 tx=None, rx=None, timeout=0, rxbuf=256, **kwargs):
+        self.id = id
+        self.rxbuf = rxbuf
+        self._rx = bytearray()
+
+        # Bytes still "on the wire", arriving at the line rate
+        self._wire = bytearray()
+        self._wire_start = 0
+
+        self.overruns = 0
+        self.peer = None
+        self.init(baudrate=baudrate, bits=bits, parity=parity, stop=stop, timeout=timeout)
+
+    def init(self, baudrate=9600, bits=8, parity=None, stop=1, timeout=0, **kwargs):
+        self._poll()
+
+        # Bytes in flight at the old rate are lost
+        if baudrate != getattr(self, 'baudrate', baudrate):
+            self._wire.clear()
+        self.baudrate = baudrate
+        self.timeout = timeout
+
+        # Start + data + parity + stop bits
+        self.byte_us = (1 + bits + (parity is not None) + stop) * 1_000_000 / baudrate
+
+    def inject(self, data):
+        """ Simulator only, queue bytes from the remote end """
+        self._poll()
+        if not self._wire:
+            self._wire_start = clock.now_us()
+        self._wire.extend(data)
+
+    def _poll(self):
+        if not self._wire:
+            return
+        arrived = int((clock.now_us() - self._wire_start) / self.byte_us)
+        if arrived <= 0:
+            return
+        arrived = min(arrived, len(self._wire))
+        room = self.rxbuf - len(self._rx)
+        if arrived > room:
+            self.overruns += arrived - room
+        self._rx.extend(self._wire[:min(arrived, room)])
+        del self._wire[:arrived]
+        self._wire_start += int(arrived * self.byte_us)
+
+    def any(self):
+        self._poll()
+        return len(self._rx)
+
+    def read(self, nbytes=None):
+        self._poll()
+        if not self._rx and self.timeout:
+            clock.advance(self.timeout * 1000)
+            self._poll()
+        if not self._rx:
+            return None
+        if nbytes is None:
+            nbytes = len(self._rx)
+        data = bytes(self._rx[:nbytes])
+        del self._rx[:nbytes]
+        return data
+
+    def readinto(self, buf, nbytes=None):
+        if nbytes is None:
+            nbytes = len(buf)
+        data = self.read(nbytes)
+        if data is None:
+            return None
+        buf[:len(data)] = data
+        return len(data)
+
+    def readline(self):
+        self._poll()
+        end = self._rx.find(b'\n')
+        if end < 0:
+            return self.read()
+        return self.read(end + 1)
+
+    def write(self, buf):
+        data = bytes(buf)
+        clock.advance(len(data) * self.byte_us)
+        if self.peer is not None:
+            self.peer.uart_write(self, data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def deinit(self):
+        pass
+
+from . import models
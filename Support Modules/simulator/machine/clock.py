@@ -0,0 +1,105 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) CPython 3
+
+    * Purpose:
+        * Simulated time base shared by the fake machine module and the
+        * device models.  Provides MicroPython's time.ticks_* functions.
+
+    * Notes:
+        1) By default time is virtual: sleep_us() and bus transfers
+           advance the clock instantly, so a 1 s wait costs no wall time
+           and results are repeatable.  Set clock.realtime = True to
+           follow the host clock and really sleep instead.
+
+        2) Ticks wrap at TICKS_PERIOD like on a Pico, ticks_diff() and
+           ticks_add() handle the wrap.
+
+        3) Every device model registers itself here and is updated each
+           time the clock moves, so data ready pins fire on schedule.
+
+"""
+
+import builtins
+import sys
+import time
+
+TICKS_PERIOD = 1 << 30
+TICKS_MAX = TICKS_PERIOD - 1
+_TICKS_HALFPERIOD = TICKS_PERIOD // 2
+
+realtime = False
+
+_now_us = 0
+_start = time.perf_counter()
+_sleep = time.sleep
+_devices = []
+
+def now_us():
+    """ Absolute simulated time in us, never wraps """
+    if realtime:
+        return int((time.perf_counter() - _start) * 1_000_000)
+    return _now_us
+
+def advance(us):
+    """ Let us microseconds pass, then bring every device up to date """
+    global _now_us
+    if us > 0:
+        if realtime:
+            _sleep(us / 1_000_000)
+        else:
+            _now_us += int(us)
+    now = now_us()
+    for device in _devices:
+        device.update(now)
+
+def register(device):
+    _devices.append(device)
+
+def unregister(device):
+    if device in _devices:
+        _devices.remove(device)
+
+def reset():
+    """ Back to t = 0 and forget all devices """
+    global _now_us, _start
+    _now_us = 0
+    _start = time.perf_counter()
+    _devices.clear()
+
+# MicroPython time API
+def ticks_us():
+    return now_us() & TICKS_MAX
+
+def ticks_ms():
+    return (now_us() // 1000) & TICKS_MAX
+
+def ticks_cpu():
+    return ticks_us()
+
+def ticks_diff(ticks1, ticks2):
+    return ((ticks1 - ticks2 + _TICKS_HALFPERIOD) & TICKS_MAX) - _TICKS_HALFPERIOD
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & TICKS_MAX
+
+def sleep_us(us):
+    advance(us)
+
+def sleep_ms(ms):
+    advance(ms * 1000)
+
+def sleep(seconds):
+    advance(seconds * 1_000_000)
+
+def const(value):
+    return value
+
+def install():
+    """ Give CPython the MicroPython builtins the drivers rely on """
+    for name in ('ticks_us', 'ticks_ms', 'ticks_cpu', 'ticks_diff',
+                 'ticks_add', 'sleep_us', 'sleep_ms', 'sleep'):
+        setattr(time, name, getattr(sys.modules[__name__], name))
+    builtins.const = const
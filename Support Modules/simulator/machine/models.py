@@ -0,0 +1,945 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) CPython 3
+
+    * Purpose:
+        * Register level models of the devices in "Device Drivers", for
+        * the fake machine module.  Each model keeps a register file,
+        * runs its conversions on the simulated clock and answers the
+        * bus byte by byte the way the part does.
+
+            * RegisterDevice - Base, register file + auto increment
+            * MPU6050        - Sample rate divider, INT_STATUS, 1 kB FIFO
+            * DPS310          - Ready flags, single/continuous conversions
+            * LIS2MDL        - ODR, single shot, STATUS_REG, offsets
+            * VL53L1X        - 16 bit addresses, timing budget, data ready
+            * MCP9808        - 16 bit registers behind a pointer
+            * DS3231         - Running BCD clock, temperature conversions
+            * ISM330DLC      - Independent accel/gyro ODRs, IF_INC
+            * MTK3339        - UART GPS, NMEA epochs, PMTK 220/251/314, PPS
+
+    * Notes:
+        1) Create a model on a bus, then the driver on the same bus:
+             imu = models.MPU6050(i2c)
+             imu.accel = [0.0, 0.0, 1.0]     # g
+             mpu = MPU6050(i2c, 0x68)
+
+        2) The physical inputs are plain attributes (accel, gyro,
+           field, pressure, temperature, distance_mm, ...).  noise adds
+           gaussian noise of that many LSB to every sample, seed makes
+           it repeatable.
+
+        3) int_pin=Pin(n) connects the device's interrupt / data ready
+           output.  Pulsed interrupts are a rising then falling edge at
+           the sample time, latched ones stay active until cleared.
+
+        4) Samples are produced on the simulated clock, so reading faster
+           than the ODR returns the same data and the ready flags behave
+           like the real part.
+
+        5) MTK3339 sits on a UART instead of a bus:
+             gps_model = models.MTK3339(uart, baudrate=9600)
+           It only understands the host when both ends run the same baud
+           rate, otherwise each side receives garbage.  Above
+           stable_baudrate bytes are corrupted at error_rate.  pps_pin
+           pulses at every UTC second, drift_ppm makes the receiver's
+           second that much longer than the simulated clock's.
+
+"""
+
+import datetime
+import random
+
+from . import clock
+
+class RegisterDevice:
+    ADDRESS = 0x00
+    ADDRSIZE = 8
+    SIZE = 0x100
+
+    # Power on values, {reg_addr: value}
+    RESET = {}
+
+    # Writes to these registers are ignored
+    READ_ONLY = ()
+
+    # SPI command byte
+    SPI_READ_BIT = 0x80
+    SPI_ADDR_MASK = 0x7F
+
+    def __init__(self, bus=None, address=None, int_pin=None, noise=0, seed=0):
+        if address is None:
+            address = self.ADDRESS
+        self.address = address
+        self.int_pin = int_pin
+        self.noise = noise
+        self._random = random.Random(seed)
+
+        self.regs = bytearray(self.SIZE)
+        self.pointer = 0
+        self.power_on()
+
+        clock.register(self)
+        if bus is not None:
+            bus.attach(self)
+
+    def power_on(self):
+        """ Registers back to their reset values """
+        self.regs[:] = bytes(self.SIZE)
+        for reg, value in self.RESET.items():
+            self.regs[reg] = value
+        self.pointer = 0
+        self._timers = {}
+        self._starts = {}
+        self._power_on_us = clock.now_us()
+
+    # === Timing ===
+    def update(self, now):
+        """ Run every conversion due up to now, overridden per model """
+        pass
+
+    def _due(self, name, now, period_us):
+        """ Number of periods that completed since the last call """
+        next_us = self._timers.get(name)
+        if next_us is None:
+            # Counting from power on or the last restart
+            next_us = self._starts.get(name, self._power_on_us) + period_us
+        if now < next_us:
+            self._timers[name] = next_us
+            return 0
+        count = int((now - next_us) // period_us) + 1
+        self._timers[name] = next_us + count * period_us
+        return count
+
+    def _restart(self, name):
+        self._timers.pop(name, None)
+        self._starts[name] = clock.now_us()
+
+    # === Interrupt line ===
+    def _int_level(self, active, active_high=True):
+        if self.int_pin is not None:
+            self.int_pin.drive(active == active_high)
+
+    def _int_pulse(self, active_high=True):
+        self._int_level(True, active_high)
+        self._int_level(False, active_high)
+
+    # === Register file ===
+    def next_address(self, reg):
+        return (reg + 1) % self.SIZE
+
+    def read_byte(self, reg):
+        return self.regs[reg]
+
+    def write_byte(self, reg, value):
+        if reg not in self.READ_ONLY:
+            self.regs[reg] = value
+
+    def read(self, reg, num_bytes):
+        data = bytearray(num_bytes)
+        for index in range(0, num_bytes):
+            data[index] = self.read_byte(reg)
+            reg = self.next_address(reg)
+        self.pointer = reg
+        return data
+
+    def write(self, reg, data):
+        for value in data:
+            self.write_byte(reg, value)
+            reg = self.next_address(reg)
+        self.pointer = reg
+
+    # === Bus side ===
+    def i2c_write(self, data):
+        """ Register pointer followed by data """
+        size = self.ADDRSIZE // 8
+        if len(data) < size:
+            return
+        reg = int.from_bytes(data[:size], 'big') % self.SIZE
+        self.pointer = reg
+        if len(data) > size:
+            self.write(reg, data[size:])
+
+    def i2c_read(self, num_bytes):
+        return self.read(self.pointer, num_bytes)
+
+    # === Helpers ===
+    def _sample(self, value, scale):
+        """ Physical value to clamped signed 16 bit LSBs """
+        raw = value * scale
+        if self.noise:
+            raw += self._random.gauss(0, self.noise)
+        return max(-32768, min(32767, int(round(raw))))
+
+    def _put16(self, reg, value, big=True):
+        value &= 0xFFFF
+        if big:
+            self.regs[reg] = value >> 8
+            self.regs[reg + 1] = value & 0xFF
+        else:
+            self.regs[reg] = value & 0xFF
+            self.regs[reg + 1] = value >> 8
+
+class MPU6050(RegisterDevice):
+    ADDRESS = 0x68
+    RESET = {0x6B: 0x40, 0x75: 0x68}
+    READ_ONLY = frozenset(list(range(0x3A, 0x61)) + [0x72, 0x73, 0x75])
+    FIFO_SIZE = 1024
+
+    def __init__(self, bus=None, address=None, int_pin=None, noise=0, seed=0):
+        self.accel = [0.0, 0.0, 1.0]
+        self.gyro = [0.0, 0.0, 0.0]
+        self.temperature = 25.0
+        self.fifo = bytearray()
+        super().__init__(bus, address, int_pin, noise, seed)
+
+    def power_on(self):
+        super().power_on()
+        self.fifo = bytearray()
+
+    @property
+    def rate_hz(self):
+        # Gyro output rate / (1 + SMPLRT_DIV)
+        if self.regs[0x1A] & 0x07 in (0, 7):
+            base = 8000
+        else:
+            base = 1000
+        return base / (1 + self.regs[0x19])
+
+    def update(self, now):
+        # Asleep or in cycle mode, no samples
+        if self.regs[0x6B] & 0x60:
+            self._restart('sample')
+            return
+        count = self._due('sample', now, 1_000_000 / self.rate_hz)
+
+        # Past a full FIFO the older samples would be lost anyway
+        for sample in range(0, min(count, self.FIFO_SIZE // 2 + 1)):
+            self._convert()
+
+    def _convert(self):
+        accel_scale = 16384 >> ((self.regs[0x1C] >> 3) & 3)
+        gyro_scale = 131 / (1 << ((self.regs[0x1B] >> 3) & 3))
+        for axis in range(0, 3):
+            self._put16(0x3B + 2*axis, self._sample(self.accel[axis], accel_scale))
+            self._put16(0x43 + 2*axis, self._sample(self.gyro[axis], gyro_scale))
+        self._put16(0x41, self._sample(self.temperature - 36.53, 340))
+
+        # FIFO in register order, as enabled in FIFO_EN
+        if self.regs[0x6A] & 0x40:
+            fifo_en = self.regs[0x23]
+            frame = bytearray()
+            if fifo_en & 0x08:
+                frame += self.regs[0x3B:0x41]
+            if fifo_en & 0x80:
+                frame += self.regs[0x41:0x43]
+            for bit, reg in ((0x40, 0x43), (0x20, 0x45), (0x10, 0x47)):
+                if fifo_en & bit:
+                    frame += self.regs[reg:reg + 2]
+            self.fifo += frame
+            if len(self.fifo) > self.FIFO_SIZE:
+                del self.fifo[:len(self.fifo) - self.FIFO_SIZE]
+                self.regs[0x3A] |= 0x10
+
+        self.regs[0x3A] |= 0x01
+
+        # INT pin, active low when INT_LEVEL is set
+        if self.regs[0x38] & 0x01:
+            active_high = not self.regs[0x37] & 0x80
+            if self.regs[0x37] & 0x20:
+                self._int_level(True, active_high)
+            else:
+                self._int_pulse(active_high)
+
+    def next_address(self, reg):
+        # Burst reads of FIFO_R_W keep popping the FIFO
+        if reg == 0x74:
+            return reg
+        return super().next_address(reg)
+
+    def read_byte(self, reg):
+        if reg == 0x72:
+            return len(self.fifo) >> 8
+        if reg == 0x73:
+            return len(self.fifo) & 0xFF
+        if reg == 0x74:
+            if not self.fifo:
+                return 0xFF
+            value = self.fifo[0]
+            del self.fifo[0]
+            return value
+        value = self.regs[reg]
+
+        # INT_STATUS clears on read, or on any read with INT_RD_CLEAR
+        if reg == 0x3A or self.regs[0x37] & 0x10:
+            self.regs[0x3A] = 0
+            if self.regs[0x37] & 0x20:
+                self._int_level(False, not self.regs[0x37] & 0x80)
+        return value
+
+    def write_byte(self, reg, value):
+        if reg == 0x6B and value & 0x80:
+            self.power_on()
+            return
+        if reg == 0x6A:
+            if value & 0x04:
+                self.fifo = bytearray()
+            value &= ~0x07
+        if reg == 0x68:
+            value = 0
+        if reg in (0x19, 0x1A):
+            self._restart('sample')
+        super().write_byte(reg, value)
+
+class DPS310(RegisterDevice):
+    ADDRESS = 0x77
+    RESET = {0x0B: 0x01, 0x0D: 0x10, 0x28: 0x80}
+    READ_ONLY = frozenset(list(range(0x00, 0x06)) + [0x0A, 0x0B, 0x0D] + list(range(0x10, 0x29)))
+
+    # Datasheet start up times, us
+    SENSOR_READY_US = 12_000
+    COEF_READY_US = 40_000
+
+    # Per PM_PRC / TMP_PRC
+    SCALE_FACTORS = (524288, 1572864, 3670016, 7864320, 253952, 516096, 1040384, 2088960)
+    CONVERSION_US = (3_600, 5_200, 8_400, 14_800, 27_600, 53_200, 104_400, 206_800)
+
+    # Calibration coefficients programmed at the factory
+    COEFFICIENTS = {'c0': 204, 'c1': -261, 'c00': 80469, 'c10': -54769,
+                    'c01': -2578, 'c11': 1216, 'c20': -10380, 'c21': 183, 'c30': -1316}
+
+    def __init__(self, bus=None, address=None, int_pin=None, noise=0, seed=0):
+        self.pressure = 101325.0
+        self.temperature = 25.0
+        self.coefficients = dict(DPS310.COEFFICIENTS)
+        super().__init__(bus, address, int_pin, noise, seed)
+
+    def power_on(self):
+        super().power_on()
+        self._program_coefficients()
+
+    def _program_coefficients(self):
+        c = self.coefficients
+        c0 = c['c0'] & 0xFFF
+        c1 = c['c1'] & 0xFFF
+        c00 = c['c00'] & 0xFFFFF
+        c10 = c['c10'] & 0xFFFFF
+        coef = bytearray(18)
+        coef[0] = c0 >> 4
+        coef[1] = ((c0 & 0x0F) << 4) | (c1 >> 8)
+        coef[2] = c1 & 0xFF
+        coef[3] = c00 >> 12
+        coef[4] = (c00 >> 4) & 0xFF
+        coef[5] = ((c00 & 0x0F) << 4) | (c10 >> 16)
+        coef[6] = (c10 >> 8) & 0xFF
+        coef[7] = c10 & 0xFF
+        for index, name in enumerate(('c01', 'c11', 'c20', 'c21', 'c30')):
+            value = c[name] & 0xFFFF
+            coef[8 + 2*index] = value >> 8
+            coef[9 + 2*index] = value & 0xFF
+        self.regs[0x10:0x22] = coef
+
+    # === Raw values the compensation formula maps back to the inputs ===
+    def _raw_temperature(self):
+        c = self.coefficients
+        scaled = (self.temperature - c['c0'] * 0.5) / c['c1']
+        return scaled, scaled * self.SCALE_FACTORS[self.regs[0x07] & 0x07]
+
+    def _raw_pressure(self):
+        c = self.coefficients
+        t = self._raw_temperature()[0]
+
+        # Newton's method on the compensation polynomial
+        p = (self.pressure - c['c00']) / c['c10']
+        for iteration in range(0, 20):
+            f = (c['c00'] + p*(c['c10'] + p*(c['c20'] + p*c['c30']))
+                 + t*(c['c01'] + p*(c['c11'] + p*c['c21'])) - self.pressure)
+            df = (c['c10'] + p*(2*c['c20'] + 3*p*c['c30'])
+                  + t*(c['c11'] + 2*p*c['c21']))
+            p -= f / df
+        return p * self.SCALE_FACTORS[self.regs[0x06] & 0x07]
+
+    def _put24(self, reg, raw):
+        if self.noise:
+            raw += self._random.gauss(0, self.noise)
+        raw = max(-0x800000, min(0x7FFFFF, int(round(raw)))) & 0xFFFFFF
+        self.regs[reg] = raw >> 16
+        self.regs[reg + 1] = (raw >> 8) & 0xFF
+        self.regs[reg + 2] = raw & 0xFF
+
+    def _result(self, pressure):
+        if pressure:
+            self._put24(0x00, self._raw_pressure())
+            self.regs[0x08] |= 0x10
+            flag = 0x01
+        else:
+            self._put24(0x03, self._raw_temperature()[1])
+            self.regs[0x08] |= 0x20
+            flag = 0x02
+
+        # INT_PRS / INT_TMP enabled in CFG_REG
+        if self.regs[0x09] & (0x10 << (flag - 1)):
+            self.regs[0x0A] |= flag
+            self._int_pulse(bool(self.regs[0x09] & 0x80))
+
+    def update(self, now):
+        elapsed = now - self._power_on_us
+        if elapsed >= self.SENSOR_READY_US:
+            self.regs[0x08] |= 0x40
+        if elapsed >= self.COEF_READY_US:
+            self.regs[0x08] |= 0x80
+        if not self.regs[0x08] & 0x40:
+            return
+
+        mode = self.regs[0x08] & 0x07
+
+        # Single shot, MEAS_CTRL back to idle when done
+        if mode in (1, 2):
+            pressure = mode == 1
+            cfg = self.regs[0x06] if pressure else self.regs[0x07]
+            if self._due('single', now, self.CONVERSION_US[cfg & 0x07]):
+                self._restart('single')
+                self._result(pressure)
+                self.regs[0x08] &= ~0x07
+
+        # Continuous at PM_RATE / TMP_RATE measurements per second
+        if mode & 0x04:
+            if mode & 0x01:
+                rate = 1 << ((self.regs[0x06] >> 4) & 0x07)
+                if self._due('pressure', now, 1_000_000 / rate):
+                    self._result(True)
+            if mode & 0x02:
+                rate = 1 << ((self.regs[0x07] >> 4) & 0x07)
+                if self._due('temperature', now, 1_000_000 / rate):
+                    self._result(False)
+
+    def read_byte(self, reg):
+        value = self.regs[reg]
+
+        # Ready flags clear once the result is read
+        if reg == 0x02:
+            self.regs[0x08] &= ~0x10
+        elif reg == 0x05:
+            self.regs[0x08] &= ~0x20
+        elif reg == 0x0A:
+            self.regs[0x0A] = 0
+        return value
+
+    def write_byte(self, reg, value):
+        if reg == 0x0C:
+            # SOFT_RST = 1001
+            if value & 0x0F == 0x09:
+                self.power_on()
+            return
+        if reg == 0x08:
+            # Only MEAS_CTRL is writable
+            value = (self.regs[0x08] & 0xF0) | (value & 0x07)
+            self._restart('single')
+            self._restart('pressure')
+            self._restart('temperature')
+        super().write_byte(reg, value)
+
+class LIS2MDL(RegisterDevice):
+    ADDRESS = 0x1E
+    RESET = {0x4F: 0x40, 0x60: 0x03}
+    READ_ONLY = frozenset([0x4F, 0x64, 0x67] + list(range(0x68, 0x70)))
+    ODR_HZ = (10, 20, 50, 100)
+
+    # 1.5 mgauss / LSB, 8 LSB / C around 25 C
+    SENSITIVITY = 1000 / 1.5
+
+    def __init__(self, bus=None, address=None, int_pin=None, noise=0, seed=0):
+        self.field = [0.2, 0.0, 0.45]
+        self.temperature = 25.0
+        super().__init__(bus, address, int_pin, noise, seed)
+
+    def update(self, now):
+        cfg_a = self.regs[0x60]
+        mode = cfg_a & 0x03
+        period = 1_000_000 / self.ODR_HZ[(cfg_a >> 2) & 0x03]
+        if mode == 0:
+            if self._due('sample', now, period):
+                self._convert()
+        elif mode == 1:
+            if self._due('single', now, period):
+                self._restart('single')
+                self._convert()
+                self.regs[0x60] |= 0x03
+        else:
+            self._restart('sample')
+
+    def _convert(self):
+        for axis in range(0, 3):
+            offset = self.regs[0x45 + 2*axis] | (self.regs[0x46 + 2*axis] << 8)
+            if offset & 0x8000:
+                offset -= 0x10000
+            value = self._sample(self.field[axis], self.SENSITIVITY) - offset
+            self._put16(0x68 + 2*axis, max(-32768, min(32767, value)), big=False)
+        self._put16(0x6E, self._sample(self.temperature - 25, 8), big=False)
+
+        # Overrun when the last sample was never read
+        if self.regs[0x67] & 0x08:
+            self.regs[0x67] |= 0xF0
+        self.regs[0x67] |= 0x0F
+
+        if self.regs[0x62] & 0x01:
+            self._int_level(True)
+
+    def read_byte(self, reg):
+        value = self.regs[reg]
+        if 0x68 <= reg <= 0x6D:
+            self.regs[0x67] = 0
+            if self.regs[0x62] & 0x01:
+                self._int_level(False)
+        return value
+
+    def write_byte(self, reg, value):
+        if reg == 0x60:
+            if value & 0x20:
+                self.power_on()
+                return
+            value &= ~0x40
+            self._restart('sample')
+            self._restart('single')
+        super().write_byte(reg, value)
+
+class VL53L1X(RegisterDevice):
+    ADDRESS = 0x29
+    ADDRSIZE = 16
+    SIZE = 0x200
+    RESET = {0x0001: 0x29, 0x0030: 0x01, 0x0031: 0x02, 0x004B: 0x0A,
+             0x010F: 0xEA, 0x0110: 0xCC, 0x0111: 0x10}
+    READ_ONLY = frozenset([0x0031, 0x0089, 0x0096, 0x0097, 0x010F, 0x0110, 0x0111])
+
+    # RANGE_CONFIG__TIMEOUT_MACROP_A -> timing budget in ms, both modes
+    TIMING_BUDGETS = {0x001D: 15, 0x0051: 20, 0x00D6: 33, 0x01AE: 50,
+                      0x02E1: 100, 0x03E1: 200, 0x0591: 500,
+                      0x001E: 20, 0x0060: 33, 0x00AD: 50,
+                      0x01CC: 100, 0x02D9: 200, 0x048F: 500}
+
+    def __init__(self, bus=None, address=None, int_pin=None, noise=0, seed=0):
+        self.distance_mm = 500
+        super().__init__(bus, address, int_pin, noise, seed)
+
+    @property
+    def timing_budget_ms(self):
+        macrop = (self.regs[0x5E] << 8) | self.regs[0x5F]
+        return self.TIMING_BUDGETS.get(macrop, 50)
+
+    def _active_high(self):
+        # GPIO_HV_MUX__CTRL bit 4 set for an active low interrupt
+        return not self.regs[0x30] & 0x10
+
+    def update(self, now):
+        if not self.regs[0x87] & 0x40:
+            self._restart('range')
+            return
+        if self._due('range', now, self.timing_budget_ms * 1000):
+            distance = self.distance_mm
+            if self.noise:
+                distance += self._random.gauss(0, self.noise)
+            self._put16(0x96, max(0, min(0xFFFF, int(round(distance)))))
+
+            # Range complete, new data ready
+            self.regs[0x89] = 0x09
+            self.regs[0x31] = (self.regs[0x31] & 0xFE) | self._active_high()
+            self._int_level(True, self._active_high())
+
+    def write_byte(self, reg, value):
+        if reg == 0x0086 and value & 0x01:
+            self.regs[0x31] = (self.regs[0x31] & 0xFE) | (not self._active_high())
+            self._int_level(False, self._active_high())
+            return
+        if reg == 0x0001:
+            self.address = value & 0x7F
+        if reg == 0x0087:
+            self._restart('range')
+        super().write_byte(reg, value)
+
+class MCP9808(RegisterDevice):
+    ADDRESS = 0x18
+
+    # 16 bit registers except RESOLUTION, (reset value, writable mask)
+    REGISTERS = {0x01: (0x0000, 0x07FF),
+                 0x02: (0x0000, 0x1FFC),
+                 0x03: (0x0000, 0x1FFC),
+                 0x04: (0x0000, 0x1FFC),
+                 0x05: (0x0000, 0x0000),
+                 0x06: (0x0054, 0x0000),
+                 0x07: (0x0400, 0x0000),
+                 0x08: (0x03, 0x03)}
+    CONVERSION_US = (30_000, 65_000, 130_000, 250_000)
+
+    def __init__(self, bus=None, address=None, int_pin=None, noise=0, seed=0):
+        self.temperature = 25.0
+        super().__init__(bus, address, int_pin, noise, seed)
+
+    def power_on(self):
+        super().power_on()
+        self.values = dict((reg, reset) for reg, (reset, mask) in self.REGISTERS.items())
+
+    def update(self, now):
+        # SHDN
+        if self.values[0x01] & 0x0100:
+            self._restart('conversion')
+            return
+        resolution = self.values[0x08]
+        if self._due('conversion', now, self.CONVERSION_US[resolution]):
+            temperature = self.temperature
+            if self.noise:
+                temperature += self._random.gauss(0, self.noise) / 16
+
+            # 1/16 C two's complement, low bits dropped below 0.0625 C
+            raw = int(temperature * 16) & ~((1 << (3 - resolution)) - 1)
+            value = raw & 0x1FFF
+
+            # TCRIT, TUPPER, TLOWER comparison flags
+            if raw >= self._limit(0x04):
+                value |= 0x8000
+            if raw > self._limit(0x02):
+                value |= 0x4000
+            if raw < self._limit(0x03):
+                value |= 0x2000
+            self.values[0x05] = value
+
+    def _limit(self, reg):
+        value = self.values[reg] & 0x1FFC
+        if value & 0x1000:
+            value -= 0x2000
+        return value
+
+    def _width(self, reg):
+        return 1 if reg == 0x08 else 2
+
+    def i2c_write(self, data):
+        if not data:
+            return
+        self.pointer = data[0] & 0x0F
+        data = data[1:]
+        if data and self.pointer in self.REGISTERS:
+            width = self._width(self.pointer)
+            if len(data) >= width:
+                mask = self.REGISTERS[self.pointer][1]
+                value = int.from_bytes(data[:width], 'big')
+                self.values[self.pointer] = (self.values[self.pointer] & ~mask) | (value & mask)
+
+    def i2c_read(self, num_bytes):
+        # No auto increment, the register repeats
+        value = self.values.get(self.pointer, 0)
+        width = self._width(self.pointer)
+        data = value.to_bytes(width, 'big')
+        return (data * (num_bytes // width + 1))[:num_bytes]
+
+class DS3231(RegisterDevice):
+    ADDRESS = 0x68
+    SIZE = 0x13
+    RESET = {0x0E: 0x1C, 0x0F: 0x88}
+    READ_ONLY = (0x11, 0x12)
+
+    # Temperature conversion every 64 s, about 200 ms each
+    TEMP_PERIOD_US = 64_000_000
+    CONVERSION_US = 200_000
+
+    def __init__(self, bus=None, address=None, int_pin=None, noise=0, seed=0,
+                 now=datetime.datetime(2000, 1, 1)):
+        self.temperature = 25.0
+        self.set_datetime(now)
+        super().__init__(bus, address, int_pin, noise, seed)
+        self._convert()
+
+    def set_datetime(self, now):
+        """ Time kept by the oscillator from this moment on """
+        self._base = now.replace(microsecond=0)
+        self._base_us = clock.now_us()
+
+    def now(self):
+        elapsed = (clock.now_us() - self._base_us) // 1_000_000
+        return self._base + datetime.timedelta(seconds=elapsed)
+
+    @staticmethod
+    def _bcd(value):
+        return ((value // 10) << 4) | (value % 10)
+
+    @staticmethod
+    def _unbcd(value):
+        return (value >> 4) * 10 + (value & 0x0F)
+
+    def _time_registers(self):
+        now = self.now()
+        century = 0x80 if now.year >= 2100 else 0x00
+        return (self._bcd(now.second), self._bcd(now.minute), self._bcd(now.hour),
+                now.isoweekday() % 7 + 1, self._bcd(now.day),
+                century | self._bcd(now.month), self._bcd(now.year % 100))
+
+    def _convert(self):
+        raw = int(round(self.temperature * 4)) & 0x3FF
+        self.regs[0x11] = raw >> 2
+        self.regs[0x12] = (raw & 0x03) << 6
+
+    def update(self, now):
+        if self._due('temperature', now, self.TEMP_PERIOD_US):
+            self._convert()
+
+        # User started conversion, BSY until done
+        if self.regs[0x0E] & 0x20 and self._due('conv', now, self.CONVERSION_US):
+            self._restart('conv')
+            self._convert()
+            self.regs[0x0E] &= ~0x20
+            self.regs[0x0F] &= ~0x04
+
+    def next_address(self, reg):
+        return (reg + 1) % self.SIZE
+
+    def read_byte(self, reg):
+        if reg <= 0x06:
+            return self._time_registers()[reg]
+        return self.regs[reg]
+
+    def write_byte(self, reg, value):
+        if reg <= 0x06:
+            fields = list(self._time_registers())
+            fields[reg] = value
+            now = self.now()
+            try:
+                now = datetime.datetime(2000 + self._unbcd(fields[6]) + (100 if fields[5] & 0x80 else 0),
+                                        self._unbcd(fields[5] & 0x1F), self._unbcd(fields[4] & 0x3F),
+                                        self._unbcd(fields[2] & 0x3F), self._unbcd(fields[1] & 0x7F),
+                                        self._unbcd(fields[0] & 0x7F))
+            except ValueError:
+                pass
+            self.set_datetime(now)
+            return
+        if reg == 0x0E and value & 0x20:
+            self.regs[0x0F] |= 0x04
+            self._restart('conv')
+        if reg == 0x0F:
+            # A1F, A2F and OSF can only be cleared, BSY is read only
+            value = (value & self.regs[0x0F] & 0x83) | (value & 0x08) | (self.regs[0x0F] & 0x04)
+        super().write_byte(reg, value)
+
+class ISM330DLC(RegisterDevice):
+    ADDRESS = 0x6A
+    RESET = {0x0F: 0x6A, 0x12: 0x04}
+    READ_ONLY = frozenset([0x0F] + list(range(0x1B, 0x2E)) + list(range(0x3A, 0x43)))
+    ODR_HZ = (0, 12.5, 26, 52, 104, 208, 416, 833, 1660, 3330, 6660)
+
+    # mg / LSB and mdps / LSB per FS setting
+    ACCEL_SENSITIVITY = (0.061, 0.488, 0.122, 0.244)
+    GYRO_SENSITIVITY = (8.75, 17.5, 35.0, 70.0)
+
+    def __init__(self, bus=None, address=None, int_pin=None, noise=0, seed=0):
+        self.accel = [0.0, 0.0, 1.0]
+        self.gyro = [0.0, 0.0, 0.0]
+        self.temperature = 25.0
+        super().__init__(bus, address, int_pin, noise, seed)
+
+    def _odr(self, reg):
+        odr = self.regs[reg] >> 4
+        if odr >= len(self.ODR_HZ):
+            return 0
+        return self.ODR_HZ[odr]
+
+    def update(self, now):
+        odr = self._odr(0x10)
+        if odr and self._due('accel', now, 1_000_000 / odr):
+            sensitivity = self.ACCEL_SENSITIVITY[(self.regs[0x10] >> 2) & 3]
+            for axis in range(0, 3):
+                self._put16(0x28 + 2*axis, self._sample(self.accel[axis], 1000 / sensitivity), big=False)
+            self._ready(0x01, 0x01)
+        elif not odr:
+            self._restart('accel')
+
+        odr = self._odr(0x11)
+        if odr and self._due('gyro', now, 1_000_000 / odr):
+            if self.regs[0x11] & 0x02:
+                sensitivity = 4.375
+            else:
+                sensitivity = self.GYRO_SENSITIVITY[(self.regs[0x11] >> 2) & 3]
+            for axis in range(0, 3):
+                self._put16(0x22 + 2*axis, self._sample(self.gyro[axis], 1000 / sensitivity), big=False)
+            self._ready(0x02, 0x02)
+        elif not odr:
+            self._restart('gyro')
+
+    def _ready(self, status, int1):
+        self._put16(0x20, self._sample(self.temperature - 25, 256), big=False)
+        self.regs[0x1E] |= status | 0x04
+        if self.regs[0x0D] & int1:
+            self._int_pulse()
+
+    def next_address(self, reg):
+        # IF_INC
+        if self.regs[0x12] & 0x04:
+            return super().next_address(reg)
+        return reg
+
+    def read_byte(self, reg):
+        value = self.regs[reg]
+        if reg in (0x20, 0x21):
+            self.regs[0x1E] &= ~0x04
+        elif 0x22 <= reg <= 0x27:
+            self.regs[0x1E] &= ~0x02
+        elif 0x28 <= reg <= 0x2D:
+            self.regs[0x1E] &= ~0x01
+        return value
+
+    def write_byte(self, reg, value):
+        if reg == 0x12:
+            if value & 0x01:
+                self.power_on()
+                return
+            value &= ~0x80
+        if reg in (0x10, 0x11):
+            self._restart('accel' if reg == 0x10 else 'gyro')
+        super().write_byte(reg, value)
+
+class MTK3339:
+    """ UART GPS receiver, one NMEA epoch per update period """
+    BAUDRATES = (4800, 9600, 14400, 19200, 38400, 57600, 115200)
+
+    # PMTK314 fields 0 to 5, the rest is not modelled
+    OUTPUTS = ('GLL', 'RMC', 'VTG', 'GGA', 'GSA', 'GSV')
+    DEFAULT_OUTPUT = (0, 1, 1, 1, 1, 5)
+
+    def __init__(self, uart, baudrate=9600, period_ms=1000, seed=0,
+                 now=datetime.datetime(2024, 1, 1), pps_pin=None, drift_ppm=0.0):
+        self.uart = uart
+        self.pps_pin = pps_pin
+        self.drift_ppm = drift_ppm
+        self.baudrate = baudrate
+        self.period_ms = period_ms
+        self.output = list(self.DEFAULT_OUTPUT)
+
+        # Link quality
+        self.stable_baudrate = 115200
+        self.error_rate = 0.0
+        self._random = random.Random(seed)
+
+        # Physical inputs
+        self.latitude = 48.1173
+        self.longitude = 11.516667
+        self.altitude = 545.4
+        self.speed_knots = 22.4
+        self.course = 84.4
+        self.satellites = 8
+
+        self.commands = []
+        self._base = now
+        self._epoch = 0
+        self._next_us = clock.now_us() + period_ms * 1000
+
+        uart.peer = self
+        clock.register(self)
+
+    # === Receiver output ===
+    def utc(self, epoch):
+        return self._base + datetime.timedelta(milliseconds=epoch * self.period_ms)
+
+    @staticmethod
+    def _frame(body):
+        checksum = 0
+        for char in body.encode():
+            checksum ^= char
+        return ('$%s*%02X\r\n' % (body, checksum)).encode()
+
+    @staticmethod
+    def _degrees(value, width):
+        minutes = abs(value) * 60
+        return '%0*d%07.4f' % (width, int(minutes // 60), minutes % 60)
+
+    def sentences(self, epoch):
+        """ Bodies of the sentences output this epoch, '$' to '*' exclusive """
+        now = self.utc(epoch)
+        time = now.strftime('%H%M%S') + '.%03d' % (now.microsecond // 1000)
+        lat = '%s,%s' % (self._degrees(self.latitude, 2), 'N' if self.latitude >= 0 else 'S')
+        lon = '%s,%s' % (self._degrees(self.longitude, 3), 'E' if self.longitude >= 0 else 'W')
+        kmh = self.speed_knots * 1.852
+        bodies = {
+            'GLL': 'GPGLL,%s,%s,%s,A,A' % (lat, lon, time),
+            'RMC': 'GPRMC,%s,A,%s,%s,%.2f,%.2f,%s,,,A' % (time, lat, lon, self.speed_knots,
+                                                     self.course, now.strftime('%d%m%y')),
+            'VTG': 'GPVTG,%.2f,T,,M,%.2f,N,%.2f,K,A' % (self.course, self.speed_knots, kmh),
+            'GGA': 'GPGGA,%s,%s,%s,1,%02d,0.90,%.1f,M,46.9,M,,' % (time, lat, lon, self.satellites,
+                                                                self.altitude),
+            'GSA': 'GPGSA,A,3,04,05,09,12,24,,,,,,,,2.50,1.30,2.10',
+        }
+        out = []
+        for index, name in enumerate(self.OUTPUTS):
+            every = self.output[index]
+            if not every or epoch % every:
+                continue
+            if name == 'GSV':
+                out.append('GPGSV,2,1,08,01,40,083,46,02,17,308,41,12,07,344,39,14,22,228,45')
+                out.append('GPGSV,2,2,08,15,35,120,44,18,60,010,30,19,01,200,,24,30,300,44')
+            else:
+                out.append(bodies[name])
+        return out
+
+    def _transmit(self, data):
+        # What the host receives, garbage on a baud mismatch
+        if self.uart.baudrate != self.baudrate:
+            data = bytes((char * 7 + 3) & 0x7F for char in data)
+        elif self.baudrate > self.stable_baudrate and self.error_rate:
+            data = bytearray(data)
+            for index in range(0, len(data)):
+                if self._random.random() < self.error_rate:
+                    data[index] = self._random.randrange(0, 256)
+        self.uart.inject(data)
+
+    def update(self, now):
+        while now >= self._next_us:
+            self._epoch += 1
+            self._next_us += self.period_ms * 1000 * (1 + self.drift_ppm / 1_000_000)
+
+            # PPS rises at the UTC second, before its sentences
+            if self.pps_pin is not None and not self._epoch * self.period_ms % 1000:
+                self.pps_pin.drive(1)
+                self.pps_pin.drive(0)
+
+            data = b''.join(self._frame(body) for body in self.sentences(self._epoch))
+
+            # A rate the baud rate can not carry loses the end of the epoch
+            fits = int(self.baudrate * self.period_ms / 10_000)
+            self._transmit(data[:fits])
+
+    # === Commands ===
+    def _ack(self, command, flag):
+        self._transmit(self._frame('PMTK001,%s,%d' % (command, flag)))
+
+    def uart_write(self, uart, data):
+        if uart.baudrate != self.baudrate:
+            return
+        for line in data.split(b'\r\n'):
+            if not line.startswith(b'$PMTK') or b'*' not in line:
+                continue
+            body, checksum = line[1:].split(b'*', 1)
+            if self._frame(body.decode()) != line + b'\r\n':
+                continue
+            self.commands.append(body.decode())
+            self._command(body.decode())
+
+    def _command(self, body):
+        fields = body.split(',')
+        command = fields[0][4:]
+        if command == '220':
+            period = int(fields[1])
+            if not 100 <= period <= 10000:
+                return self._ack(command, 0)
+            self.period_ms = period
+            self._next_us = clock.now_us() + period * 1000
+            self._ack(command, 3)
+        elif command == '251':
+            # Switches without an ack
+            baudrate = int(fields[1])
+            if baudrate in self.BAUDRATES:
+                self.baudrate = baudrate
+        elif command == '314':
+            if fields[1] == '-1':
+                self.output = list(self.DEFAULT_OUTPUT)
+            else:
+                self.output = [int(value) for value in fields[1:1 + len(self.OUTPUTS)]]
+            self._ack(command, 3)
+        else:
+            self._ack(command, 1)
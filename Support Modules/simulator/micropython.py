@@ -0,0 +1,38 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Purpose:
+        * CPython stand-in for MicroPython's micropython module, part of
+        * the simulator.  Code emitters run as plain Python.
+
+"""
+
+import machine
+
+def const(value):
+    return value
+
+def native(function):
+    return function
+
+def viper(function):
+    return function
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+def schedule(function, arg):
+    # No interrupt context on CPython, run it straight away
+    function(arg)
+
+def opt_level(level=None):
+    return 0
+
+def mem_info(verbose=False):
+    pass
+
+def heap_lock():
+    pass
+
+def heap_unlock():
+    return 0
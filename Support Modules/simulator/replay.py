@@ -0,0 +1,83 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) CPython 3
+
+    * Purpose:
+        * Bus that records what a device answered and plays it back.
+        * Used to time and trace driver code without the cost of the
+        * bus or the device models showing up in the numbers.
+
+            * ReplayBus - Record through a live bus, then replay
+
+    * Notes:
+        1) Usage:
+             bus = ReplayBus(I2C(0))       # simulator or real bus
+             mpu = MPU6050(bus, 0x68)
+             mpu.process_sensors()         # recorded
+             bus.replay = True
+             mpu.process_sensors()         # served from the recording
+
+        2) In replay the last answer per (device, register, length) is
+           returned, writes are counted and dropped.  A read that was
+           never recorded goes to the live bus and is recorded.
+
+        3) readfrom_mem_into copies into the caller's buffer without
+           allocating.  readfrom_mem returns a new bytes object, like
+           machine.I2C does, so its cost stays visible.
+
+        4) On CPython a class with __getattr__ gets a new bound method
+           object on every method call, and assigning bytes to a
+           bytearray slice makes a temporary copy.  Hence no __getattr__
+           here and answers are kept as bytearrays.
+
+"""
+
+def _recorded(answers, dev_addr, reg_addr, num_bytes):
+    registers = answers.get(dev_addr)
+    if registers is None:
+        return None
+    lengths = registers.get(reg_addr)
+    if lengths is None:
+        return None
+    return lengths.get(num_bytes)
+
+class ReplayBus:
+    def __init__(self, bus):
+        self._bus = bus
+        self.replay = False
+        self.writes = 0
+
+        # {dev_addr: {reg_addr: {num_bytes: bytearray}}}
+        self._answers = {}
+
+    def _record(self, dev_addr, reg_addr, data):
+        registers = self._answers.setdefault(dev_addr, {})
+        registers.setdefault(reg_addr, {})[len(data)] = bytearray(data)
+
+    def readfrom_mem_into(self, dev_addr, reg_addr, buf, addrsize=8):
+        if self.replay:
+            data = _recorded(self._answers, dev_addr, reg_addr, len(buf))
+            if data is not None:
+                buf[:] = data
+                return
+        self._bus.readfrom_mem_into(dev_addr, reg_addr, buf, addrsize=addrsize)
+        self._record(dev_addr, reg_addr, buf)
+
+    def readfrom_mem(self, dev_addr, reg_addr, num_bytes, addrsize=8):
+        if self.replay:
+            data = _recorded(self._answers, dev_addr, reg_addr, num_bytes)
+            if data is not None:
+                return bytes(data)
+        data = self._bus.readfrom_mem(dev_addr, reg_addr, num_bytes, addrsize=addrsize)
+        self._record(dev_addr, reg_addr, data)
+        return data
+
+    def writeto_mem(self, dev_addr, reg_addr, buf, addrsize=8):
+        self.writes += 1
+        if not self.replay:
+            self._bus.writeto_mem(dev_addr, reg_addr, buf, addrsize=addrsize)
+
+    def scan(self):
+        return self._bus.scan()
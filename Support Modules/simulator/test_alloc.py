@@ -0,0 +1,72 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) CPython 3.9+
+    *   2) simulator (alloctrace, benchmark)
+
+    * Purpose:
+        * Allocation tests for the register read paths and the driver
+        * budgets, run against the simulator with the bus replayed.
+
+    * Notes:
+        1) Usage:
+             python3 -m pytest test_alloc.py
+             python3 test_alloc.py
+
+"""
+
+import unittest
+
+import alloctrace
+import benchmark
+
+def _replayed(case_name):
+    # Record the device answers once, then replay
+    case = benchmark.setup_case(case_name)
+    case.call()
+    if case.bus is not None:
+        case.bus.replay = True
+    return case
+
+def _allocated(call):
+    # Peak bytes per call, harness cost of the wrapper removed
+    overhead = alloctrace.measure(lambda: None)
+    return max(0, alloctrace.measure(call) - overhead)
+
+class RegisterReadTest(unittest.TestCase):
+    """ Steady state register reads allocate nothing """
+    def setUp(self):
+        self.mpu = _replayed('MPU6050.process_sensors').driver
+
+    def test_bit(self):
+        mpu = self.mpu
+        mpu.data_rdy_int
+        self.assertEqual(_allocated(lambda: mpu.data_rdy_int), 0)
+
+    def test_bits(self):
+        mpu = self.mpu
+        mpu.who_am_i
+        self.assertEqual(_allocated(lambda: mpu.who_am_i), 0)
+
+    def test_shadowed_bits(self):
+        mpu = self.mpu
+        mpu.dlpf
+        self.assertEqual(_allocated(lambda: mpu.dlpf), 0)
+
+    def test_block(self):
+        mpu = self.mpu
+        mpu.read_sensors()
+        self.assertEqual(_allocated(mpu.read_sensors), 0)
+
+class DriverBudgetTest(unittest.TestCase):
+    """ Every driver stays within its ALLOC_BUDGETS """
+    def test_budgets(self):
+        for case_name in benchmark.CASES:
+            case = _replayed(case_name)
+            for name, allocated, budget, ok in alloctrace.check_driver(case.driver):
+                with self.subTest(name=name):
+                    self.assertLessEqual(allocated, budget)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Dependencies:
+    *   1) CPython 3.9+
+    *   2) simulator (benchmark, machine)
+
+    * Purpose:
+        * GPS driver tests, sentences fed to the parser as they arrive
+        * from the stream.
+
+    * Notes:
+        1) Usage:
+             python3 -m pytest test_gps.py
+             python3 test_gps.py
+
+"""
+
+import unittest
+
+import benchmark
+from machine import UART, clock, models
+
+class GSVTest(unittest.TestCase):
+    """ Satellites in view table """
+    def setUp(self):
+        from gps.gps import GPS
+        self.gps = GPS(UART(1, 9600), None, None, None)
+
+    def test_negative_elevation(self):
+        # Below the horizon, reported negative, the rest of the table kept
+        self.gps.sort_sentence(b'GPGSV,2,1,05,01,40,083,46,02,-05,308,,12,07,344,39,14,22,228,45')
+        self.gps.sort_sentence(b'GPGSV,2,2,05,30,-95,100,20')
+        gsv = self.gps.gsv
+        self.assertEqual(gsv.count, 5)
+        self.assertEqual([gsv.elevation(slot) for slot in range(0, gsv.count)], [40, -5, 7, 22, -90])
+        self.assertEqual(gsv.get_sat(gsv.loc_sat_inlist(2)).elevation, -5)
+        self.assertEqual(gsv.azimuth(4), 100)
+
+class NegotiateTest(unittest.TestCase):
+    """ Link negotiation against the MTK3339 model """
+    def test_keeps_stats(self):
+        from gps.gps import GPS
+        from gps.negotiate import negotiate
+        clock.reset()
+        uart = UART(1, 9600, rxbuf=1024)
+        models.MTK3339(uart, baudrate=9600)
+        gps = GPS(uart, None, None, None)
+        for step in range(0, 300):
+            clock.advance(10_000)
+            gps.update()
+        before = gps.parse_stats()['GGA'][0]
+        self.assertGreater(before, 0)
+
+        # The counters belong to the caller
+        gps.reset_stats = lambda: self.fail('negotiate() reset the parse stats')
+        self.assertEqual(negotiate(gps, 5, 1, ('RMC', 'GGA')), (115200, 5, ('RMC', 'GGA')))
+        self.assertGreater(gps.parse_stats()['GGA'][0], before)
+
+if __name__ == '__main__':
+    unittest.main()
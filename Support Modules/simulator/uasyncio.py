@@ -0,0 +1,43 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Purpose:
+        * uasyncio on top of CPython's asyncio, part of the simulator.
+        * The *_ms helpers run on the simulated clock so awaits made by
+        * drivers let simulated time pass.
+
+"""
+
+from asyncio import *
+import asyncio
+
+from machine import clock
+
+async def sleep_ms(ms):
+    clock.advance(ms * 1000)
+    await asyncio.sleep(0)
+
+async def wait_for_ms(awaitable, timeout_ms):
+    task = asyncio.ensure_future(awaitable)
+    deadline = clock.now_us() + timeout_ms * 1000
+    while not task.done():
+        if clock.now_us() >= deadline:
+            task.cancel()
+            raise asyncio.TimeoutError()
+        await sleep_ms(1)
+    return task.result()
+
+class ThreadSafeFlag:
+    def __init__(self):
+        self._flag = False
+
+    def set(self):
+        self._flag = True
+
+    def clear(self):
+        self._flag = False
+
+    async def wait(self):
+        while not self._flag:
+            await sleep_ms(1)
+        self._flag = False
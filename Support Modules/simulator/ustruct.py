@@ -0,0 +1,9 @@
+"""
+    * Author(s): SquirtleSquadLeader
+
+    * Purpose:
+        * ustruct alias for CPython, part of the simulator.
+
+"""
+
+from struct import *